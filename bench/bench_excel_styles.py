@@ -0,0 +1,159 @@
+"""
+Замер записи листа реестра: стили на каждую ячейку против общих именованных стилей.
+
+Для каждого варианта отдельный процесс заполняет лист синтетическими строками
+(по оформлению листа РРЛ входящих) и сохраняет книгу. Печатается время
+заполнения, время сохранения, пик памяти Python (tracemalloc) и прирост RSS
+(RSS — только где есть модуль resource, в Windows столбец пустой).
+
+Замер не входит в приложение и лежит вне его папки; модули парсеров
+берутся из APP_DIR:
+
+    python bench/bench_excel_styles.py --rows 50000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# ru_maxrss в macOS — в байтах, в Linux — в КиБ
+RSS_PER_MB = 1024 * 1024 if sys.platform == 'darwin' else 1024
+
+# Папка приложения с модулями парсеров
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "conv_25.10.2025 — копия")
+sys.path.insert(0, APP_DIR)
+
+from openpyxl import Workbook
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+
+import excel_writer
+from rrl_incoming_parser import SHEET_LAYOUT
+
+VARIANTS = ('per-cell', 'shared')
+
+
+def make_rows(count, columns):
+    """Синтетические строки реестра"""
+    for i in range(count):
+        yield [f"{i % 997}.{col}" if col % 3 else f"Станция {i} / {col}" for col in range(columns)]
+
+
+def write_sheet_per_cell(ws, layout, rows):
+    """Прежняя запись листа: новые Font/Alignment для каждой ячейки данных"""
+    headers = layout['headers']
+
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_font = Font(bold=True, color="FFFFFF", size=9)
+    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+    ws.merge_cells(layout['title_range'])
+    header_cell = ws[layout['title_range'].split(':')[0]]
+    header_cell.value = layout['title']
+    header_cell.font = Font(bold=True, size=11)
+    header_cell.alignment = Alignment(horizontal="center", vertical="center")
+
+    for cell_range, text in layout.get('groups', []):
+        ws.merge_cells(cell_range)
+        ws[cell_range.split(':')[0]].value = text
+
+    for col, header in enumerate(headers, start=1):
+        cell = ws.cell(row=3, column=col)
+        cell.value = header
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+        cell.border = border
+
+    row = 4
+    for values in rows:
+        for col, value in enumerate(values, start=1):
+            ws.cell(row=row, column=col, value=value)
+        for col in range(1, len(headers) + 1):
+            cell = ws.cell(row=row, column=col)
+            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+            cell.border = border
+            cell.font = Font(size=9)
+        row += 1
+
+    excel_writer._set_dimensions(ws, layout)
+
+
+def run_variant(variant, rows, trace):
+    """Заполняет и сохраняет лист, возвращает (сек. заполнения, сек. сохранения, пик МБ)"""
+    if trace:
+        tracemalloc.start()
+
+    wb = Workbook()
+    ws = wb.active
+    data = make_rows(rows, len(SHEET_LAYOUT['headers']))
+
+    start = time.perf_counter()
+    if variant == 'per-cell':
+        write_sheet_per_cell(ws, SHEET_LAYOUT, data)
+    else:
+        excel_writer.write_sheet(ws, SHEET_LAYOUT, data)
+    fill_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        wb.save(os.path.join(tmp, 'bench.xlsx'))
+        save_time = time.perf_counter() - start
+
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+
+    return fill_time, save_time, peak
+
+
+def run_child(args):
+    """Запуск одного варианта в текущем процессе"""
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else 0
+    fill_time, save_time, _ = run_variant(args.variant, args.rows, trace=False)
+    rss = f"{(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss) / RSS_PER_MB:.0f}" if resource else ""
+
+    # Пик tracemalloc меряется отдельным проходом: трассировка замедляет запись
+    peak = 0
+    if args.trace:
+        _, _, peak = run_variant(args.variant, args.rows, trace=True)
+
+    print(f"{args.variant}\t{fill_time:.1f}\t{save_time:.1f}\t{peak:.0f}\t{rss}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замер стилей при записи листа Excel")
+    parser.add_argument('--rows', type=int, default=50000, help="число строк данных (по умолчанию 50000)")
+    parser.add_argument('--no-trace', dest='trace', action='store_false', help="не замерять пик памяти tracemalloc")
+    parser.add_argument('--variant', choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.variant:
+        run_child(args)
+        return
+
+    print(f"📊 Лист из {args.rows} строк, {len(SHEET_LAYOUT['headers'])} столбцов")
+    print("вариант\tзаполнение, с\tсохранение, с\tпик tracemalloc, МБ\tприрост RSS, МБ")
+    for variant in VARIANTS:
+        command = [sys.executable, os.path.abspath(__file__), '--variant', variant, '--rows', str(args.rows)]
+        if not args.trace:
+            command.append('--no-trace')
+        subprocess.run(command, check=True, cwd=APP_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+"""
+Зона координации у границы: расстояние от станций входящих реестров до
+границы из локального файла (GeoJSON или WKT, полигон или мультиполигон).
+
+Граница загружается один раз за запуск. Её отрезки раскладываются по ячейкам
+сетки (station_grid), а для проверки «внутри полигона» — по полосам широт.
+Станции считаются группами по ячейке сетки: для всех точек ячейки берутся
+только отрезки соседних ячеек, а расстояния и пересечения лучом считаются
+матрицей (numpy; без numpy — поэлементно):
+
+    border = border_for_run('uzb.geojson', distance_km=100)
+    sheets = border_sheets(build_sheets(data_by_sheet), border)
+
+На листы добавляются столбцы «Расстояние до границы, км» и «Зона координации»
+(внутри / да / нет). С --border-filter строки вне зоны в реестр не попадают
+(база станций и индексы повторной подачи получают все станции).
+"""
+import json
+import math
+import os
+import re
+from functools import partial
+
+from openpyxl.utils import get_column_letter
+
+from station_columns import batch_size
+from station_grid import (
+    DEFAULT_CELL_KM, KM_PER_DEGREE, cells_near, column_points, distance_km, grid_cell, normalize_point, open_grid,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Ширина зоны координации по умолчанию, км
+DEFAULT_BORDER_DISTANCE_KM = 100.0
+
+# Точки считаются блоками GROUP_CELLS × GROUP_CELLS ячеек сетки
+GROUP_CELLS = 4
+
+# Дальше половины окружности Земли искать отрезки границы незачем
+_MAX_SEARCH_KM = 20015.0
+
+# Отметки столбца «Зона координации»
+ZONE_INSIDE = "внутри"
+ZONE_NEAR = "да"
+ZONE_FAR = "нет"
+
+BORDER_HEADERS = ["Расстояние\nдо границы, км", "Зона\nкоординации"]
+BORDER_COLUMN_WIDTHS = [14, 13]
+
+_WKT_RING = re.compile(r'\(([^()]+)\)')
+
+
+def add_border_arguments(parser):
+    """Добавляет в argparse опции --border, --border-distance и --border-filter"""
+    parser.add_argument(
+        '--border',
+        metavar='FILE',
+        default=None,
+        help="файл границы (GeoJSON или WKT): добавить расстояние станций до границы и отметку зоны координации"
+    )
+    parser.add_argument(
+        '--border-distance',
+        type=float,
+        default=DEFAULT_BORDER_DISTANCE_KM,
+        metavar='KM',
+        help=f"ширина зоны координации, км (по умолчанию {DEFAULT_BORDER_DISTANCE_KM:g})"
+    )
+    parser.add_argument(
+        '--border-filter',
+        action='store_true',
+        help="оставить в реестре только станции внутри зоны координации"
+    )
+
+
+def _geojson_rings(geometry):
+    """Кольца полигонов GeoJSON (Feature, FeatureCollection, Polygon, MultiPolygon...)"""
+    kind = geometry.get('type')
+    if kind == 'FeatureCollection':
+        return [ring for feature in geometry.get('features', []) for ring in _geojson_rings(feature)]
+    if kind == 'Feature':
+        return _geojson_rings(geometry.get('geometry') or {})
+    if kind == 'GeometryCollection':
+        return [ring for part in geometry.get('geometries', []) for ring in _geojson_rings(part)]
+    if kind == 'Polygon':
+        return [ring for ring in geometry['coordinates']]
+    if kind == 'MultiPolygon':
+        return [ring for polygon in geometry['coordinates'] for ring in polygon]
+    return []
+
+
+def _wkt_rings(text):
+    """Кольца POLYGON / MULTIPOLYGON в WKT: самые внутренние скобки — одно кольцо"""
+    if not re.match(r'\s*(MULTI)?POLYGON\b', text, re.IGNORECASE):
+        return []
+    return [
+        [[float(value) for value in pair.split()[:2]] for pair in ring.split(',')]
+        for ring in _WKT_RING.findall(text)
+    ]
+
+
+def load_border(path):
+    """Кольца границы из файла GeoJSON или WKT: [[(долгота, широта), ...], ...]
+    Ошибка чтения или файл без полигонов — ValueError
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        rings = _geojson_rings(json.loads(text)) if text.lstrip().startswith('{') else _wkt_rings(text)
+        rings = [[(float(point[0]), float(point[1])) for point in ring] for ring in rings]
+    except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+        raise ValueError(f"Не удалось прочитать границу {path}: {e}") from None
+
+    rings = [ring for ring in rings if len(ring) >= 3]
+    if not rings:
+        raise ValueError(f"В файле границы нет полигонов: {path}")
+    return rings
+
+
+def open_border(rings, distance_km=DEFAULT_BORDER_DISTANCE_KM, filter_outside=False, cell_km=DEFAULT_CELL_KM):
+    """Граница с индексом отрезков: сетка ячеек для расстояний, полосы широт для «внутри»"""
+    border = dict(
+        open_grid(cell_km),
+        bands={},
+        segments=[],
+        cell_km=cell_km,
+        distance=distance_km,
+        filter=filter_outside,
+    )
+
+    for ring in rings:
+        # Кольцо замыкается, если последняя точка не совпадает с первой
+        points = [normalize_point(point) for point in ring]
+        if points[0] != points[-1]:
+            points.append(points[0])
+
+        for start, end in zip(points, points[1:]):
+            if start == end:
+                continue
+            position = len(border['segments'])
+            border['segments'].append(start + end)
+
+            low_long, low_lat = grid_cell(border, (min(start[0], end[0]), min(start[1], end[1])))
+            high_long, high_lat = grid_cell(border, (max(start[0], end[0]), max(start[1], end[1])))
+            for cell_lat in range(low_lat, high_lat + 1):
+                border['bands'].setdefault(cell_lat, []).append(position)
+                for cell_long in range(low_long, high_long + 1):
+                    border['cells'].setdefault((cell_long, cell_lat), []).append(position)
+
+    segments = border['segments']
+    border['bounds'] = (
+        min(min(segment[0], segment[2]) for segment in segments),
+        min(min(segment[1], segment[3]) for segment in segments),
+        max(max(segment[0], segment[2]) for segment in segments),
+        max(max(segment[1], segment[3]) for segment in segments),
+    )
+    if np is not None:
+        border['array'] = np.array(border['segments'], dtype=float).reshape(-1, 4)
+    return border
+
+
+def border_for_run(path=None, distance_km=DEFAULT_BORDER_DISTANCE_KM, filter_outside=False):
+    """Граница для запуска парсера или None, если файл границы не задан"""
+    if not path:
+        return None
+    border = open_border(load_border(path), distance_km, filter_outside)
+    border['name'] = os.path.basename(path)
+    print(f"🗺  Граница: {border['name']}, отрезков: {len(border['segments'])}, зона {distance_km:g} км")
+    return border
+
+
+def _segment_distances(border, points, positions):
+    """Расстояния (км) от каждой точки до ближайшего из отрезков positions
+    Отрезки проецируются на плоскость вокруг точки (равнопромежуточная проекция).
+    """
+    if np is None:
+        return [
+            min(_segment_distance(point, border['segments'][position]) for position in positions)
+            for point in points
+        ]
+
+    segments = border['array'][positions]
+    longs = np.array([point[0] for point in points])[:, None]
+    lats = np.array([point[1] for point in points])[:, None]
+    scale = np.cos(np.radians(lats)) * KM_PER_DEGREE
+
+    start_x = ((segments[:, 0] - longs + 180.0) % 360.0 - 180.0) * scale
+    start_y = (segments[:, 1] - lats) * KM_PER_DEGREE
+    end_x = ((segments[:, 2] - longs + 180.0) % 360.0 - 180.0) * scale
+    end_y = (segments[:, 3] - lats) * KM_PER_DEGREE
+
+    delta_x = end_x - start_x
+    delta_y = end_y - start_y
+    length = delta_x ** 2 + delta_y ** 2
+    along = np.clip(-(start_x * delta_x + start_y * delta_y) / np.where(length > 0, length, 1.0), 0.0, 1.0)
+    distances = np.hypot(start_x + along * delta_x, start_y + along * delta_y)
+    return distances.min(axis=1).tolist()
+
+
+def _segment_distance(point, segment):
+    """Расстояние от точки до одного отрезка (без numpy)"""
+    scale = math.cos(math.radians(point[1])) * KM_PER_DEGREE
+    start_x = ((segment[0] - point[0] + 180.0) % 360.0 - 180.0) * scale
+    start_y = (segment[1] - point[1]) * KM_PER_DEGREE
+    end_x = ((segment[2] - point[0] + 180.0) % 360.0 - 180.0) * scale
+    end_y = (segment[3] - point[1]) * KM_PER_DEGREE
+
+    delta_x = end_x - start_x
+    delta_y = end_y - start_y
+    length = delta_x ** 2 + delta_y ** 2
+    along = min(1.0, max(0.0, -(start_x * delta_x + start_y * delta_y) / length)) if length else 0.0
+    return math.hypot(start_x + along * delta_x, start_y + along * delta_y)
+
+
+def _inside_flags(border, points, positions):
+    """Внутри ли полигона каждая точка (луч на восток, чётность пересечений отрезков positions)"""
+    if not positions:
+        return [False] * len(points)
+
+    if np is None:
+        segments = [border['segments'][position] for position in positions]
+        return [
+            sum(
+                1 for start_long, start_lat, end_long, end_lat in segments
+                if (start_lat > lat) != (end_lat > lat)
+                and long_deg < start_long + (lat - start_lat) * (end_long - start_long) / (end_lat - start_lat)
+            ) % 2 == 1
+            for long_deg, lat in points
+        ]
+
+    segments = border['array'][positions]
+    longs = np.array([point[0] for point in points])[:, None]
+    lats = np.array([point[1] for point in points])[:, None]
+    start_long, start_lat, end_long, end_lat = segments[:, 0], segments[:, 1], segments[:, 2], segments[:, 3]
+
+    spans = (start_lat > lats) != (end_lat > lats)
+    height = np.where(end_lat != start_lat, end_lat - start_lat, 1.0)
+    crossing_long = start_long + (lats - start_lat) * (end_long - start_long) / height
+    crossings = (spans & (longs < crossing_long)).sum(axis=1)
+    return (crossings % 2 == 1).tolist()
+
+
+def _bounds_distances(border, point):
+    """Расстояния (км) от точки до прямоугольника, охватывающего границу, и до его дальнего угла"""
+    low_long, low_lat, high_long, high_lat = border['bounds']
+    long_deg, lat_deg = point
+    nearest = (min(max(long_deg, low_long), high_long), min(max(lat_deg, low_lat), high_lat))
+    corners = [(low_long, low_lat), (low_long, high_lat), (high_long, low_lat), (high_long, high_lat)]
+    return distance_km(point, nearest), max(distance_km(point, corner) for corner in corners)
+
+
+def border_distances(border, points):
+    """Расстояния до границы (км) и признак «внутри полигона» для точек (долгота, широта)
+    Возвращает ([расстояние или None], [True/False/None]); None — у точки нет координат.
+    """
+    distances = [None] * len(points)
+    inside = [None] * len(points)
+
+    # Одинаковые точки считаются один раз, точки группируются по блокам
+    # GROUP_CELLS × GROUP_CELLS ячеек сетки — одна матрица расстояний на блок
+    rows_by_point = {}
+    for row, point in enumerate(points):
+        if point is not None:
+            rows_by_point.setdefault(normalize_point(point), []).append(row)
+    group_deg = border['cell_deg'] * GROUP_CELLS
+    group_km = border['cell_km'] * GROUP_CELLS
+    points_by_group = {}
+    for point in rows_by_point:
+        group = (math.floor(point[0] / group_deg), math.floor(point[1] / group_deg))
+        points_by_group.setdefault(group, []).append(point)
+
+    for (group_long, group_lat), group_points in points_by_group.items():
+        center = ((group_long + 0.5) * group_deg, (group_lat + 0.5) * group_deg)
+
+        # Радиус поиска растёт, пока ближайший отрезок не окажется внутри него;
+        # начальный — по расстоянию до прямоугольника, охватывающего границу
+        pending = group_points
+        near_km, far_km = _bounds_distances(border, center)
+        radius_km = max(group_km, 2 * near_km)
+        while pending:
+            # Отрезки вокруг центра блока с запасом на его размер
+            if radius_km + group_km >= far_km:
+                positions = list(range(len(border['segments'])))
+            else:
+                positions = sorted({
+                    position for positions in cells_near(border, center, radius_km + group_km) for position in positions
+                })
+            last = radius_km >= _MAX_SEARCH_KM
+            if positions:
+                found = _segment_distances(border, pending, positions)
+            else:
+                found = [math.inf] * len(pending)
+
+            unresolved = []
+            for point, distance in zip(pending, found):
+                if distance <= radius_km or last:
+                    for row in rows_by_point[point]:
+                        distances[row] = None if distance == math.inf else distance
+                else:
+                    unresolved.append(point)
+            pending = unresolved
+            radius_km = min(radius_km * 2, _MAX_SEARCH_KM)
+
+        # Пересечения луча — только с отрезками полосы широт точки
+        points_by_band = {}
+        for point in group_points:
+            points_by_band.setdefault(grid_cell(border, point)[1], []).append(point)
+        for band, band_points in points_by_band.items():
+            for point, flag in zip(band_points, _inside_flags(border, band_points, border['bands'].get(band, []))):
+                for row in rows_by_point[point]:
+                    inside[row] = flag
+
+    return distances, inside
+
+
+def _zone(border, distance, inside):
+    """Отметка зоны координации для станции"""
+    if inside:
+        return ZONE_INSIDE
+    if distance is None:
+        return ""
+    return ZONE_NEAR if distance <= border['distance'] else ZONE_FAR
+
+
+def border_layout(layout):
+    """Оформление листа с двумя столбцами границы в конце"""
+    headers = layout['headers'] + BORDER_HEADERS
+    title_start = layout['title_range'].split(':')[0]
+    return dict(
+        layout,
+        headers=headers,
+        column_widths=layout['column_widths'] + BORDER_COLUMN_WIDTHS,
+        title_range=f"{title_start}:{get_column_letter(len(headers))}1",
+    )
+
+
+def build_border_columns(build_columns, batch):
+    """Столбцы листа парсера и столбцы расстояния до границы и зоны координации"""
+    return build_columns(batch) + [
+        [None if distance is None else round(distance, 1) for distance in batch['border_distance']],
+        batch['border_zone'],
+    ]
+
+
+def _select_rows(batch, rows):
+    """Пакет только из строк rows"""
+    return {field: [values[row] for row in rows] for field, values in batch.items()}
+
+
+def border_sheets(sheets, border):
+    """Листы станций с расстоянием до границы и зоной координации
+    sheets: [(имя листа, оформление, пакет по столбцам, build_columns)] с полями t_long/t_lat в пакете
+    border: граница (border_for_run) или None — тогда листы возвращаются как есть
+    """
+    if border is None:
+        return sheets
+
+    result = []
+    total = near = 0
+    for sheet_name, layout, batch, build_columns in sheets:
+        distances, inside = border_distances(border, column_points(batch['t_long'], batch['t_lat']))
+
+        batch = dict(batch, border_distance=distances)
+        batch['border_zone'] = [_zone(border, distance, flag) for distance, flag in zip(distances, inside)]
+        in_zone = [row for row, zone in enumerate(batch['border_zone']) if zone in (ZONE_INSIDE, ZONE_NEAR)]
+        total += batch_size(batch)
+        near += len(in_zone)
+        if border['filter']:
+            batch = _select_rows(batch, in_zone)
+
+        result.append((sheet_name, border_layout(layout), batch, partial(build_border_columns, build_columns)))
+
+    print(f"🗺  В зоне координации ({border['distance']:g} км от границы): {near} из {total} строк")
+    if border['filter']:
+        print(f"  └─ Строки вне зоны в реестр не включены: {total - near}")
+    return result
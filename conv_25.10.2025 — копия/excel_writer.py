@@ -0,0 +1,184 @@
+"""
+Запись листов реестра в Excel, общая для всех четырёх парсеров.
+
+Парсер описывает оформление листа словарём (layout) и передаёт строки данных
+как последовательности значений:
+
+    SHEET_LAYOUT = {
+        'title': "Учёт ...",                   # первая строка (объединённая)
+        'title_range': 'A1:Q1',
+        'groups': [('A2:B2', "Частота, МГц")],  # объединённые заголовки второй строки
+        'headers': ["передача", "приём", ...],  # подзаголовки третьей строки
+        'column_widths': [12, 12, ...],
+        'row_heights': {1: 30, 3: 40},
+    }
+
+Лист может быть обычным или write-only (Workbook(write_only=True)). Во втором
+случае строки пишутся в файл потоково по мере поступления, и сетка ячеек
+не накапливается в памяти до wb.save.
+
+Стили ячеек регистрируются в книге один раз как именованные (NamedStyle) и
+назначаются ячейкам по имени, без создания Font/Alignment на каждую ячейку.
+"""
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
+from openpyxl.utils import get_column_letter, range_boundaries
+from openpyxl.worksheet._write_only import WriteOnlyWorksheet
+
+
+def add_write_only_argument(parser):
+    """Добавляет в argparse опцию --write-only"""
+    parser.add_argument(
+        '--write-only',
+        action='store_true',
+        help="потоковая запись Excel (write-only): память не растёт с числом строк"
+    )
+
+
+# Общие объекты стилей реестра
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+CENTER_WRAP = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+# Именованные стили: заголовок листа, шапка таблицы, ячейки данных
+TITLE_STYLE = 'registry_title'
+HEADER_STYLE = 'registry_header'
+DATA_STYLE = 'registry_data'
+
+
+def _registry_styles():
+    """Создаёт именованные стили реестра (объект NamedStyle привязывается к одной книге)"""
+    return [
+        NamedStyle(
+            name=TITLE_STYLE,
+            font=Font(bold=True, size=11),
+            alignment=Alignment(horizontal="center", vertical="center"),
+        ),
+        NamedStyle(
+            name=HEADER_STYLE,
+            font=Font(bold=True, color="FFFFFF", size=9),
+            fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+            alignment=CENTER_WRAP,
+            border=THIN_BORDER,
+        ),
+        NamedStyle(
+            name=DATA_STYLE,
+            font=Font(size=9),
+            alignment=CENTER_WRAP,
+            border=THIN_BORDER,
+        ),
+    ]
+
+
+def register_styles(wb):
+    """Регистрирует именованные стили реестра в книге (повторный вызов ничего не делает)"""
+    for style in _registry_styles():
+        if style.name not in wb.named_styles:
+            wb.add_named_style(style)
+
+
+def write_sheet(ws, layout, rows):
+    """Заполняет лист: заголовки, строки данных (с 4-й), ширина столбцов, высота строк"""
+    register_styles(ws.parent)
+
+    if isinstance(ws, WriteOnlyWorksheet):
+        _write_sheet_streaming(ws, layout, rows)
+    else:
+        _write_sheet_cells(ws, layout, rows)
+
+
+def _write_sheet_cells(ws, layout, rows):
+    """Заполняет обычный лист через ws.cell"""
+    headers = layout['headers']
+    groups = layout.get('groups', [])
+    max_col = len(headers)
+
+    # Заголовок - первая строка (объединенная)
+    ws.merge_cells(layout['title_range'])
+    header_cell = ws[layout['title_range'].split(':')[0]]
+    header_cell.value = layout['title']
+    header_cell.style = TITLE_STYLE
+
+    # Вторая строка - объединенные заголовки
+    for cell_range, text in groups:
+        ws.merge_cells(cell_range)
+        ws[cell_range.split(':')[0]].value = text
+
+    # Применяем стили к строке 2
+    if groups:
+        for col in range(1, max_col + 1):
+            ws.cell(row=2, column=col).style = HEADER_STYLE
+
+    # Записываем подзаголовки в третью строку
+    for col, header in enumerate(headers, start=1):
+        cell = ws.cell(row=3, column=col)
+        cell.value = header
+        cell.style = HEADER_STYLE
+
+    # Записываем данные начиная с 4-й строки
+    row = 4
+    for values in rows:
+        col = 0
+        for col, value in enumerate(values, start=1):
+            cell = ws.cell(row, col)
+            cell.value = value
+            cell.style = DATA_STYLE
+
+        # Оставшиеся ячейки строки тоже оформляем
+        for col in range(col + 1, max_col + 1):
+            ws.cell(row, col).style = DATA_STYLE
+
+        row += 1
+
+    _set_dimensions(ws, layout)
+
+
+def _write_sheet_streaming(ws, layout, rows):
+    """Заполняет write-only лист: строки добавляются по порядку через ws.append"""
+    headers = layout['headers']
+    groups = layout.get('groups', [])
+    max_col = len(headers)
+
+    # Размеры и объединения задаются до первой строки (write-only пишет их в начало/конец листа)
+    _set_dimensions(ws, layout)
+    ws.merged_cells.add(layout['title_range'])
+    for cell_range, _ in groups:
+        ws.merged_cells.add(cell_range)
+
+    def styled(value, style):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    # Заголовок - первая строка (объединенная)
+    ws.append([styled(layout['title'], TITLE_STYLE)])
+
+    # Вторая строка - объединенные заголовки
+    if groups:
+        group_titles = {range_boundaries(cell_range)[0]: text for cell_range, text in groups}
+        ws.append([styled(group_titles.get(col), HEADER_STYLE) for col in range(1, max_col + 1)])
+    else:
+        ws.append([])
+
+    # Третья строка - подзаголовки
+    ws.append([styled(header, HEADER_STYLE) for header in headers])
+
+    # Данные начиная с 4-й строки
+    for values in rows:
+        values = list(values)
+        values.extend([None] * (max_col - len(values)))
+        ws.append([styled(value, DATA_STYLE) for value in values])
+
+
+def _set_dimensions(ws, layout):
+    """Настраивает ширину столбцов и высоту строк"""
+    for col, width in enumerate(layout['column_widths'], start=1):
+        column_letter = get_column_letter(col)
+        ws.column_dimensions[column_letter].width = width
+
+    for row, height in layout.get('row_heights', {}).items():
+        ws.row_dimensions[row].height = height
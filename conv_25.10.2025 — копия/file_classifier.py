@@ -0,0 +1,75 @@
+"""
+Быстрая классификация txt файлов МСЭ по началу файла, без полного разбора.
+
+Читаются только первые килобайты: секция HEAD (t_adm, t_d_sent) и тип
+уведомлений t_notice_type (T11/T12/T13) первого блока NOTICE. Если тип в
+начале файла не указан, он берётся из имени файла (..._T12_...):
+
+    info = classify_file(file_path)
+    # {'t_adm': 'UZB', 't_d_sent': '2025-08-10', 'notice_type': 'T12'}
+
+    uzb_files = filter_files(file_paths, adm='UZB')
+    rx_files = filter_files(file_paths, notice_types=('T13',))
+"""
+import os
+import re
+
+from notice_reader import read_head, NOTICE_OPEN
+
+# Сколько символов после HEAD дочитывать в поисках типа уведомления
+SNIFF_SIZE = 16 * 1024
+
+NOTICE_TYPES = ('T11', 'T12', 'T13')
+
+_NOTICE_TYPE_PATTERN = re.compile(r'^[ \t]*t_notice_type[ \t]*=[ \t]*(T1[123])\b', re.MULTILINE)
+_FILENAME_TYPE_PATTERN = re.compile(r'T1[123]')
+
+
+def sniff_notice_type(text):
+    """Возвращает тип уведомления первого блока NOTICE в тексте (T11/T12/T13) или None"""
+    start = text.find(NOTICE_OPEN)
+    if start == -1:
+        return None
+
+    match = _NOTICE_TYPE_PATTERN.search(text, start)
+    return match.group(1) if match else None
+
+
+def notice_type_from_filename(file_path):
+    """Определяет тип уведомлений по имени файла (T11/T12/T13) или None"""
+    match = _FILENAME_TYPE_PATTERN.search(os.path.basename(file_path).upper())
+    return match.group(0) if match else None
+
+
+def classify_file(file_path):
+    """Читает начало файла и возвращает данные HEAD и тип уведомлений ('notice_type')"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        head_data, text = read_head(f)
+
+        notice_type = sniff_notice_type(text)
+        if notice_type is None:
+            text += f.read(SNIFF_SIZE)
+            notice_type = sniff_notice_type(text)
+
+    info = dict(head_data)
+    info['notice_type'] = notice_type or notice_type_from_filename(file_path)
+    return info
+
+
+def matches(info, adm=None, notice_types=None):
+    """Проверяет классификацию файла: adm — код администрации (подстрока t_adm),
+    notice_types — допустимые типы уведомлений
+    """
+    if adm and adm.upper() not in info.get('t_adm', '').upper():
+        return False
+    if notice_types and info.get('notice_type') not in notice_types:
+        return False
+    return True
+
+
+def filter_files(file_paths, adm=None, notice_types=None):
+    """Отбирает файлы по администрации и/или типу уведомлений, читая только их начало"""
+    return [
+        file_path for file_path in file_paths
+        if matches(classify_file(file_path), adm, notice_types)
+    ]
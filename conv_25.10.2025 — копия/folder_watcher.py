@@ -0,0 +1,252 @@
+"""
+Наблюдение за папками с txt файлами МСЭ для режима main.py watch.
+
+На Linux используется inotify (через libc, без сторонних пакетов): файл
+считается готовым, когда его закрыли после записи (IN_CLOSE_WRITE) или
+переместили в папку (IN_MOVED_TO). На других системах, при ошибке inotify
+или с опцией --poll папки опрашиваются: файл готов, когда его размер и
+mtime не изменились между двумя опросами.
+
+События копятся и выдаются пачкой, когда в папках debounce секунд тихо
+(но не позже max_delay от первого события пачки):
+
+    watcher = open_watcher(folders)
+    watch(watcher, on_batch)   # on_batch({папка: [пути готовых файлов]})
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from file_classifier import classify_file, NOTICE_TYPES
+
+# Интервал опроса папок без inotify (в секундах)
+POLL_INTERVAL = 1.0
+
+# Сколько секунд тишины ждать перед обработкой пачки событий
+DEBOUNCE = 2.0
+
+# Предельная задержка обработки при непрерывном потоке файлов (в секундах)
+MAX_DELAY = 30.0
+
+# Флаги inotify (linux/inotify.h)
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_MOVED_FROM | _IN_DELETE
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def add_watch_arguments(parser):
+    """Добавляет в argparse опции --poll, --poll-interval и --debounce"""
+    parser.add_argument(
+        '--poll',
+        action='store_true',
+        help="опрашивать папки вместо inotify (сетевые диски, не Linux)"
+    )
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=POLL_INTERVAL,
+        help=f"интервал опроса папок в секундах (по умолчанию {POLL_INTERVAL:g})"
+    )
+    parser.add_argument(
+        '--debounce',
+        type=float,
+        default=DEBOUNCE,
+        help=f"секунд без новых файлов перед обработкой пачки (по умолчанию {DEBOUNCE:g})"
+    )
+
+
+def is_watched_name(name):
+    """Отслеживаются только txt файлы (скрытые и временные пропускаются)"""
+    return name.endswith('.txt') and not name.startswith('.')
+
+
+def is_notice_file(path):
+    """Проверяет по началу файла, что это уведомления T11/T12/T13
+    Удалённый файл тоже считается изменением: реестр нужно пересобрать без него.
+    """
+    if not os.path.exists(path):
+        return True
+    try:
+        return classify_file(path).get('notice_type') in NOTICE_TYPES
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
+def _inotify_init(folders):
+    """Создаёт inotify и добавляет папки; возвращает (fd, {wd: папка}) или None"""
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+
+    watches = {}
+    for folder in folders:
+        wd = libc.inotify_add_watch(fd, os.fsencode(folder), _WATCH_MASK)
+        if wd < 0:
+            os.close(fd)
+            return None
+        watches[wd] = folder
+
+    return fd, watches
+
+
+def _snapshot(folder):
+    """Размер и mtime txt файлов папки"""
+    snapshot = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if is_watched_name(entry.name) and entry.is_file():
+                st = entry.stat()
+                snapshot[entry.path] = (st.st_size, st.st_mtime_ns)
+    return snapshot
+
+
+def open_watcher(folders, poll=False, poll_interval=POLL_INTERVAL):
+    """Начинает наблюдение за папками (inotify или опрос)"""
+    folders = [os.path.abspath(folder) for folder in folders]
+    watcher = {
+        'folders': folders,
+        'poll_interval': poll_interval,
+        'fd': None,
+        'watches': {},
+    }
+
+    inotify = None if poll else _inotify_init(folders)
+    if inotify is not None:
+        watcher['fd'], watcher['watches'] = inotify
+    else:
+        # Уже лежащие файлы считаются обработанными (их разбирает первый запуск)
+        snapshots = {folder: _snapshot(folder) for folder in folders}
+        watcher['snapshots'] = snapshots
+        watcher['reported'] = {folder: dict(snapshot) for folder, snapshot in snapshots.items()}
+
+    return watcher
+
+
+def close_watcher(watcher):
+    """Прекращает наблюдение"""
+    if watcher['fd'] is not None:
+        os.close(watcher['fd'])
+        watcher['fd'] = None
+
+
+def watcher_kind(watcher):
+    """Способ наблюдения: 'inotify' или 'poll'"""
+    return 'inotify' if watcher['fd'] is not None else 'poll'
+
+
+def _read_inotify(watcher, timeout):
+    """Ждёт события inotify до timeout секунд, возвращает {папка: {пути}}"""
+    changed = {}
+    ready, _, _ = select.select([watcher['fd']], [], [], timeout)
+    if not ready:
+        return changed
+
+    try:
+        buffer = os.read(watcher['fd'], 64 * 1024)
+    except BlockingIOError:
+        return changed
+
+    offset = 0
+    while offset < len(buffer):
+        wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+        offset += _EVENT_HEADER.size
+        name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+        offset += length
+
+        if mask & _IN_Q_OVERFLOW:
+            # Очередь переполнена — события потеряны, пересобираем все папки
+            for folder in watcher['folders']:
+                changed.setdefault(folder, set())
+            continue
+
+        folder = watcher['watches'].get(wd)
+        if folder is not None and is_watched_name(name):
+            changed.setdefault(folder, set()).add(os.path.join(folder, name))
+
+    return changed
+
+
+def _read_poll(watcher, timeout):
+    """Опрашивает папки (не чаще poll_interval), возвращает {папка: {пути}}"""
+    time.sleep(min(timeout, watcher['poll_interval']))
+
+    changed = {}
+    for folder in watcher['folders']:
+        current = _snapshot(folder)
+        previous = watcher['snapshots'][folder]
+        reported = watcher['reported'][folder]
+
+        # Готов — размер и mtime не менялись с прошлого опроса
+        for path, stat in current.items():
+            if stat == previous.get(path) and reported.get(path) != stat:
+                reported[path] = stat
+                changed.setdefault(folder, set()).add(path)
+
+        for path in list(reported):
+            if path not in current:
+                del reported[path]
+                changed.setdefault(folder, set()).add(path)
+
+        watcher['snapshots'][folder] = current
+
+    return changed
+
+
+def read_events(watcher, timeout):
+    """Ждёт готовые файлы до timeout секунд, возвращает {папка: {пути}}"""
+    if watcher['fd'] is not None:
+        return _read_inotify(watcher, timeout)
+    return _read_poll(watcher, timeout)
+
+
+def watch(watcher, on_batch, debounce=DEBOUNCE, max_delay=MAX_DELAY):
+    """Бесконечный цикл наблюдения: пачки готовых файлов передаются в on_batch
+    Пачка обрабатывается после debounce секунд без новых событий или через
+    max_delay после первого события. Прерывается KeyboardInterrupt.
+    """
+    pending = {}
+    first_event = last_event = None
+
+    while True:
+        if pending:
+            now = time.monotonic()
+            timeout = max(0.0, min(last_event + debounce, first_event + max_delay) - now)
+        else:
+            timeout = max_delay
+
+        changed = read_events(watcher, timeout)
+        now = time.monotonic()
+
+        for folder, paths in changed.items():
+            # Посторонние txt (не уведомления МСЭ) не запускают разбор
+            paths = {path for path in paths if is_notice_file(path)}
+            if not paths and changed[folder]:
+                continue
+            pending.setdefault(folder, set()).update(paths)
+            if first_event is None:
+                first_event = now
+            last_event = now
+
+        if pending and (now - last_event >= debounce or now - first_event >= max_delay):
+            batch = {folder: sorted(paths) for folder, paths in pending.items()}
+            pending = {}
+            first_event = last_event = None
+            on_batch(batch)
@@ -0,0 +1,249 @@
+"""
+Проверка координации: пересечения частот входящих (иностранных) и исходящих
+(UZB) присвоений РРЛ.
+
+Каждое присвоение — интервал частот: t_freq_assgn ± ширина полосы/2 (ширина
+из обозначения t_bdwdth_cde: 28M0 — 28 МГц, 200K — 0,2 МГц, 1M25 — 1,25 МГц).
+Пересечения ищутся одним проходом по интервалам, отсортированным по нижней
+границе (sweep): у каждой стороны — множество открытых интервалов и куча их
+верхних границ, закрытые интервалы снимаются по мере продвижения. Время —
+O(n log n + число пересечений), без сравнения всех пар.
+
+С --conflict-distance пара считается конфликтом, только если станции ближе
+заданного расстояния (присвоения без координат остаются в списке). Тогда
+кандидаты берутся из пространственного индекса входящих станций
+(station_grid), и пересечение частот проверяется только для соседей. Результат —
+лист «Конфликты» реестра ВХОДЯЩИЕ РРЛ:
+
+    sheets.append(conflict_sheet(incoming_batches, outgoing_batches, max_distance))
+"""
+import heapq
+import re
+
+from notice_index import letter_number
+from station_columns import numbers_column
+from station_grid import distance_km, open_spatial_index, positions_within, station_points
+
+CONFLICT_SHEET_NAME = "Конфликты"
+
+# Строк данных на листе: openpyxl строит лист в памяти, а без ограничения по
+# расстоянию пар может быть миллионы (остальные конфликты только считаются)
+MAX_CONFLICT_ROWS = 100000
+
+# Множители обозначения ширины полосы (буква — десятичная точка) в МГц
+_BANDWIDTH_SCALE = {'H': 1e-6, 'K': 1e-3, 'M': 1.0, 'G': 1e3}
+_BANDWIDTH_CODE = re.compile(r'(\d*)([HKMG])(\d*)')
+
+# Оформление листа конфликтов
+CONFLICT_LAYOUT = {
+    'title': "Пересечения частот входящих присвоений РРЛ с исходящими (UZB)",
+    'title_range': 'A1:M1',
+    'groups': [
+        ('B2:F2', "Входящее присвоение"),
+        ('G2:J2', "Исходящее присвоение (UZB)"),
+    ],
+    'headers': [
+        "№",
+        "Администрация",
+        "Пункт установки",
+        "Частота, МГц",
+        "Ширина\nполосы",
+        "№ входящего\nписьма",
+        "Пункт установки",
+        "Частота, МГц",
+        "Ширина\nполосы",
+        "id1",
+        "Перекрытие,\nМГц",
+        "Расстояние,\nкм",
+        "t_adm_ref_id\n(входящее)",
+    ],
+    'column_widths': [8, 15, 20, 12, 10, 18, 20, 12, 10, 15, 12, 12, 18],
+    'row_heights': {1: 30, 2: 30, 3: 40},
+}
+
+
+def add_conflict_arguments(parser):
+    """Добавляет в argparse опции --conflicts и --conflict-distance"""
+    parser.add_argument(
+        '--conflicts',
+        action='store_true',
+        help=f"добавить лист «{CONFLICT_SHEET_NAME}» — пересечения частот входящих и исходящих РРЛ"
+    )
+    parser.add_argument(
+        '--conflict-distance',
+        type=float,
+        default=None,
+        metavar='KM',
+        help="учитывать только станции ближе KM километров (по умолчанию — без ограничения)"
+    )
+
+
+def bandwidth_mhz(code):
+    """Ширина полосы в МГц из обозначения t_bdwdth_cde (28M0, 200K, 1M25) или None"""
+    match = _BANDWIDTH_CODE.fullmatch((code or '').strip().upper())
+    if not match:
+        return None
+    integer, unit, fraction = match.groups()
+    if not integer and not fraction:
+        return None
+    return float(f"{integer or 0}.{fraction or 0}") * _BANDWIDTH_SCALE[unit]
+
+
+def frequency_intervals(stations):
+    """Интервалы частот присвоений: [(нижняя, верхняя, номер станции)]
+    Присвоения без частоты или ширины полосы пропускаются.
+    """
+    frequencies = numbers_column([station.get('t_freq_assgn') for station in stations])
+    intervals = []
+    for index, (station, frequency) in enumerate(zip(stations, frequencies)):
+        bandwidth = bandwidth_mhz(station.get('t_bdwdth_cde'))
+        if not isinstance(frequency, (int, float)) or not bandwidth:
+            continue
+        intervals.append((frequency - bandwidth / 2, frequency + bandwidth / 2, index))
+    return intervals
+
+
+def sweep_overlaps(incoming, outgoing):
+    """Пары пересекающихся интервалов (номер входящего, номер исходящего)
+    incoming, outgoing: [(нижняя, верхняя, номер)]; касание границ — не пересечение.
+    """
+    events = sorted(
+        [(low, high, 0, index) for low, high, index in incoming]
+        + [(low, high, 1, index) for low, high, index in outgoing]
+    )
+    active = ({}, {})
+    expiry = ([], [])
+
+    for low, high, side, index in events:
+        # Снимаем интервалы другой стороны, закончившиеся до начала текущего
+        other = 1 - side
+        heap = expiry[other]
+        while heap and heap[0][0] <= low:
+            _, expired = heapq.heappop(heap)
+            del active[other][expired]
+
+        for other_index in active[other]:
+            yield (index, other_index) if side == 0 else (other_index, index)
+
+        active[side][index] = high
+        heapq.heappush(expiry[side], (high, index))
+
+
+def nearby_overlaps(incoming, outgoing, incoming_stations, incoming_points, outgoing_points, max_distance):
+    """Пары пересекающихся интервалов станций не дальше max_distance:
+    (номер входящего, номер исходящего, расстояние); станции без координат — без
+    ограничения по расстоянию (расстояние None)
+    """
+    incoming_bounds = {index: (low, high) for low, high, index in incoming}
+    incoming_located = [(low, high, index) for low, high, index in incoming if incoming_points[index]]
+    incoming_unlocated = [(low, high, index) for low, high, index in incoming if not incoming_points[index]]
+    outgoing_located = [(low, high, index) for low, high, index in outgoing if outgoing_points[index]]
+    outgoing_unlocated = [(low, high, index) for low, high, index in outgoing if not outgoing_points[index]]
+
+    # Индекс только по входящим станциям с частотой: позиция в индексе → номер станции
+    index = open_spatial_index(incoming_stations[station_index] for _, _, station_index in incoming_located)
+    located_indexes = [station_index for _, _, station_index in incoming_located]
+
+    pairs = []
+    for low, high, outgoing_index in outgoing_located:
+        for distance, position in positions_within(index, outgoing_points[outgoing_index], max_distance):
+            incoming_index = located_indexes[position]
+            incoming_low, incoming_high = incoming_bounds[incoming_index]
+            if incoming_low < high and low < incoming_high:
+                pairs.append((incoming_index, outgoing_index, distance))
+
+    # Пары, где у одной из станций нет координат
+    for incoming_index, outgoing_index in sweep_overlaps(incoming_unlocated, outgoing):
+        pairs.append((incoming_index, outgoing_index, None))
+    for incoming_index, outgoing_index in sweep_overlaps(incoming_located, outgoing_unlocated):
+        pairs.append((incoming_index, outgoing_index, None))
+
+    # Порядок как у прохода по частотам: по нижней границе входящего интервала
+    pairs.sort(key=lambda pair: (incoming_bounds[pair[0]], pair[0], pair[1]))
+    return pairs
+
+
+def _pair_distance(point_a, point_b):
+    """Расстояние между станциями в км или None, если у какой-то нет координат"""
+    if point_a and point_b:
+        return distance_km(point_a, point_b)
+    return None
+
+
+def find_conflicts(incoming_stations, outgoing_stations, max_distance=None, limit=MAX_CONFLICT_ROWS):
+    """Конфликты частот по столбцам: {'incoming', 'outgoing', 'overlap', 'distance'}
+    (станции пары, перекрытие в МГц, расстояние в км или None) и общее число конфликтов.
+    Сохраняются первые limit конфликтов, остальные только считаются.
+    """
+    incoming = frequency_intervals(incoming_stations)
+    outgoing = frequency_intervals(outgoing_stations)
+    incoming_bounds = {index: (low, high) for low, high, index in incoming}
+    outgoing_bounds = {index: (low, high) for low, high, index in outgoing}
+    incoming_points = station_points(incoming_stations)
+    outgoing_points = station_points(outgoing_stations)
+
+    skipped = len(incoming_stations) + len(outgoing_stations) - len(incoming) - len(outgoing)
+    if skipped:
+        print(f"  ⚠️  Без частоты или ширины полосы (не проверены): {skipped}")
+
+    if max_distance is None:
+        pairs = (
+            (incoming_index, outgoing_index, _pair_distance(incoming_points[incoming_index], outgoing_points[outgoing_index]))
+            for incoming_index, outgoing_index in sweep_overlaps(incoming, outgoing)
+        )
+    else:
+        pairs = nearby_overlaps(incoming, outgoing, incoming_stations, incoming_points, outgoing_points, max_distance)
+
+    conflicts = {'incoming': [], 'outgoing': [], 'overlap': [], 'distance': []}
+    count = 0
+    for incoming_index, outgoing_index, distance in pairs:
+        count += 1
+        if count > limit:
+            continue
+
+        incoming_low, incoming_high = incoming_bounds[incoming_index]
+        outgoing_low, outgoing_high = outgoing_bounds[outgoing_index]
+        conflicts['incoming'].append(incoming_stations[incoming_index])
+        conflicts['outgoing'].append(outgoing_stations[outgoing_index])
+        conflicts['overlap'].append(min(incoming_high, outgoing_high) - max(incoming_low, outgoing_low))
+        conflicts['distance'].append(distance)
+
+    return conflicts, count
+
+
+def build_conflict_columns(batch):
+    """Формирует столбцы листа конфликтов для пакета find_conflicts"""
+    incoming = batch['incoming']
+    outgoing = batch['outgoing']
+
+    return [
+        list(range(1, len(incoming) + 1)),  # №
+        [station.get('t_adm', '') for station in incoming],  # Администрация
+        [station.get('t_site_name', '') for station in incoming],  # Пункт установки
+        numbers_column([station.get('t_freq_assgn') for station in incoming]),  # Частота
+        [station.get('t_bdwdth_cde', '') for station in incoming],  # Ширина полосы
+        [letter_number(station) for station in incoming],  # № входящего письма
+        [station.get('t_site_name', '') for station in outgoing],  # Пункт установки (UZB)
+        numbers_column([station.get('t_freq_assgn') for station in outgoing]),  # Частота (UZB)
+        [station.get('t_bdwdth_cde', '') for station in outgoing],  # Ширина полосы (UZB)
+        [station.get('t_adm_ref_id', '') for station in outgoing],  # id1
+        [round(overlap, 6) for overlap in batch['overlap']],  # Перекрытие
+        [None if distance is None else round(distance, 1) for distance in batch['distance']],  # Расстояние
+        [station.get('t_adm_ref_id', '') for station in incoming],  # t_adm_ref_id входящего
+    ]
+
+
+def conflict_sheet(incoming_batches, outgoing_batches, max_distance=None):
+    """Описывает лист конфликтов для записи: (имя листа, оформление, пакет по столбцам, build_columns)
+    incoming_batches, outgoing_batches: [(исходный файл, лист, станции), ...]
+    """
+    incoming_stations = [station for _, _, stations in incoming_batches for station in stations]
+    outgoing_stations = [station for _, _, stations in outgoing_batches for station in stations]
+    conflicts, count = find_conflicts(incoming_stations, outgoing_stations, max_distance)
+
+    limit = f" (ближе {max_distance:g} км)" if max_distance is not None else ""
+    print(f"📡 Конфликтов частот{limit}: {count}")
+    if count > MAX_CONFLICT_ROWS:
+        print(f"  ⚠️  На лист попали первые {MAX_CONFLICT_ROWS} — задайте --conflict-distance")
+
+    return (CONFLICT_SHEET_NAME, CONFLICT_LAYOUT, conflicts, build_conflict_columns)
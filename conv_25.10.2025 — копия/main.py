@@ -6,19 +6,114 @@
  2 — rrl_outgoing_parser.py
  3 — спс_incoming_parser.py
  4 — спс_outgoing_parser.py
+ 5 — rrl_combined_parser.py (ВХОДЯЩИЕ и ИСХОДЯЩИЕ РРЛ за один разбор папки)
 
 После запуска меню позволяет выбирать скрипт, запускает его тем же интерпретатором
 (sys.executable). По завершении возвращается в меню.
+
+Пакетный запуск без меню и вопросов (например, по расписанию) — парсеры
+выполняются в этом же процессе, по очереди:
+
+    python main.py run --input DIR --output DIR --parsers rrl-in,rrl-out,sps-in,sps-out
+
+Станции всех запусков записываются в базу SQLite (station_store); реестры
+можно собрать заново из базы, не читая txt файлы:
+
+    python main.py export --output DIR --parsers rrl-in,sps-in --format xlsx,csv
+
+Режим наблюдения: папки разбираются сразу и затем при каждом появлении
+новых файлов T11/T12/T13 (после окончания записи, пачками); у папки можно
+задать свои парсеры через "=", реестр каждой папки пересоздаётся. С
+--output реестры каждой папки пишутся в свою подпапку (DIR/rrl, DIR/sps),
+чтобы одноимённые реестры разных папок не затирали друг друга:
+
+    python main.py watch --input /data/rrl=rrl --input /data/sps=sps-in,sps-out --output DIR
+
+Если выбраны и rrl-in, и rrl-out, они выполняются одним совместным запуском
+(rrl): каждый файл разбирается один раз и направляется в реестр по t_adm.
+Только этот запуск видит обе стороны, поэтому с --conflicts в реестр
+ВХОДЯЩИЕ РРЛ добавляется лист пересечений частот с исходящими (UZB), а с
+--proximity в реестр ИСХОДЯЩИЕ РРЛ — лист ближайших входящих станций:
+
+    python main.py run --input DIR --output DIR --parsers rrl --conflicts --conflict-distance 100
+    python main.py run --input DIR --output DIR --parsers rrl --proximity --proximity-distance 30
+
+С --border FILE (GeoJSON или WKT) входящие реестры (rrl-in, sps-in, rrl)
+получают расстояние станций до границы и отметку зоны координации, а с
+--border-filter — только станции внутри зоны:
+
+    python main.py run --input DIR --output DIR --border uzb.geojson --border-distance 100 --border-filter
+
+Каждый парсер печатает время этапов (разбор, связывание, запись листов...) и
+скорость разбора; с --stats отчёт сохраняется в <реестр>_stats.json рядом
+с реестром — для сравнения производительности между версиями:
+
+    python main.py run --input DIR --output DIR --stats
+
+Если запуск вдруг стал медленнее или не хватает памяти: --profile сохраняет
+профиль cProfile каждого парсера (<парсер>_<время>.prof рядом с реестрами),
+--trace-memory печатает пик памяти и места наибольших выделений (tracemalloc).
+Оба режима видят только основной процесс — разбор смотрите с -j 1:
+
+    python main.py run --input DIR --output DIR --parsers rrl -j 1 --profile --trace-memory
+
+Код завершения ненулевой, если хотя бы один парсер завершился с ошибкой.
 """
+import argparse
+import importlib
 import subprocess
 import sys
 import os
+import time
+import traceback
+from datetime import datetime
+
+from border_zone import add_border_arguments, border_for_run
+from excel_writer import add_write_only_argument
+from folder_watcher import add_watch_arguments, close_watcher, open_watcher, watch, watcher_kind
+from frequency_conflicts import add_conflict_arguments
+from output_writers import add_format_argument, write_outputs
+from parallel import add_jobs_argument
+from parse_cache import add_cache_arguments, cache_for_run
+from run_profile import add_profile_arguments, profile_run
+from run_stats import add_stats_argument
+from station_grid import add_proximity_arguments
+from station_links import add_chains_argument
+from station_store import add_db_arguments, db_for_run, load_register, DEFAULT_DB_PATH
 
 FILES = {
     "1": "rrl_incoming_parser.py",
     "2": "rrl_outgoing_parser.py",
     "3": "спс_incoming_parser.py",
     "4": "спс_outgoing_parser.py",
+    "5": "rrl_combined_parser.py",
+}
+
+# Парсеры для пакетного запуска: имя -> модуль
+PARSERS = {
+    "rrl-in": "rrl_incoming_parser",
+    "rrl-out": "rrl_outgoing_parser",
+    "sps-in": "спс_incoming_parser",
+    "sps-out": "спс_outgoing_parser",
+    "rrl": "rrl_combined_parser",
+}
+
+# Парсеры пакетного запуска по умолчанию
+DEFAULT_PARSERS = ["rrl-in", "rrl-out", "sps-in", "sps-out"]
+
+# Парсеры РРЛ, умеющие добавлять лист цепочек связанных станций (--chains)
+CHAIN_PARSERS = ("rrl-in", "rrl-out", "rrl")
+
+# Парсеры, видящие входящие и исходящие РРЛ за один запуск: листы конфликтов
+# частот (--conflicts) и соседних станций (--proximity)
+CONFLICT_PARSERS = ("rrl",)
+
+# Парсеры входящих реестров: расстояние до границы и зона координации (--border)
+BORDER_PARSERS = ("rrl-in", "sps-in", "rrl")
+
+# Парсеры, которые при совместном выборе заменяются одним общим запуском
+COMBINED_PARSERS = {
+    "rrl": ("rrl-in", "rrl-out"),
 }
 
 MENU = '''
@@ -27,6 +122,7 @@ MENU = '''
  2 — RRL Outgoing Parser
  3 — СПС Incoming Parser
  4 — СПС Outgoing Parser
+ 5 — RRL Incoming + Outgoing (один разбор папки)
  0 — Выход
 '''
 
@@ -45,20 +141,324 @@ def run_script(path):
         return -1
 
 
-def main():
+def parse_parsers(value):
+    """Разбирает значение --parsers: имена парсеров через запятую"""
+    names = []
+    for name in value.split(','):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in PARSERS:
+            raise argparse.ArgumentTypeError(
+                f"неизвестный парсер: {name} (доступны: {', '.join(PARSERS)})"
+            )
+        if name not in names:
+            names.append(name)
+
+    if not names:
+        raise argparse.ArgumentTypeError("не задан ни один парсер")
+    return names
+
+
+def parse_watch_input(value):
+    """Разбирает значение --input режима watch: папка или папка=парсеры"""
+    folder, sep, names = value.rpartition('=')
+    if not sep or not folder:
+        return value, None
+    return folder, parse_parsers(names)
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки (без аргументов — интерактивное меню)"""
+    parser = argparse.ArgumentParser(description="Лаунчер парсеров РРЛ и СПС")
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help="пакетный запуск парсеров без меню")
+    run_parser.add_argument('--input', required=True, help="папка с .txt файлами")
+    run_parser.add_argument('--output', help="папка для результатов (по умолчанию — папка --input)")
+    run_parser.add_argument(
+        '--parsers',
+        type=parse_parsers,
+        default=list(DEFAULT_PARSERS),
+        help=f"парсеры через запятую: {', '.join(PARSERS)} (по умолчанию {','.join(DEFAULT_PARSERS)})"
+    )
+    add_jobs_argument(run_parser)
+    add_format_argument(run_parser)
+    add_write_only_argument(run_parser)
+    add_cache_arguments(run_parser)
+    add_db_arguments(run_parser)
+    add_chains_argument(run_parser)
+    add_conflict_arguments(run_parser)
+    add_proximity_arguments(run_parser)
+    add_border_arguments(run_parser)
+    add_stats_argument(run_parser)
+    add_profile_arguments(run_parser)
+
+    watch_parser = subparsers.add_parser('watch', help="следить за папками и разбирать новые файлы по мере поступления")
+    watch_parser.add_argument(
+        '--input',
+        required=True,
+        action='append',
+        type=parse_watch_input,
+        help="папка с .txt файлами, можно несколько раз; папка=парсеры задаёт свои парсеры"
+    )
+    watch_parser.add_argument('--output', help="папка для результатов (по умолчанию — каждая папка --input)")
+    watch_parser.add_argument(
+        '--parsers',
+        type=parse_parsers,
+        default=list(DEFAULT_PARSERS),
+        help=f"парсеры для папок без своего списка (по умолчанию {','.join(DEFAULT_PARSERS)})"
+    )
+    add_watch_arguments(watch_parser)
+    add_jobs_argument(watch_parser)
+    add_format_argument(watch_parser)
+    add_write_only_argument(watch_parser)
+    add_cache_arguments(watch_parser)
+    add_db_arguments(watch_parser)
+    add_chains_argument(watch_parser)
+    add_conflict_arguments(watch_parser)
+    add_proximity_arguments(watch_parser)
+    add_border_arguments(watch_parser)
+    add_stats_argument(watch_parser)
+    add_profile_arguments(watch_parser)
+
+    export_parser = subparsers.add_parser('export', help="собрать реестры из базы станций без разбора txt")
+    export_parser.add_argument('--output', required=True, help="папка для реестров")
+    export_parser.add_argument(
+        '--db',
+        dest='db_path',
+        default=DEFAULT_DB_PATH,
+        help=f"база SQLite со станциями (по умолчанию {DEFAULT_DB_PATH})"
+    )
+    export_parser.add_argument(
+        '--parsers',
+        type=parse_parsers,
+        default=list(DEFAULT_PARSERS),
+        help=f"реестры через запятую: {', '.join(PARSERS)} (по умолчанию {','.join(DEFAULT_PARSERS)})"
+    )
+    add_format_argument(export_parser)
+    add_write_only_argument(export_parser)
+
+    return parser.parse_args(argv)
+
+
+def combine_parsers(names):
+    """Заменяет парсеры, выбранные вместе, их совместным запуском (на месте первого из них)"""
+    names = list(names)
+    for combined, parts in COMBINED_PARSERS.items():
+        if all(part in names for part in parts):
+            position = min(names.index(part) for part in parts)
+            names = [name for name in names if name not in parts]
+            if combined not in names:
+                names.insert(position, combined)
+    return names
+
+
+def split_parsers(names):
+    """Заменяет совместные запуски их составными парсерами"""
+    result = []
+    for name in names:
+        for part in COMBINED_PARSERS.get(name, (name,)):
+            if part not in result:
+                result.append(part)
+    return result
+
+
+def run_parsers(parsers, input_folder, args, cache, db, border=None, output_folder=None):
+    """Выполняет парсеры по папке в текущем процессе
+    border: граница зоны координации (border_zone.border_for_run) или None
+    output_folder: папка для реестров (по умолчанию --output, без него — input_folder)
+    Возвращает (созданные файлы, парсеры, завершившиеся с ошибкой)
+    """
+    output_files = []
+    failed = []
+    output_folder = output_folder or args.output
+
+    for name in parsers:
+        print(f"\n▶ {name}: {PARSERS[name]}")
+        # Лист цепочек есть только у парсеров РРЛ
+        options = {'chains': True} if args.chains and name in CHAIN_PARSERS else {}
+        # Листы конфликтов и соседних станций — только у совместного парсера РРЛ
+        if args.conflicts and name in CONFLICT_PARSERS:
+            options.update(conflicts=True, conflict_distance=args.conflict_distance)
+        if args.proximity and name in CONFLICT_PARSERS:
+            options.update(proximity=True, proximity_distance=args.proximity_distance)
+        # Зона координации — у входящих реестров
+        if border is not None and name in BORDER_PARSERS:
+            options['border'] = border
+        if args.save_stats:
+            options['save_stats'] = True
+        try:
+            module = importlib.import_module(PARSERS[name])
+            with profile_run(name, output_folder or input_folder, args.profile, args.trace_memory):
+                output_files += module.run(input_folder, output_folder, args.jobs, args.formats, args.write_only, cache, db, **options)
+        except Exception as e:
+            traceback.print_exc()
+            print(f"❌ {name}: {e}")
+            failed.append(name)
+
+    return output_files, failed
+
+
+def run_batch(args):
+    """Запускает выбранные парсеры в текущем процессе, возвращает код завершения"""
+    parsers = combine_parsers(args.parsers)
+
+    # Один кэш на все парсеры (записи различаются по модулю парсера)
+    cache = cache_for_run(args.input, args.cache_dir, args.use_cache, args.cache_size)
+    db = db_for_run(args.db_path, args.use_db)
+    try:
+        border = border_for_run(args.border, args.border_distance, args.border_filter)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    _, failed = run_parsers(parsers, args.input, args, cache, db, border)
+
+    if failed:
+        print(f"\n❌ Завершились с ошибкой: {', '.join(failed)}")
+        return 1
+
+    print(f"\n✅ Все парсеры выполнены: {', '.join(parsers)}")
+    return 0
+
+
+def watch_output_folders(folders, output):
+    """Папки реестров для наблюдаемых папок: {папка: подпапка output по имени папки}
+    Без output — {папка: None} (реестры пишутся в саму папку). Одинаковые имена
+    папок получают суффиксы _2, _3...
+    """
+    if not output:
+        return {folder: None for folder in folders}
+
+    result = {}
+    taken = set()
+    for folder in folders:
+        name = os.path.basename(folder.rstrip(os.sep)) or 'input'
+        candidate = name
+        number = 1
+        while candidate.lower() in taken:
+            number += 1
+            candidate = f"{name}_{number}"
+        taken.add(candidate.lower())
+        result[folder] = os.path.join(output, candidate)
+    return result
+
+
+def run_watch(args):
+    """Следит за папками и разбирает их заново при появлении новых файлов
+    Каждый пересбор разбирает только новые и изменённые файлы (кэш) и заменяет
+    реестры папки от предыдущего пересбора. Работает до Ctrl+C.
+    """
+    folders = {}
+    for folder, parsers in args.input:
+        folder = os.path.abspath(folder)
+        if not os.path.isdir(folder):
+            print(f"❌ Папка не найдена: {folder}")
+            return 1
+        folders[folder] = combine_parsers(parsers or args.parsers)
+
+    db = db_for_run(args.db_path, args.use_db)
+    try:
+        border = border_for_run(args.border, args.border_distance, args.border_filter)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    # Кэш открывается один раз на папку и живёт весь сеанс
+    caches = {
+        folder: cache_for_run(folder, args.cache_dir, args.use_cache, args.cache_size)
+        for folder in folders
+    }
+    if args.cache_dir and caches:
+        # Общая папка кэша — один словарь кэша, иначе индексы затрут друг друга
+        shared_cache = next(iter(caches.values()))
+        caches = {folder: shared_cache for folder in folders}
+
+    # У каждой папки своя папка реестров: одноимённые реестры с одной секундой в имени не совпадут
+    output_folders = watch_output_folders(folders, args.output)
+
+    # Реестры последнего пересбора каждой папки
+    latest_files = {}
+
+    def rebuild(folder):
+        started = time.monotonic()
+        output_files, failed = run_parsers(
+            folders[folder], folder, args, caches[folder], db, border, output_folders[folder]
+        )
+
+        # Предыдущие реестры папки заменяются новыми; файлы, которые числятся и за
+        # другой папкой, не удаляются
+        others = {path for other, paths in latest_files.items() if other != folder for path in paths}
+        for path in latest_files.get(folder, []):
+            if path not in output_files and path not in others and os.path.exists(path):
+                os.remove(path)
+        latest_files[folder] = output_files
+
+        if failed:
+            print(f"\n❌ {folder}: завершились с ошибкой: {', '.join(failed)}")
+        else:
+            print(f"\n✅ {folder}: реестры обновлены за {time.monotonic() - started:.1f} с")
+
+    def on_batch(batch):
+        for folder, paths in batch.items():
+            print(f"\n📥 {folder}: новых или изменённых файлов: {len(paths)}")
+            for path in paths:
+                print(f"  • {os.path.basename(path)}")
+            rebuild(folder)
+
+    # Наблюдение начинается до первого разбора, чтобы не пропустить файлы, пришедшие во время него
+    watcher = open_watcher(list(folders), args.poll, args.poll_interval)
+    try:
+        for folder in folders:
+            rebuild(folder)
+
+        print(f"\n👀 Наблюдение ({watcher_kind(watcher)}) за папками: {', '.join(folders)}. Ctrl+C — выход")
+        watch(watcher, on_batch, args.debounce)
+    except KeyboardInterrupt:
+        print("\nНаблюдение остановлено.")
+    finally:
+        close_watcher(watcher)
+
+    return 0
+
+
+def run_export(args):
+    """Собирает реестры из базы станций, возвращает код завершения"""
+    if not os.path.exists(args.db_path):
+        print(f"❌ База не найдена: {args.db_path}")
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+    for name in split_parsers(args.parsers):
+        module = importlib.import_module(PARSERS[name])
+        data_by_sheet = load_register(args.db_path, module.STORE_REGISTER)
+        print(f"\n▶ {name}: {sum(len(data) for data in data_by_sheet.values())} станций из базы")
+
+        output_base = os.path.join(args.output, f"{module.OUTPUT_NAME}_{timestamp}")
+        write_outputs(module.build_sheets(data_by_sheet), output_base, args.formats, args.write_only)
+
+    print(f"\n✅ Реестры собраны из базы: {args.db_path}")
+    return 0
+
+
+def run_menu():
+    """Интерактивное меню выбора парсера"""
     # Рабочая директория — та, в которой лежит main.py
     os.chdir(os.path.dirname(os.path.abspath(__file__)) or os.getcwd())
 
     while True:
         print(MENU)
-        choice = input("Введите номер (0-4): ").strip()
+        choice = input("Введите номер (0-5): ").strip()
 
         if choice in ("0", "q", "quit", "exit"):
             print("Выход. До встречи!")
             break
 
         if choice not in FILES:
-            print("Неверный ввод — введите 0,1,2,3 или 4.")
+            print("Неверный ввод — введите 0,1,2,3,4 или 5.")
             continue
 
         script_name = FILES[choice]
@@ -78,5 +478,20 @@ def main():
         input("Нажмите Enter, чтобы вернуться в меню...")
 
 
+def main(argv=None):
+    """Основная функция"""
+    args = parse_args(argv)
+
+    if args.command == 'run':
+        return run_batch(args)
+    if args.command == 'watch':
+        return run_watch(args)
+    if args.command == 'export':
+        return run_export(args)
+
+    run_menu()
+    return 0
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Индекс уже поданных уведомлений РРЛ: распознаёт повторную подачу и дубликаты.
+
+Уведомление узнаётся по двум ключам: отпечатку содержимого (хэш всех
+разобранных полей, кроме реквизитов письма t_d_sent/t_d_adm_ntc) и
+t_adm + t_adm_ref_id + пункту установки. Для каждого ключа индекс хранит самый ранний номер
+письма (t_d_sent/t_d_adm_ntc), поэтому проверка станции — поиск в словаре.
+
+Если у станции номер письма отличается от самого раннего, это повторная
+подача: ранний номер идёт в столбец «первичное», текущий — в «повторное»
+(поле 'repeat_of' станции). Одинаковые уведомления с тем же номером письма
+из разных файлов одного запуска отбрасываются, остаётся первое.
+
+Индекс прошлых запусков хранится в базе станций (таблица notices):
+
+    batches = mark_repeats(db_path, 'rrl_incoming', [(source_file, sheet, stations), ...])
+"""
+import hashlib
+from datetime import datetime
+
+from station_store import connect
+
+# Поля, не входящие в отпечаток: реквизиты письма и вычисляемые при связывании
+_LETTER_FIELDS = ('t_d_sent', 't_d_adm_ntc')
+_DERIVED_FIELDS = ('freq_rx', 'repeat_of')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS notices (
+    register TEXT NOT NULL,
+    key TEXT NOT NULL,
+    letter_number TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (register, key)
+);
+'''
+
+_UPSERT = (
+    "INSERT INTO notices (register, key, letter_number, updated_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (register, key) DO UPDATE SET "
+    "letter_number = excluded.letter_number, updated_at = excluded.updated_at "
+    "WHERE excluded.letter_number < letter_number"
+)
+
+
+def letter_number(data):
+    """Номер письма уведомления: t_d_sent/t_d_adm_ntc (или то из них, что есть)"""
+    d_sent = data.get('t_d_sent', '')
+    d_adm_ntc = data.get('t_d_adm_ntc', '')
+    if d_sent and d_adm_ntc:
+        return f"{d_sent}/{d_adm_ntc}"
+    return d_sent or d_adm_ntc
+
+
+def notice_fingerprint(data):
+    """Отпечаток содержимого уведомления без реквизитов письма"""
+    skip = _LETTER_FIELDS + _DERIVED_FIELDS
+    content = sorted((key, value) for key, value in data.items() if key not in skip)
+    return hashlib.blake2b(repr(content).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def notice_keys(data):
+    """Ключи индекса для станции: отпечаток и (если есть) t_adm + t_adm_ref_id
+    Идентификатор администрации сверяется вместе с пунктом установки: при повторной
+    подаче параметры станции могут измениться, а место — нет.
+    """
+    keys = ['fp:' + notice_fingerprint(data)]
+    ref_id = data.get('t_adm_ref_id', '')
+    if ref_id:
+        keys.append(f"ref:{data.get('t_adm', '')}:{ref_id}:{data.get('t_site_name', '')}")
+    return keys
+
+
+def load_index(db_path, register):
+    """Читает индекс прошлых запусков: {ключ: самый ранний номер письма}"""
+    conn = connect(db_path)
+    try:
+        conn.executescript(_SCHEMA)
+        cursor = conn.execute("SELECT key, letter_number FROM notices WHERE register = ?", (register,))
+        return dict(cursor)
+    finally:
+        conn.close()
+
+
+def save_index(db_path, register, index):
+    """Записывает ключи индекса в базу; для каждого ключа остаётся самый ранний номер письма"""
+    updated_at = datetime.now().isoformat(timespec='seconds')
+
+    conn = connect(db_path)
+    try:
+        conn.executescript(_SCHEMA)
+        with conn:
+            conn.executemany(
+                _UPSERT,
+                ((register, key, number, updated_at) for key, number in index.items())
+            )
+    finally:
+        conn.close()
+
+
+def mark_repeats(db_path, register, batches):
+    """Отмечает повторно поданные уведомления и убирает дубликаты из разных файлов
+    batches: [(исходный файл, лист, список станций), ...] в порядке разбора
+    db_path=None — индекс только по текущему запуску, без прошлых.
+    Возвращает batches без дубликатов (станции повторной подачи получают 'repeat_of').
+    """
+    index = load_index(db_path, register) if db_path else {}
+    changed = {}
+
+    # Первый проход: самый ранний номер письма по каждому ключу (прошлые запуски + этот)
+    station_keys = []
+    for _, _, stations in batches:
+        keys_list = []
+        for data in stations:
+            number = letter_number(data)
+            keys = notice_keys(data) if number else []
+            for key in keys:
+                earliest = index.get(key)
+                if earliest is None or number < earliest:
+                    index[key] = changed[key] = number
+            keys_list.append((number, keys))
+        station_keys.append(keys_list)
+
+    # Второй проход: дубликаты и повторная подача
+    first_file = {}
+    result = []
+    repeats_count = 0
+    duplicates_count = 0
+    for (source_file, sheet, stations), keys_list in zip(batches, station_keys):
+        kept = []
+        for data, (number, keys) in zip(stations, keys_list):
+            if keys:
+                # Тот же отпечаток и тот же номер письма в другом файле — дубликат
+                if first_file.setdefault((keys[0], number), source_file) != source_file:
+                    duplicates_count += 1
+                    continue
+
+                primary = min(index[key] for key in keys)
+                if primary != number:
+                    data['repeat_of'] = primary
+                    repeats_count += 1
+            kept.append(data)
+        result.append((source_file, sheet, kept))
+
+    if db_path and changed:
+        save_index(db_path, register, changed)
+
+    if repeats_count or duplicates_count:
+        print(f"🔁 Повторная подача: {repeats_count} станций, удалено дубликатов: {duplicates_count}")
+
+    return result
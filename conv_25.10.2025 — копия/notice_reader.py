@@ -0,0 +1,170 @@
+"""
+Потоковое чтение txt файлов в формате МСЭ (<HEAD> ... <NOTICE> ... </NOTICE> ...).
+
+Файл читается кусками фиксированного размера, блоки NOTICE выдаются по одному,
+поэтому в памяти одновременно находится только текущий кусок и текущий блок,
+независимо от размера файла:
+
+    with open_notices(file_path) as (head_data, notice_blocks):
+        for notice in notice_blocks:
+            ...
+
+Секция HEAD читается небольшими кусками (HEAD_CHUNK_SIZE) до </HEAD>, поэтому
+проверка t_adm обходится первыми килобайтами файла.
+
+Текст каждого блока совпадает с тем, что возвращал
+re.findall(r'<NOTICE>(.*?)</NOTICE>', content, re.DOTALL).
+
+Для параллельного разбора одного большого файла split_notice_ranges делит его
+на диапазоны байтов, каждый из которых заканчивается сразу после </NOTICE>;
+iter_notice_range читает блоки только своего диапазона.
+"""
+import io
+import os
+import re
+from contextlib import contextmanager
+
+# Размер куска чтения (в символах)
+CHUNK_SIZE = 1024 * 1024
+
+# Размер куска чтения секции HEAD (в символах)
+HEAD_CHUNK_SIZE = 4 * 1024
+
+# Примерный размер диапазона файла для параллельного разбора (в байтах)
+RANGE_SIZE = 8 * 1024 * 1024
+
+NOTICE_OPEN = '<NOTICE>'
+NOTICE_CLOSE = '</NOTICE>'
+HEAD_OPEN = '<HEAD>'
+HEAD_CLOSE = '</HEAD>'
+
+
+def parse_head_section(content):
+    """Извлекает данные из секции HEAD"""
+    head_data = {}
+    head_match = re.search(r'<HEAD>(.*?)</HEAD>', content, re.DOTALL)
+
+    if head_match:
+        head_content = head_match.group(1)
+
+        # Извлекаем t_adm (страна)
+        adm_match = re.search(r't_adm\s*=\s*(.+)', head_content)
+        if adm_match:
+            head_data['t_adm'] = adm_match.group(1).strip()
+
+        # Извлекаем t_d_sent (дата отправки)
+        sent_match = re.search(r't_d_sent\s*=\s*(.+)', head_content)
+        if sent_match:
+            head_data['t_d_sent'] = sent_match.group(1).strip()
+
+    return head_data
+
+
+def read_head(f, chunk_size=HEAD_CHUNK_SIZE):
+    """Читает начало файла до конца секции HEAD.
+
+    Секция HEAD должна стоять перед первым блоком NOTICE: чтение
+    останавливается на </HEAD> или на первом <NOTICE>.
+    Возвращает (head_data, прочитанный текст).
+    """
+    buffer = ''
+    scan_from = 0       # Теги ищутся только в новом тексте (с запасом на тег на границе кусков)
+    head_start = -1
+    while True:
+        if head_start == -1:
+            head_start = buffer.find(HEAD_OPEN, scan_from)
+        if head_start != -1 and buffer.find(HEAD_CLOSE, max(head_start, scan_from)) != -1:
+            break
+
+        notice_start = buffer.find(NOTICE_OPEN, scan_from)
+        if notice_start != -1 and (head_start == -1 or notice_start < head_start):
+            break
+
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        scan_from = max(len(buffer) - len(NOTICE_OPEN), 0)
+        buffer += chunk
+
+    return parse_head_section(buffer), buffer
+
+
+def iter_notice_blocks(f, buffer='', chunk_size=CHUNK_SIZE):
+    """Генератор: выдаёт содержимое блоков NOTICE по одному"""
+    pos = 0
+    while True:
+        start = buffer.find(NOTICE_OPEN, pos)
+        if start != -1:
+            end = buffer.find(NOTICE_CLOSE, start + len(NOTICE_OPEN))
+            if end != -1:
+                yield buffer[start + len(NOTICE_OPEN):end]
+                pos = end + len(NOTICE_CLOSE)
+                continue
+
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+
+        # Отбрасываем обработанный текст, сохраняя начатый блок или хвост с частью тега
+        if start != -1:
+            keep_from = start
+        else:
+            keep_from = max(pos, len(buffer) - len(NOTICE_OPEN) + 1)
+        buffer = buffer[keep_from:] + chunk
+        pos = 0
+
+
+@contextmanager
+def open_notices(file_path, chunk_size=CHUNK_SIZE):
+    """Открывает txt файл и возвращает (head_data, генератор блоков NOTICE)"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        head_data, buffer = read_head(f)
+        yield head_data, iter_notice_blocks(f, buffer, chunk_size)
+
+
+def read_file_head(file_path):
+    """Читает из файла только секцию HEAD"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        head_data, _ = read_head(f)
+    return head_data
+
+
+def _find_notice_end(f, offset, size):
+    """Возвращает смещение сразу после первого </NOTICE>, заканчивающегося позже offset"""
+    tag = NOTICE_CLOSE.encode('ascii')
+    pos = max(offset - len(tag) + 1, 0)
+    while pos < size:
+        f.seek(pos)
+        chunk = f.read(64 * 1024)
+        index = chunk.find(tag)
+        if index != -1:
+            return pos + index + len(tag)
+        if pos + len(chunk) >= size:
+            break
+        # Перекрытие, чтобы не пропустить тег на границе кусков
+        pos += len(chunk) - len(tag) + 1
+    return size
+
+
+def split_notice_ranges(file_path, range_size=RANGE_SIZE):
+    """Делит файл на диапазоны байтов [start, end), выровненные по </NOTICE>"""
+    size = os.path.getsize(file_path)
+    ranges = []
+    start = 0
+    with open(file_path, 'rb') as f:
+        while start < size:
+            end = _find_notice_end(f, start + range_size, size) if start + range_size < size else size
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def iter_notice_range(file_path, start, end):
+    """Генератор: выдаёт блоки NOTICE из диапазона байтов [start, end) файла"""
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+
+    # Переводы строк как при чтении в текстовом режиме
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    yield from iter_notice_blocks(io.StringIO(), text)
@@ -0,0 +1,145 @@
+"""
+Однопроходный разбор блока NOTICE, общий для всех четырёх парсеров.
+
+Вместо отдельного re.search на каждый ключ блок просматривается одним
+регулярным выражением, которое находит только нужные ключи и теги секций
+<ANTENNA> / <RX_STATION>. Парсер описывает, какие ключи ему нужны и из какой
+секции, например:
+
+    NOTICE_FIELDS = {
+        NOTICE: ('t_site_name', 't_freq_assgn'),
+        ANTENNA: ('t_gain_max',),
+        RX_STATION: ('t_site_name',),
+    }
+
+Правила совпадают с прежними регулярными выражениями:
+ - ключ секции NOTICE — первое вхождение в любом месте блока;
+ - ключ секции ANTENNA — первое вхождение внутри каждого закрытого <ANTENNA>;
+ - ключ секции RX_STATION — первое вхождение внутри первого закрытого
+   <RX_STATION> данной антенны;
+ - пустое значение (`ключ =` без текста) берётся, как и прежде,
+   со следующей строки с текстом в пределах своей секции.
+
+scan_notice_hops возвращает все закрытые <RX_STATION> каждой антенны — для
+разбора всех интервалов (антенна → принимающая станция) уведомления РРЛ.
+"""
+import re
+
+NOTICE = 'NOTICE'
+ANTENNA = 'ANTENNA'
+RX_STATION = 'RX_STATION'
+
+# Значение пустого ключа по прежнему правилу: \s*(.+) после '='
+_NEXT_VALUE = re.compile(r'\s*(.+)')
+
+# Подготовленные описания полей: (notice_keys, antenna_keys, rx_keys) -> (выражение, множества ключей)
+_SPECS = {}
+
+
+def _compile_fields(fields):
+    """Возвращает (и кэширует) выражение и множества ключей для описания полей"""
+    spec_key = (
+        tuple(fields.get(NOTICE, ())),
+        tuple(fields.get(ANTENNA, ())),
+        tuple(fields.get(RX_STATION, ())),
+    )
+    spec = _SPECS.get(spec_key)
+    if spec is None:
+        key_sets = tuple(frozenset(keys) for keys in spec_key)
+        names = '|'.join(re.escape(k) for k in sorted(key_sets[0] | key_sets[1] | key_sets[2]))
+        pattern = re.compile(
+            r'^[ \t]*(?:<(/?)(ANTENNA|RX_STATION)>'
+            r'|(' + names + r')[ \t]*=(.*))',
+            re.MULTILINE
+        )
+        spec = (spec_key, pattern) + key_sets
+        _SPECS[spec_key] = spec
+    return spec
+
+
+def _next_line_value(notice_text, pos, closing_tag=None):
+    """Значение пустого ключа: текст со следующей строки до закрывающего тега секции
+    Возвращает None, если до конца секции текста нет (прежний re.search ключ не находил).
+    """
+    end = len(notice_text)
+    if closing_tag is not None:
+        close = notice_text.find(closing_tag, pos)
+        if close != -1:
+            end = close
+    match = _NEXT_VALUE.match(notice_text, pos, end)
+    return match.group(1).strip() if match else None
+
+
+def scan_notice_hops(notice_text, fields):
+    """Разбирает блок NOTICE за один проход со всеми принимающими станциями.
+
+    Возвращает (data, antennas): data — ключи секции NOTICE,
+    antennas — список пар (antenna_data, [rx_data, ...]) в порядке следования
+    антенн и их закрытых <RX_STATION>.
+    """
+    spec_key, pattern, notice_set, antenna_set, rx_set = _compile_fields(fields)
+    notice_keys, antenna_keys, rx_keys = spec_key
+
+    found = {}
+    antennas = []
+    antenna = None      # Открытая антенна
+    rx_list = None      # Закрытые RX_STATION открытой антенны
+    rx_open = None      # Открытый RX_STATION
+
+    for match in pattern.finditer(notice_text):
+        closing, tag, key, value = match.groups()
+        if key:
+            value = value.strip()
+            pos = match.start(4)
+
+            if key in notice_set and key not in found:
+                notice_value = value or _next_line_value(notice_text, pos)
+                if notice_value is not None:
+                    found[key] = notice_value
+            if antenna is not None:
+                if key in antenna_set and key not in antenna:
+                    antenna_value = value or _next_line_value(notice_text, pos, '</ANTENNA>')
+                    if antenna_value is not None:
+                        antenna[key] = antenna_value
+                if rx_open is not None and key in rx_set and key not in rx_open:
+                    rx_value = value or _next_line_value(notice_text, pos, '</RX_STATION>')
+                    if rx_value is not None:
+                        rx_open[key] = rx_value
+
+        elif tag == ANTENNA:
+            if not closing:
+                if antenna is None:
+                    antenna, rx_list, rx_open = {}, [], None
+            elif antenna is not None:
+                antennas.append((antenna, rx_list))
+                antenna, rx_list, rx_open = None, None, None
+
+        elif antenna is not None:
+            # tag == RX_STATION
+            if not closing:
+                if rx_open is None:
+                    rx_open = {}
+            elif rx_open is not None:
+                rx_list.append(rx_open)
+                rx_open = None
+
+    data = {key: found[key] for key in notice_keys if key in found}
+    ordered = []
+    for antenna_data, rx_list in antennas:
+        ordered.append((
+            {key: antenna_data[key] for key in antenna_keys if key in antenna_data},
+            [{key: rx_data[key] for key in rx_keys if key in rx_data} for rx_data in rx_list],
+        ))
+
+    return data, ordered
+
+
+def scan_notice(notice_text, fields):
+    """Разбирает блок NOTICE за один проход.
+
+    Возвращает (data, antennas): data — ключи секции NOTICE,
+    antennas — список пар (antenna_data, rx_data) в порядке следования антенн;
+    rx_data — первая закрытая <RX_STATION> антенны (или пустой словарь).
+    """
+    data, antennas = scan_notice_hops(notice_text, fields)
+    return data, [(antenna_data, rx_list[0] if rx_list else {}) for antenna_data, rx_list in antennas]
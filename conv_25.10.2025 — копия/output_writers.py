@@ -0,0 +1,255 @@
+"""
+Форматы вывода реестра: Excel (xlsx), CSV, TSV и Parquet.
+
+Парсер описывает результат списком листов, каждый лист — кортеж
+(имя листа, оформление, записи, build_row):
+
+    sheets = [('КГЗ', SHEET_LAYOUT, stations, build_row), ...]
+
+Вместо списка записей лист может нести пакет по столбцам
+(station_columns.column_batch) и build_columns(batch) — функцию, которая
+возвращает сразу все столбцы листа:
+
+    sheets = [('КГЗ', SHEET_LAYOUT, column_batch(stations, FIELDS), build_columns), ...]
+
+Запись в любом формате идёт через write_outputs; строки строятся заново для
+каждого формата, поэтому один разбор можно сохранить сразу в несколько
+форматов:
+
+    paths = write_outputs(sheets, output_base, ['xlsx', 'csv'])
+
+Excel — один файл <output_base>.xlsx со всеми листами и оформлением реестра.
+CSV, TSV и Parquet — по файлу на лист: <output_base>_<лист>.<расширение>,
+с одной строкой заголовков без оформления.
+"""
+import argparse
+import csv
+import re
+import time
+
+from openpyxl import Workbook
+from openpyxl.utils import range_boundaries
+
+from excel_writer import write_sheet
+from run_stats import record_sheet, sheet_stage, stage
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Число строк в одной группе строк Parquet
+PARQUET_BATCH_ROWS = 65536
+
+DEFAULT_FORMATS = ['xlsx']
+
+# Названия форматов для сообщений
+FORMAT_NAMES = {'xlsx': 'Excel', 'csv': 'CSV', 'tsv': 'TSV', 'parquet': 'Parquet'}
+
+
+def is_column_sheet(sheet):
+    """Лист описан пакетом по столбцам (build_columns), а не списком записей"""
+    return isinstance(sheet[2], dict)
+
+
+def sheet_columns(sheet):
+    """Столбцы значений листа из пакета по столбцам"""
+    _, _, batch, build_columns = sheet
+    return build_columns(batch)
+
+
+def sheet_rows(sheet):
+    """Генератор строк значений листа"""
+    if is_column_sheet(sheet):
+        return zip(*sheet_columns(sheet))
+    _, _, records, build_row = sheet
+    return (build_row(record) for record in records)
+
+
+def flat_headers(layout):
+    """Заголовки столбцов одной строкой: 'группа: подзаголовок' без переводов строк"""
+    headers = [' '.join(header.split()) for header in layout['headers']]
+
+    for cell_range, text in layout.get('groups', []):
+        first_col, _, last_col, _ = range_boundaries(cell_range)
+        for col in range(first_col, min(last_col, len(headers)) + 1):
+            headers[col - 1] = f"{' '.join(text.split())}: {headers[col - 1]}"
+
+    return headers
+
+
+def _sheet_path(output_base, sheet_name, extension):
+    """Имя файла листа: <output_base>_<лист>.<расширение>"""
+    safe_name = re.sub(r'[\\/:*?"<>|]', '_', sheet_name)
+    return f"{output_base}_{safe_name}.{extension}"
+
+
+def write_xlsx(sheets, output_base, write_only=False, stats=None):
+    """Записывает все листы в одну книгу Excel с оформлением реестра"""
+    output_file = f"{output_base}.xlsx"
+    wb = Workbook(write_only=write_only)
+
+    # Удаляем дефолтный лист
+    if "Sheet" in wb.sheetnames:
+        wb.remove(wb["Sheet"])
+
+    for sheet in sheets:
+        ws = wb.create_sheet(sheet[0])
+        with sheet_stage(stats, 'xlsx', sheet[0], sheet_rows(sheet)) as rows:
+            write_sheet(ws, sheet[1], rows)
+
+    with stage(stats, 'save_xlsx'):
+        wb.save(output_file)
+    return [output_file]
+
+
+def _write_delimited(sheets, output_base, extension, delimiter, stats=None):
+    """Записывает каждый лист в отдельный текстовый файл с разделителем"""
+    paths = []
+    for sheet in sheets:
+        output_file = _sheet_path(output_base, sheet[0], extension)
+        with open(output_file, 'w', encoding='utf-8', newline='') as f, \
+                sheet_stage(stats, extension, sheet[0], sheet_rows(sheet)) as rows:
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow(flat_headers(sheet[1]))
+            writer.writerows(rows)
+        paths.append(output_file)
+    return paths
+
+
+def write_csv(sheets, output_base, write_only=False, stats=None):
+    """Записывает листы в CSV (разделитель — запятая)"""
+    return _write_delimited(sheets, output_base, 'csv', ',', stats)
+
+
+def write_tsv(sheets, output_base, write_only=False, stats=None):
+    """Записывает листы в TSV (разделитель — табуляция)"""
+    return _write_delimited(sheets, output_base, 'tsv', '\t', stats)
+
+
+def write_parquet(sheets, output_base, write_only=False, stats=None):
+    """Записывает каждый лист в отдельный файл Parquet
+    Листы из пакетов по столбцам пишутся столбцами (числовые — числами), остальные — строками.
+    """
+    paths = []
+    for sheet in sheets:
+        output_file = _sheet_path(output_base, sheet[0], 'parquet')
+        headers = flat_headers(sheet[1])
+        names = _unique_names(headers)
+
+        if is_column_sheet(sheet):
+            started = time.perf_counter()
+            arrays = [_parquet_array(column) for column in sheet_columns(sheet)]
+            table = pa.Table.from_arrays(arrays, names=names[:len(arrays)])
+            pq.write_table(table, output_file, row_group_size=PARQUET_BATCH_ROWS)
+            record_sheet(stats, 'parquet', sheet[0], time.perf_counter() - started, table.num_rows)
+            paths.append(output_file)
+            continue
+
+        schema = pa.schema([(header, pa.string()) for header in names])
+
+        with pq.ParquetWriter(output_file, schema) as writer, \
+                sheet_stage(stats, 'parquet', sheet[0], sheet_rows(sheet)) as rows:
+            batch = []
+            for values in rows:
+                batch.append(values)
+                if len(batch) >= PARQUET_BATCH_ROWS:
+                    writer.write_table(_parquet_table(batch, schema))
+                    batch = []
+            if batch:
+                writer.write_table(_parquet_table(batch, schema))
+
+        paths.append(output_file)
+    return paths
+
+
+def _unique_names(headers):
+    """Делает имена столбцов уникальными (Parquet не допускает повторов)"""
+    seen = {}
+    names = []
+    for header in headers:
+        count = seen.get(header, 0)
+        seen[header] = count + 1
+        names.append(header if count == 0 else f"{header} ({count + 1})")
+    return names
+
+
+def _parquet_array(column):
+    """Столбец pyarrow: float64, если в нём только числа (и пустые), иначе строковый"""
+    if any(value is not None for value in column) and all(
+        value is None or isinstance(value, (int, float)) for value in column
+    ):
+        return pa.array(column, type=pa.float64())
+    return pa.array([None if value is None else str(value) for value in column], type=pa.string())
+
+
+def _parquet_table(rows, schema):
+    """Собирает таблицу pyarrow из строк значений"""
+    columns = []
+    for col in range(len(schema)):
+        column = []
+        for values in rows:
+            value = values[col] if col < len(values) else None
+            column.append(None if value is None else str(value))
+        columns.append(pa.array(column, type=pa.string()))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+# Доступные форматы вывода
+WRITERS = {
+    'xlsx': write_xlsx,
+    'csv': write_csv,
+    'tsv': write_tsv,
+    'parquet': write_parquet,
+}
+
+
+def parse_formats(value):
+    """Разбирает значение --format: список форматов через запятую"""
+    formats = []
+    for name in value.split(','):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in WRITERS:
+            raise ValueError(f"неизвестный формат: {name} (доступны: {', '.join(WRITERS)})")
+        if name == 'parquet' and pa is None:
+            raise ValueError("для формата parquet нужен пакет pyarrow")
+        if name not in formats:
+            formats.append(name)
+
+    if not formats:
+        raise ValueError("не задан ни один формат")
+    return formats
+
+
+def add_format_argument(parser):
+    """Добавляет в argparse опцию --format"""
+    def formats_type(value):
+        try:
+            return parse_formats(value)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    parser.add_argument(
+        '-f', '--format',
+        dest='formats',
+        type=formats_type,
+        default=list(DEFAULT_FORMATS),
+        help=f"форматы вывода через запятую: {', '.join(WRITERS)} (по умолчанию xlsx)"
+    )
+
+
+def write_outputs(sheets, output_base, formats=None, write_only=False, stats=None):
+    """Записывает листы во все заданные форматы, возвращает список созданных файлов
+    stats: отчёт о времени этапов (run_stats.open_stats) — время записи каждого листа
+    """
+    paths = []
+    for name in formats or DEFAULT_FORMATS:
+        with stage(stats, f'write_{name}'):
+            written = WRITERS[name](sheets, output_base, write_only, stats)
+        for path in written:
+            print(f"✓ {FORMAT_NAMES[name]} файл создан: {path}")
+        paths.extend(written)
+    return paths
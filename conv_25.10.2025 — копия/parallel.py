@@ -0,0 +1,93 @@
+"""
+Параллельная обработка входных файлов в пуле процессов.
+
+Разбор txt файлов — чисто вычислительная работа с регулярными выражениями,
+поэтому файлы (или группы T12/T13) распределяются по процессам
+ProcessPoolExecutor. Результаты выдаются строго в порядке входного списка,
+так что итоговые данные совпадают с последовательным запуском.
+
+Крупные файлы (от SPLIT_SIZE байт) обрабатываются не в общем пуле, а по очереди
+в основном процессе: сам файл делится по границам </NOTICE>, и его части
+разбираются в собственном пуле (см. notice_reader.split_notice_ranges).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from notice_reader import split_notice_ranges
+
+# Файлы от этого размера (в байтах) разбираются параллельно по частям
+SPLIT_SIZE = 16 * 1024 * 1024
+
+
+def add_jobs_argument(parser):
+    """Добавляет в argparse опцию --jobs"""
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help="число процессов для разбора файлов (0 — по числу ядер, по умолчанию 1)"
+    )
+
+
+def resolve_jobs(jobs):
+    """Приводит значение --jobs к числу процессов"""
+    if jobs is None or jobs < 0:
+        return 1
+    if jobs == 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def map_in_order(func, items, jobs=1, sizes=None, split_size=SPLIT_SIZE):
+    """Генератор: выдаёт func(item) для каждого элемента в исходном порядке.
+
+    func должна быть функцией верхнего уровня модуля (её передают в дочерние процессы).
+    Если заданы sizes (размеры элементов в байтах), для элементов от split_size
+    вызывается func(item, jobs) в основном процессе — они делятся на части сами.
+    """
+    items = list(items)
+    jobs = resolve_jobs(jobs)
+
+    if jobs <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    large = set()
+    if sizes is not None:
+        large = {i for i, size in enumerate(sizes) if size >= split_size}
+
+    # Мелкие элементы — в общем пуле; пул закрывается до разбора крупных файлов
+    small_items = [item for i, item in enumerate(items) if i not in large]
+    small_results = iter(list(_pool_map(func, small_items, jobs)))
+
+    for i, item in enumerate(items):
+        if i in large:
+            yield func(item, jobs)
+        else:
+            yield next(small_results)
+
+
+def _pool_map(func, items, jobs):
+    """Выполняет func над элементами в пуле процессов, сохраняя порядок"""
+    jobs = min(jobs, len(items))
+    if jobs <= 1:
+        return [func(item) for item in items]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(func, items))
+
+
+def map_file_ranges(func, file_path, extra=(), jobs=1):
+    """Разбирает один файл по частям в пуле процессов.
+
+    Файл делится на диапазоны, выровненные по </NOTICE>; для каждого вызывается
+    func((file_path, start, end) + extra), возвращающая список. Списки
+    склеиваются в порядке следования диапазонов в файле.
+    """
+    tasks = [(file_path, start, end) + tuple(extra) for start, end in split_notice_ranges(file_path)]
+
+    results = []
+    for part in _pool_map(func, tasks, resolve_jobs(jobs)):
+        results.extend(part)
+    return results
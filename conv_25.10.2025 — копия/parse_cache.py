@@ -0,0 +1,314 @@
+"""
+Кэш результатов разбора txt файлов между запусками.
+
+Повторный запуск по той же (пополняемой) папке разбирает только новые и
+изменённые файлы, остальные результаты (списки станций после link_stations /
+merge_tx_rx_data) берутся из кэша:
+
+    cache = open_cache(cache_dir)
+    results = map_cached(cache, process_file, file_paths, jobs, file_sizes)
+
+Элемент — путь к файлу или кортеж путей (пара T12/T13, None допускается).
+Запись действительна, пока у всех файлов элемента совпадают размер и mtime;
+если mtime изменился, а размер нет — сравнивается хэш содержимого.
+Записи привязаны к версии кода: хэшу исходников модуля парсера и общих
+модулей разбора, поэтому правка парсера делает старые записи недействительными.
+
+Кэш — папка с файлами <id>.pkl и индексом index.json. При превышении
+max_size (в байтах) удаляются давно не использованные записи (LRU).
+"""
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from functools import partial
+
+from run_stats import map_timed, record_file, stage
+
+# Имя папки кэша по умолчанию (внутри папки с txt файлами)
+CACHE_DIR_NAME = '.parse_cache'
+
+# Предельный размер кэша по умолчанию (в байтах)
+MAX_CACHE_SIZE = 512 * 1024 * 1024
+
+# Версия формата кэша (меняется при несовместимой правке этого модуля)
+CACHE_FORMAT = 1
+
+# Общие модули разбора, от которых зависят результаты всех парсеров
+_SHARED_MODULES = ('notice_reader.py', 'notice_scanner.py', 'site_matcher.py', 'station_record.py')
+
+INDEX_FILE = 'index.json'
+
+# Версии кода по файлу модуля парсера
+_CODE_VERSIONS = {}
+
+
+def add_cache_arguments(parser):
+    """Добавляет в argparse опции --cache-dir, --no-cache и --cache-size"""
+    parser.add_argument(
+        '--cache-dir',
+        help=f"папка кэша разобранных файлов (по умолчанию {CACHE_DIR_NAME} в папке с .txt файлами)"
+    )
+    parser.add_argument(
+        '--no-cache',
+        dest='use_cache',
+        action='store_false',
+        help="разбирать все файлы заново, не используя кэш"
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=MAX_CACHE_SIZE // (1024 * 1024),
+        help=f"предельный размер кэша в МБ (по умолчанию {MAX_CACHE_SIZE // (1024 * 1024)})"
+    )
+
+
+def open_cache(cache_dir, max_size=MAX_CACHE_SIZE):
+    """Открывает кэш в папке cache_dir (папка создаётся при первой записи)"""
+    entries = {}
+    index_path = os.path.join(cache_dir, INDEX_FILE)
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('format') == CACHE_FORMAT:
+                entries = index.get('entries', {})
+        except (OSError, ValueError):
+            # Повреждённый индекс — начинаем кэш заново
+            entries = {}
+
+    return {
+        'dir': cache_dir,
+        'max_size': max_size,
+        'entries': entries,
+        'hits': 0,
+        'misses': 0,
+    }
+
+
+def save_cache(cache):
+    """Удаляет лишние записи (LRU) и файлы без записи в индексе, сохраняет индекс кэша"""
+    _evict(cache)
+    _remove_orphans(cache)
+
+    os.makedirs(cache['dir'], exist_ok=True)
+    index_path = os.path.join(cache['dir'], INDEX_FILE)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'format': CACHE_FORMAT, 'entries': cache['entries']}, f, ensure_ascii=False)
+    os.replace(tmp_path, index_path)
+
+
+def file_hash(file_path):
+    """Хэш содержимого файла"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_version(func):
+    """Версия кода функции разбора: хэш исходников её модуля и общих модулей"""
+    module_file = os.path.abspath(sys.modules[func.__module__].__file__)
+    version = _CODE_VERSIONS.get(module_file)
+    if version is None:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(CACHE_FORMAT).encode())
+        module_dir = os.path.dirname(module_file)
+        for path in (module_file,) + tuple(os.path.join(module_dir, name) for name in _SHARED_MODULES):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        version = digest.hexdigest()
+        _CODE_VERSIONS[module_file] = version
+    return version
+
+
+def _item_paths(item):
+    """Пути элемента: сам путь или пути кортежа (None сохраняется как есть)"""
+    return [item] if isinstance(item, str) else list(item)
+
+
+def _entry_id(func, item):
+    """Идентификатор записи: функция разбора и абсолютные пути элемента"""
+    module_name = os.path.splitext(os.path.basename(sys.modules[func.__module__].__file__))[0]
+    paths = [os.path.abspath(path) if path else None for path in _item_paths(item)]
+    key = json.dumps([module_name, func.__name__, paths], ensure_ascii=False)
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _file_stats(item):
+    """Размер и mtime каждого файла элемента"""
+    stats = []
+    for path in _item_paths(item):
+        if path:
+            st = os.stat(path)
+            stats.append([st.st_size, st.st_mtime_ns])
+        else:
+            stats.append(None)
+    return stats
+
+
+def _file_hashes(item):
+    """Хэши содержимого файлов элемента"""
+    return [file_hash(path) if path else None for path in _item_paths(item)]
+
+
+def parse_with_hashes(func, item, *args):
+    """Размер/mtime и хэши файлов элемента, затем func(item, *args): (результат, размеры, хэши)
+    Выполняется в процессе пула — файлы хэшируются параллельно с разбором, а не
+    заранее в основном процессе; снимок снимается до разбора, поэтому файл,
+    изменённый во время разбора, при следующем запуске разбирается заново.
+    """
+    stats = _file_stats(item)
+    hashes = _file_hashes(item)
+    return func(item, *args), stats, hashes
+
+
+def lookup(cache, func, item):
+    """Ищет в кэше результат func(item). Возвращает (найден ли, идентификатор записи)"""
+    entry_id = _entry_id(func, item)
+    entry = cache['entries'].get(entry_id)
+    if entry is None or entry['version'] != code_version(func):
+        return False, entry_id
+
+    stats = _file_stats(item)
+    if stats != entry['stats']:
+        # Файл мог быть перезаписан тем же содержимым — сверяем размер и хэш
+        sizes = [stat and stat[0] for stat in stats]
+        if sizes != [stat and stat[0] for stat in entry['stats']] or _file_hashes(item) != entry['hashes']:
+            return False, entry_id
+        entry['stats'] = stats
+
+    if not os.path.exists(os.path.join(cache['dir'], entry_id + '.pkl')):
+        return False, entry_id
+
+    return True, entry_id
+
+
+def load(cache, entry_id):
+    """Загружает результат из записи кэша и отмечает её использование"""
+    with open(os.path.join(cache['dir'], entry_id + '.pkl'), 'rb') as f:
+        value = pickle.load(f)
+    cache['entries'][entry_id]['used'] = time.time()
+    return value
+
+
+def store(cache, func, item, entry_id, stats, hashes, value):
+    """Сохраняет результат func(item) в кэш"""
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) > cache['max_size']:
+        return
+
+    os.makedirs(cache['dir'], exist_ok=True)
+    with open(os.path.join(cache['dir'], entry_id + '.pkl'), 'wb') as f:
+        f.write(data)
+
+    cache['entries'][entry_id] = {
+        'paths': _item_paths(item),
+        'version': code_version(func),
+        'stats': stats,
+        'hashes': hashes,
+        'size': len(data),
+        'used': time.time(),
+    }
+
+
+def _evict(cache):
+    """Удаляет давно не использованные записи, пока кэш больше max_size"""
+    entries = cache['entries']
+    total = sum(entry['size'] for entry in entries.values())
+
+    for entry_id in sorted(entries, key=lambda k: entries[k]['used']):
+        if total <= cache['max_size']:
+            break
+        total -= entries[entry_id]['size']
+        del entries[entry_id]
+        try:
+            os.remove(os.path.join(cache['dir'], entry_id + '.pkl'))
+        except FileNotFoundError:
+            pass
+
+
+def _remove_orphans(cache):
+    """Удаляет файлы .pkl, которых нет в индексе (остались от прерванных запусков)"""
+    if not os.path.isdir(cache['dir']):
+        return
+    for name in os.listdir(cache['dir']):
+        entry_id, extension = os.path.splitext(name)
+        if extension == '.pkl' and entry_id not in cache['entries']:
+            try:
+                os.remove(os.path.join(cache['dir'], name))
+            except FileNotFoundError:
+                pass
+
+
+def map_cached(cache, func, items, jobs=1, sizes=None, stats=None):
+    """Генератор как parallel.map_in_order: выдаёт func(item) в исходном порядке,
+    но для неизменённых файлов берёт результат из кэша (cache=None — без кэша)
+    stats: отчёт о времени этапов (run_stats.open_stats) или None
+    """
+    if cache is None:
+        yield from map_timed(stats, func, items, jobs, sizes)
+        return
+
+    items = list(items)
+
+    # Определяем, какие элементы нужно разобрать (размер/mtime и хэш снимаются в процессе разбора)
+    found = {}
+    missing = []
+    for i, item in enumerate(items):
+        hit, entry_id = lookup(cache, func, item)
+        if hit:
+            found[i] = entry_id
+        else:
+            missing.append((i, entry_id))
+
+    cache['hits'] = len(found)
+    cache['misses'] = len(missing)
+
+    missing_items = [items[i] for i, _ in missing]
+    missing_sizes = [sizes[i] for i, _ in missing] if sizes is not None else None
+    results = map_timed(stats, partial(parse_with_hashes, func), missing_items, jobs, missing_sizes)
+    pending = iter(missing)
+
+    saved = False
+    try:
+        for i, item in enumerate(items):
+            if i in found:
+                with stage(stats, 'cache'):
+                    value = load(cache, found[i])
+                record_file(stats, item, cached=True)
+            else:
+                _, entry_id = next(pending)
+                value, file_stats, hashes = next(results)
+                store(cache, func, item, entry_id, file_stats, hashes, value)
+
+            # Индекс сохраняется до выдачи последнего результата: потребитель (zip)
+            # может не запросить следующий элемент после последнего
+            if i == len(items) - 1:
+                save_cache(cache)
+                saved = True
+
+            yield value
+    finally:
+        # При ошибке разбора уже записанные результаты попадают в индекс и в учёт размера кэша
+        if not saved:
+            save_cache(cache)
+
+
+def cache_for_run(input_folder, cache_dir=None, use_cache=True, max_size_mb=None):
+    """Открывает кэш для запуска парсера или возвращает None, если кэш отключён"""
+    if not use_cache:
+        return None
+
+    max_size = MAX_CACHE_SIZE if max_size_mb is None else max_size_mb * 1024 * 1024
+    return open_cache(cache_dir or os.path.join(input_folder, CACHE_DIR_NAME), max_size)
+
+
+def print_cache_stats(cache):
+    """Печатает, сколько результатов последнего map_cached взято из кэша"""
+    if cache is not None:
+        print(f"💾 Кэш: {cache['hits']} из кэша, {cache['misses']} разобрано заново")
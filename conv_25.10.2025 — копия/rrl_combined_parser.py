@@ -0,0 +1,209 @@
+"""
+Совместный запуск ВХОДЯЩИЕ РРЛ и ИСХОДЯЩИЕ РРЛ по одной папке.
+
+Каждый txt файл читается и разбирается один раз, после чего его станции
+распределяются по t_adm из HEAD: файлы UZB — в реестр ИСХОДЯЩИЕ РРЛ,
+остальные — на листы стран реестра ВХОДЯЩИЕ РРЛ.
+"""
+import os
+import argparse
+from border_zone import add_border_arguments, border_for_run, border_sheets
+from datetime import datetime
+from excel_writer import add_write_only_argument
+from frequency_conflicts import add_conflict_arguments, conflict_sheet
+from notice_index import mark_repeats
+from output_writers import add_format_argument, write_outputs
+from parallel import add_jobs_argument
+from parse_cache import add_cache_arguments, cache_for_run, map_cached, print_cache_stats
+from run_profile import add_profile_arguments, profile_run
+from run_stats import add_stats_argument, finish_stats, open_stats, record_file, stage
+from station_grid import DEFAULT_PROXIMITY_KM, add_proximity_arguments, proximity_sheet
+from station_links import add_chains_argument, chain_sheet, link_stations
+from station_store import add_db_arguments, db_for_run, record_run
+import rrl_incoming_parser as incoming
+import rrl_outgoing_parser as outgoing
+
+# Имя отчёта о времени этапов (общего для обоих реестров)
+STATS_NAME = "РРЛ"
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Парсер РРЛ: ВХОДЯЩИЕ и ИСХОДЯЩИЕ (UZB) за один проход")
+    add_jobs_argument(parser)
+    add_format_argument(parser)
+    add_write_only_argument(parser)
+    add_cache_arguments(parser)
+    add_db_arguments(parser)
+    add_chains_argument(parser)
+    add_conflict_arguments(parser)
+    add_proximity_arguments(parser)
+    add_border_arguments(parser)
+    add_stats_argument(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def run(input_folder, output_folder=None, jobs=1, formats=None, write_only=False, cache=None, db=None, chains=False,
+        conflicts=False, conflict_distance=None, proximity=False, proximity_distance=DEFAULT_PROXIMITY_KM,
+        border=None, save_stats=False):
+    """Разбирает txt файлы папки один раз и сохраняет оба реестра РРЛ
+    output_folder: папка для результата (по умолчанию — папка с txt файлами)
+    cache: кэш результатов разбора (parse_cache.cache_for_run) или None
+    db: путь к базе SQLite для станций (station_store.db_for_run) или None
+    chains: добавить лист цепочек связанных станций (station_links.chain_sheet)
+    conflicts: добавить лист пересечений частот входящих и исходящих присвоений
+    (frequency_conflicts.conflict_sheet), conflict_distance — предельное расстояние в км или None
+    proximity: добавить в исходящий реестр лист ближайших входящих станций
+    (station_grid.proximity_sheet), proximity_distance — радиус подсчёта соседей в км
+    border: граница для зоны координации входящих станций (border_zone.border_for_run) или None
+    save_stats: сохранить отчёт о времени этапов в JSON рядом с реестрами (run_stats.finish_stats)
+    Возвращает список созданных файлов (пустой, если сохранять нечего)
+    """
+    if not os.path.exists(input_folder):
+        raise FileNotFoundError(f"Папка не найдена: {input_folder}")
+
+    stats = open_stats(STATS_NAME)
+
+    # Находим все txt файлы
+    with stage(stats, 'list'):
+        txt_files = [f for f in os.listdir(input_folder) if f.endswith('.txt')]
+
+    if not txt_files:
+        print("❌ В папке нет .txt файлов!")
+        return []
+
+    print(f"Найдено {len(txt_files)} файлов\n")
+
+    # Обрабатываем файлы (при --jobs > 1 — в пуле процессов, порядок сохраняется)
+    file_paths = [os.path.join(input_folder, txt_file) for txt_file in txt_files]
+    file_sizes = [os.path.getsize(file_path) for file_path in file_paths]
+    results = map_cached(cache, incoming.process_file, file_paths, jobs, file_sizes, stats)
+
+    # Станции по исходным файлам для записи в базу (по реестрам)
+    incoming_batches = []
+    outgoing_batches = []
+
+    incoming_files_count = 0
+    uzb_files_count = 0
+    for txt_file, (stations_data, head_data) in zip(txt_files, results):
+        print(f"Обработка: {txt_file}...")
+        record_file(stats, txt_file, notices=len(stations_data))
+
+        target_adm = head_data.get('t_adm', '')
+        source_file = os.path.abspath(os.path.join(input_folder, txt_file))
+
+        if outgoing.is_uzb_head(head_data):
+            uzb_files_count += 1
+            outgoing_batches.append((source_file, outgoing.SHEET_NAMES[0], stations_data))
+            print(f"  └─ Извлечено {len(stations_data)} станций от UZB → ИСХОДЯЩИЕ РРЛ\n")
+            continue
+
+        incoming_files_count += 1
+
+        # Определяем целевой лист по t_adm из HEAD
+        target_sheet = incoming.determine_sheet_from_adm(target_adm) if target_adm else 'КАЗ'
+        incoming_batches.append((source_file, target_sheet, stations_data))
+        print(f"  └─ Извлечено {len(stations_data)} станций от {target_adm} → ВХОДЯЩИЕ РРЛ, лист '{target_sheet}'\n")
+
+    print_cache_stats(cache)
+
+    # Повторная подача и дубликаты из разных файлов — отдельно по каждому реестру
+    with stage(stats, 'repeats'):
+        incoming_batches = mark_repeats(db, incoming.STORE_REGISTER, incoming_batches)
+        outgoing_batches = mark_repeats(db, outgoing.STORE_REGISTER, outgoing_batches)
+
+    # Частоты приёма — по всем файлам своего реестра
+    with stage(stats, 'link'):
+        incoming_links = link_stations(incoming_batches)
+        outgoing_links = link_stations(outgoing_batches)
+    with stage(stats, 'store'):
+        record_run(db, incoming.STORE_REGISTER, incoming_batches)
+        record_run(db, outgoing.STORE_REGISTER, outgoing_batches)
+
+    # Входящие — по листам стран, исходящие (UZB) — один список
+    data_by_sheet = {sheet_name: [] for sheet_name in incoming.SHEET_NAMES}
+    for _, target_sheet, stations_data in incoming_batches:
+        data_by_sheet[target_sheet].extend(stations_data)
+    outgoing_data = [data for _, _, stations_data in outgoing_batches for data in stations_data]
+
+    print(f"📊 Входящих файлов: {incoming_files_count}, станций: {sum(len(data) for data in data_by_sheet.values())}")
+    print("\n📋 Распределение по листам:")
+    for sheet_name, data in data_by_sheet.items():
+        if data:
+            print(f"  • {sheet_name}: {len(data)} станций")
+        else:
+            print(f"  • {sheet_name}: 0 станций (пустой)")
+    print(f"\n📊 Исходящих файлов UZB: {uzb_files_count}, станций: {len(outgoing_data)}")
+
+    # Сохраняем оба реестра в заданных форматах с уникальным именем
+    output_folder = output_folder or input_folder
+    os.makedirs(output_folder, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+    output_files = []
+    if incoming_files_count:
+        output_base = os.path.join(output_folder, f"{incoming.OUTPUT_NAME}_{timestamp}")
+        with stage(stats, 'sheets'):
+            sheets = border_sheets(incoming.build_sheets(data_by_sheet), border)
+            if chains:
+                sheets.append(chain_sheet(incoming_links))
+        if conflicts:
+            if uzb_files_count:
+                with stage(stats, 'conflicts'):
+                    sheets.append(conflict_sheet(incoming_batches, outgoing_batches, conflict_distance))
+            else:
+                print("⚠️  Нет исходящих файлов UZB — лист конфликтов не создан")
+        output_files += write_outputs(sheets, output_base, formats, write_only, stats)
+    else:
+        print("⚠️  Нет входящих файлов — реестр ВХОДЯЩИЕ РРЛ не создан")
+
+    if uzb_files_count:
+        output_base = os.path.join(output_folder, f"{outgoing.OUTPUT_NAME}_{timestamp}")
+        with stage(stats, 'sheets'):
+            sheets = outgoing.build_sheets({outgoing.SHEET_NAMES[0]: outgoing_data})
+            if chains:
+                sheets.append(chain_sheet(outgoing_links))
+        if proximity:
+            with stage(stats, 'proximity'):
+                sheets.append(proximity_sheet(incoming_batches, outgoing_batches, proximity_distance))
+        output_files += write_outputs(sheets, output_base, formats, write_only, stats)
+    else:
+        print("❌ Не найдено файлов с t_adm=UZB!")
+
+    output_files += finish_stats(stats, os.path.join(output_folder, f"{STATS_NAME}_{timestamp}"), save_stats)
+
+    print(f"\n✅ Готово! Данные сохранены в: {', '.join(output_files)}")
+
+    return output_files
+
+
+def main(argv=None):
+    """Основная функция"""
+    args = parse_args(argv)
+
+    # Папка с txt файлами
+    input_folder = input("Введите путь к папке с .txt файлами (РРЛ: ВХОДЯЩИЕ и ИСХОДЯЩИЕ): ").strip()
+
+    # Кэш разобранных файлов (повторный запуск разбирает только новые и изменённые)
+    cache = cache_for_run(input_folder, args.cache_dir, args.use_cache, args.cache_size)
+    db = db_for_run(args.db_path, args.use_db)
+
+    try:
+        border = border_for_run(args.border, args.border_distance, args.border_filter)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    try:
+        with profile_run(STATS_NAME, input_folder, args.profile, args.trace_memory):
+            run(input_folder, jobs=args.jobs, formats=args.formats, write_only=args.write_only, cache=cache, db=db, chains=args.chains,
+                conflicts=args.conflicts, conflict_distance=args.conflict_distance,
+                proximity=args.proximity, proximity_distance=args.proximity_distance, border=border,
+                save_stats=args.save_stats)
+    except FileNotFoundError:
+        print("❌ Папка не найдена!")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,134 +1,104 @@
 import os
-import re
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from openpyxl.utils import get_column_letter
+import argparse
+from border_zone import add_border_arguments, border_for_run, border_sheets
 from datetime import datetime
-
-
-def convert_coordinates(coord_str):
-    """Конвертирует координаты из формата +0691949 в 69-19-49"""
-    if not coord_str:
-        return ""
-
-    coord_str = coord_str.strip('+')
-    if len(coord_str) == 7:
-        return f"{coord_str[0:2]}-{coord_str[2:4]}-{coord_str[4:7]}"
-    elif len(coord_str) == 6:
-        return f"{coord_str[0:2]}-{coord_str[2:4]}-{coord_str[4:6]}"
-    return coord_str
-
-
-def parse_head_section(content):
-    """Извлекает данные из секции HEAD"""
-    head_data = {}
-    head_match = re.search(r'<HEAD>(.*?)</HEAD>', content, re.DOTALL)
-
-    if head_match:
-        head_content = head_match.group(1)
-
-        # Извлекаем t_adm (страна)
-        adm_match = re.search(r't_adm\s*=\s*(.+)', head_content)
-        if adm_match:
-            head_data['t_adm'] = adm_match.group(1).strip()
-
-        # Извлекаем t_d_sent (дата отправки)
-        sent_match = re.search(r't_d_sent\s*=\s*(.+)', head_content)
-        if sent_match:
-            head_data['t_d_sent'] = sent_match.group(1).strip()
-
-    return head_data
-
-
-def parse_notice_block(notice_text):
-    """Парсит один блок NOTICE и извлекает данные"""
-    data = {}
-
-    # Извлекаем основные параметры
-    patterns = {
-        't_site_name': r't_site_name\s*=\s*(.+)',
-        't_freq_assgn': r't_freq_assgn\s*=\s*(.+)',
-        't_long': r't_long\s*=\s*(.+)',
-        't_lat': r't_lat\s*=\s*(.+)',
-        't_bdwdth_cde': r't_bdwdth_cde\s*=\s*(.+)',
-        't_d_adm_ntc': r't_d_adm_ntc\s*=\s*(.+)',
-        't_adm_ref_id': r't_adm_ref_id\s*=\s*(.+)',
-    }
-
-    for key, pattern in patterns.items():
-        match = re.search(pattern, notice_text)
-        if match:
-            data[key] = match.group(1).strip()
-
-    # Извлекаем данные антенн
-    antenna_blocks = re.findall(r'<ANTENNA>(.*?)</ANTENNA>', notice_text, re.DOTALL)
-
-    for antenna in antenna_blocks:
-        gain_match = re.search(r't_gain_max\s*=\s*(.+)', antenna)
-        height_match = re.search(r't_hgt_agl\s*=\s*(.+)', antenna)
-        power_match = re.search(r't_pwr_dbw\s*=\s*(.+)', antenna)
-
-        if gain_match:
-            data['t_gain_max'] = gain_match.group(1).strip()
-        if height_match:
-            data['t_hgt_agl'] = height_match.group(1).strip()
-        if power_match:
-            data['t_pwr_dbw'] = power_match.group(1).strip()
-
-        # Извлекаем данные принимающей станции
-        rx_match = re.search(r'<RX_STATION>(.*?)</RX_STATION>', antenna, re.DOTALL)
-        if rx_match:
-            rx_content = rx_match.group(1)
-            rx_site_match = re.search(r't_site_name\s*=\s*(.+)', rx_content)
-            if rx_site_match:
-                data['rx_site_name'] = rx_site_match.group(1).strip()
-
-    return data
-
-
-def parse_txt_file(file_path):
-    """Парсит txt файл и возвращает список данных всех станций"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Извлекаем данные из HEAD
-    head_data = parse_head_section(content)
-
-    # Разделяем на блоки NOTICE
-    notice_blocks = re.findall(r'<NOTICE>(.*?)</NOTICE>', content, re.DOTALL)
-
-    stations_data = []
-    for notice in notice_blocks:
-        data = parse_notice_block(notice)
-        # Добавляем данные из HEAD
-        data['t_adm'] = head_data.get('t_adm', '')
-        data['t_d_sent'] = head_data.get('t_d_sent', '')
-        stations_data.append(data)
+from excel_writer import add_write_only_argument
+from notice_index import mark_repeats
+from notice_reader import open_notices, read_file_head, iter_notice_range
+from notice_scanner import scan_notice_hops, NOTICE, ANTENNA, RX_STATION
+from output_writers import add_format_argument, write_outputs
+from parallel import add_jobs_argument, map_file_ranges, resolve_jobs
+from parse_cache import add_cache_arguments, cache_for_run, map_cached, print_cache_stats
+from run_profile import add_profile_arguments, profile_run
+from run_stats import add_stats_argument, finish_stats, open_stats, record_file, stage
+from station_columns import (
+    batch_size, column_batch, coordinates_column, fallback_column, letter_numbers, numbers_column, text_column,
+)
+from station_links import add_chains_argument, chain_sheet, hop_records, link_stations
+from station_record import StationRecord
+from station_store import add_db_arguments, db_for_run, record_run
+
+# Извлекаемые параметры по секциям блока NOTICE
+NOTICE_FIELDS = {
+    NOTICE: (
+        't_site_name',
+        't_freq_assgn',
+        't_long',
+        't_lat',
+        't_bdwdth_cde',
+        't_d_adm_ntc',
+        't_adm_ref_id',
+    ),
+    ANTENNA: ('t_gain_max', 't_hgt_agl', 't_pwr_dbw'),
+    RX_STATION: ('t_site_name', 't_long', 't_lat'),
+}
+
+
+def parse_notice_block(notice_text, head_data=None, strings=None):
+    """Парсит один блок NOTICE и извлекает данные
+    Каждая пара антенна → принимающая станция — отдельный интервал в data['hops']
+    head_data: HEAD файла (общий для всех станций), strings: пул строк файла
+    """
+    data, antennas = scan_notice_hops(notice_text, NOTICE_FIELDS)
+
+    hops = []
+    for antenna, rx_stations in antennas:
+        # Данные антенн: значения последней антенны перекрывают предыдущие
+        data.update(antenna)
+
+        # Данные принимающей станции (первой у антенны)
+        rx_station = rx_stations[0] if rx_stations else {}
+        if 't_site_name' in rx_station:
+            data['rx_site_name'] = rx_station['t_site_name']
+            # Координаты принимающей станции уточняют поиск пары по всему запуску
+            data['rx_long'] = rx_station.get('t_long', '')
+            data['rx_lat'] = rx_station.get('t_lat', '')
+
+        # Интервалы антенны: по одному на каждую принимающую станцию
+        antenna_data = {key: antenna.get(key, '') for key in NOTICE_FIELDS[ANTENNA]}
+        for rx_station in rx_stations or [{}]:
+            hop = dict(antenna_data)
+            hop['rx_site_name'] = rx_station.get('t_site_name', '')
+            hop['rx_long'] = rx_station.get('t_long', '')
+            hop['rx_lat'] = rx_station.get('t_lat', '')
+            hops.append(StationRecord(hop, strings=strings))
+
+    data['hops'] = hops
+    return StationRecord(data, head_data, strings)
+
+
+def parse_notices(notice_blocks, head_data):
+    """Парсит блоки NOTICE и добавляет к ним данные из HEAD"""
+    # Данные HEAD — одна ссылка на файл, повторяющиеся значения — одна строка на файл
+    strings = {}
+    return [parse_notice_block(notice, head_data, strings) for notice in notice_blocks]
+
+
+def parse_notice_range(task):
+    """Парсит диапазон байтов файла (выполняется в процессе пула)
+    task: (путь к файлу, начало, конец, head_data)
+    """
+    file_path, start, end, head_data = task
+    return parse_notices(iter_notice_range(file_path, start, end), head_data)
+
+
+def parse_txt_file(file_path, jobs=1):
+    """Парсит txt файл и возвращает список данных всех станций
+    jobs > 1: файл делится по границам </NOTICE>, части разбираются в пуле процессов
+    """
+    if resolve_jobs(jobs) > 1:
+        # HEAD читается один раз и передаётся всем частям
+        head_data = read_file_head(file_path)
+        stations_data = map_file_ranges(parse_notice_range, file_path, (head_data,), jobs)
+        return stations_data, head_data
+
+    # Читаем файл потоково: HEAD, затем блоки NOTICE по одному
+    with open_notices(file_path) as (head_data, notice_blocks):
+        stations_data = parse_notices(notice_blocks, head_data)
 
     return stations_data, head_data
 
 
-def link_stations(stations_data):
-    """Связывает станции и определяет частоты приёма"""
-    # Создаём словарь для быстрого поиска станций по имени
-    station_map = {}
-    for station in stations_data:
-        site_name = station.get('t_site_name', '')
-        station_map[site_name] = station
-
-    # Для каждой станции находим частоту приёма
-    for station in stations_data:
-        rx_site_name = station.get('rx_site_name', '')
-        if rx_site_name and rx_site_name in station_map:
-            # Частота приёма = частота передачи парной станции
-            rx_station = station_map[rx_site_name]
-            station['freq_rx'] = rx_station.get('t_freq_assgn', '')
-        else:
-            station['freq_rx'] = ''
-
-    return stations_data
-
-
 def determine_sheet_from_adm(adm_code):
     """Определяет лист Excel по коду администрации из HEAD"""
     adm_upper = adm_code.upper()
@@ -145,31 +115,17 @@ def determine_sheet_from_adm(adm_code):
         return 'КАЗ'  # По умолчанию
 
 
-def create_sheet_with_data(ws, all_data):
-    """Создает лист с данными для ВХОДЯЩИЕ РРЛ"""
-
-    # Заголовок - первая строка (объединенная)
-    ws.merge_cells('A1:Q1')
-    header_cell = ws['A1']
-    header_cell.value = "Учёт статистических данных по частотоприрсвоениям направленных на координацию с АС РУз (ВХОДЯЩИЕ)-РРЛ"
-    header_cell.font = Font(bold=True, size=11)
-    header_cell.alignment = Alignment(horizontal="center", vertical="center")
-
-    # Вторая строка - объединенные заголовки
-    ws.merge_cells('A2:B2')
-    ws['A2'].value = "Частота, МГц"
-
-    ws.merge_cells('C2:D2')
-    ws['C2'].value = "Координаты"
-
-    ws.merge_cells('J2:K2')
-    ws['J2'].value = "№ и дата входящего письма"
-
-    ws.merge_cells('L2:M2')
-    ws['L2'].value = "№ и дата исходящего письма"
-
-    # Третья строка - подзаголовки
-    headers_row3 = [
+# Оформление листа ВХОДЯЩИЕ РРЛ
+SHEET_LAYOUT = {
+    'title': "Учёт статистических данных по частотоприрсвоениям направленных на координацию с АС РУз (ВХОДЯЩИЕ)-РРЛ",
+    'title_range': 'A1:Q1',
+    'groups': [
+        ('A2:B2', "Частота, МГц"),
+        ('C2:D2', "Координаты"),
+        ('J2:K2', "№ и дата входящего письма"),
+        ('L2:M2', "№ и дата исходящего письма"),
+    ],
+    'headers': [
         "передача", "приём",
         "долгота", "широта",
         "Пункт установки",
@@ -183,133 +139,123 @@ def create_sheet_with_data(ws, all_data):
         "Примечание",
         "Исполнитель",
         "t_adm_ref_id"
+    ],
+    'column_widths': [12, 12, 10, 10, 20, 10, 10, 12, 10, 15, 15, 15, 15, 15, 15, 15, 20],
+    'row_heights': {1: 30, 2: 30, 3: 40},
+}
+
+
+# Поля станции, из которых строятся столбцы листа
+BATCH_FIELDS = (
+    't_freq_assgn', 'freq_rx', 't_long', 't_lat', 't_site_name', 't_bdwdth_cde',
+    't_gain_max', 't_pwr_dbw', 't_hgt_agl', 't_d_sent', 't_d_adm_ntc', 'repeat_of', 't_adm_ref_id',
+)
+
+
+def build_columns(batch):
+    """Формирует столбцы реестра для пакета станций листа (station_columns.column_batch)"""
+    size = batch_size(batch)
+
+    # Номер входящего: t_d_sent + t_d_adm_ntc; при повторной подаче первичным
+    # идёт номер самого раннего письма (notice_index.mark_repeats)
+    incoming_numbers = letter_numbers(batch['t_d_sent'], batch['t_d_adm_ntc'])
+    primary_numbers = fallback_column(batch['repeat_of'], incoming_numbers)
+    repeat_numbers = [
+        "" if repeat_of is None else number
+        for repeat_of, number in zip(batch['repeat_of'], incoming_numbers)
+    ]
+    empty = [""] * size
+
+    return [
+        numbers_column(batch['t_freq_assgn']),  # Частота передача
+        numbers_column(batch['freq_rx']),  # Частота приём
+        coordinates_column(batch['t_long']),  # Долгота
+        coordinates_column(batch['t_lat']),  # Широта
+        text_column(batch['t_site_name']),  # Пункт установки
+        text_column(batch['t_bdwdth_cde']),  # Ширина полосы
+        numbers_column(batch['t_gain_max']),  # Коэф усиления
+        numbers_column(batch['t_pwr_dbw']),  # Мощность
+        numbers_column(batch['t_hgt_agl']),  # Высота
+        primary_numbers,  # № входящего первичное
+        repeat_numbers,  # № входящего повторное
+        empty,  # № исходящего первичное
+        empty,  # № исходящего повторное
+        empty,  # Результат согласования
+        empty,  # Примечание
+        empty,  # Исполнитель
+        text_column(batch['t_adm_ref_id']),  # t_adm_ref_id
     ]
 
-    # Стиль заголовков
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=9)
-    alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-
-    # Применяем стили к строке 2
-    for col in range(1, 18):
-        cell = ws.cell(row=2, column=col)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = alignment
-        cell.border = border
-
-    # Записываем подзаголовки в третью строку
-    for col, header in enumerate(headers_row3, start=1):
-        cell = ws.cell(row=3, column=col)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = alignment
-        cell.border = border
-
-    # Записываем данные начиная с 4-й строки
-    row = 4
-    for data in all_data:
-        # Координаты
-        long_coord = convert_coordinates(data.get('t_long', ''))
-        lat_coord = convert_coordinates(data.get('t_lat', ''))
-
-        ws.cell(row, 1).value = data.get('t_freq_assgn', '')  # Частота передача
-        ws.cell(row, 2).value = data.get('freq_rx', '')  # Частота приём
-        ws.cell(row, 3).value = long_coord  # Долгота
-        ws.cell(row, 4).value = lat_coord  # Широта
-        ws.cell(row, 5).value = data.get('t_site_name', '')  # Пункт установки
-        ws.cell(row, 6).value = data.get('t_bdwdth_cde', '')  # Ширина полосы
-        ws.cell(row, 7).value = data.get('t_gain_max', '')  # Коэф усиления
-        ws.cell(row, 8).value = data.get('t_pwr_dbw', '')  # Мощность
-        ws.cell(row, 9).value = data.get('t_hgt_agl', '')  # Высота
-
-        # Формируем номер входящего: t_d_sent + t_d_adm_ntc
-        incoming_number = ""
-        d_sent = data.get('t_d_sent', '')
-        d_adm_ntc = data.get('t_d_adm_ntc', '')
-        if d_sent and d_adm_ntc:
-            incoming_number = f"{d_sent}/{d_adm_ntc}"
-        elif d_sent:
-            incoming_number = d_sent
-        elif d_adm_ntc:
-            incoming_number = d_adm_ntc
-
-        ws.cell(row, 10).value = incoming_number  # № входящего первичное
-        ws.cell(row, 11).value = ""  # № входящего повторное
-        ws.cell(row, 12).value = ""  # № исходящего первичное
-        ws.cell(row, 13).value = ""  # № исходящего повторное
-        ws.cell(row, 14).value = ""  # Результат согласования
-        ws.cell(row, 15).value = ""  # Примечание
-        ws.cell(row, 16).value = ""  # Исполнитель
-        ws.cell(row, 17).value = data.get('t_adm_ref_id', '')  # t_adm_ref_id
-
-        # Применяем стиль к ячейкам
-        for col in range(1, 18):
-            cell = ws.cell(row, col)
-            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            cell.border = border
-            cell.font = Font(size=9)
-
-        row += 1
-
-    # Настраиваем ширину столбцов
-    column_widths = [12, 12, 10, 10, 20, 10, 10, 12, 10, 15, 15, 15, 15, 15, 15, 15, 20]
-    for col, width in enumerate(column_widths, start=1):
-        column_letter = get_column_letter(col)
-        ws.column_dimensions[column_letter].width = width
-
-    # Высота строк
-    ws.row_dimensions[1].height = 30
-    ws.row_dimensions[2].height = 30
-    ws.row_dimensions[3].height = 40
-
-
-def create_excel(data_by_sheet, output_file):
-    """Создает Excel файл с несколькими листами"""
-    wb = Workbook()
-
-    # Удаляем дефолтный лист
-    if "Sheet" in wb.sheetnames:
-        wb.remove(wb["Sheet"])
-
-    # Создаем листы в определенном порядке
-    sheet_names = ["КГЗ", "ТЖК", "КАЗ", "ТКМ"]
-
-    for sheet_name in sheet_names:
-        ws = wb.create_sheet(sheet_name)
-
-        # Получаем данные для этого листа
-        sheet_data = data_by_sheet.get(sheet_name, [])
-
-        # Создаем лист с данными
-        create_sheet_with_data(ws, sheet_data)
-
-    wb.save(output_file)
-    print(f"✓ Excel файл создан: {output_file}")
-
-
-def main():
-    """Основная функция"""
-    # Папка с txt файлами
-    input_folder = input("Введите путь к папке с .txt файлами (ВХОДЯЩИЕ РРЛ): ").strip()
 
+# Реестр в базе станций и начало имени выходных файлов
+STORE_REGISTER = 'rrl_incoming'
+OUTPUT_NAME = "ВХОДЯЩИЕ_РРЛ"
+
+# Листы реестра в порядке следования
+SHEET_NAMES = ["КГЗ", "ТЖК", "КАЗ", "ТКМ"]
+
+
+def build_sheets(data_by_sheet):
+    """Описывает листы реестра для записи: (имя листа, оформление, пакет по столбцам, build_columns)
+    Каждый интервал станции (антенна → принимающая станция) — отдельная строка
+    """
+    return [
+        (
+            sheet_name,
+            SHEET_LAYOUT,
+            column_batch(hop_records(data_by_sheet.get(sheet_name, [])), BATCH_FIELDS),
+            build_columns,
+        )
+        for sheet_name in SHEET_NAMES
+    ]
+
+
+def process_file(file_path, jobs=1):
+    """Парсит один файл (выполняется в процессе пула)
+    jobs > 1 передаётся крупным файлам, которые разбираются по частям
+    Частоты приёма определяются после разбора всех файлов (station_links.link_stations)
+    """
+    return parse_txt_file(file_path, jobs)
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Парсер ВХОДЯЩИЕ РРЛ")
+    add_jobs_argument(parser)
+    add_format_argument(parser)
+    add_write_only_argument(parser)
+    add_cache_arguments(parser)
+    add_db_arguments(parser)
+    add_chains_argument(parser)
+    add_border_arguments(parser)
+    add_stats_argument(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def run(input_folder, output_folder=None, jobs=1, formats=None, write_only=False, cache=None, db=None, chains=False, border=None,
+        save_stats=False):
+    """Разбирает txt файлы папки и сохраняет результат
+    output_folder: папка для результата (по умолчанию — папка с txt файлами)
+    cache: кэш результатов разбора (parse_cache.cache_for_run) или None
+    db: путь к базе SQLite для станций (station_store.db_for_run) или None
+    chains: добавить лист цепочек связанных станций (station_links.chain_sheet)
+    border: граница для зоны координации (border_zone.border_for_run) или None
+    save_stats: сохранить отчёт о времени этапов в JSON рядом с реестром (run_stats.finish_stats)
+    Возвращает список созданных файлов (пустой, если сохранять нечего)
+    """
     if not os.path.exists(input_folder):
-        print("❌ Папка не найдена!")
-        return
+        raise FileNotFoundError(f"Папка не найдена: {input_folder}")
+
+    stats = open_stats(OUTPUT_NAME)
 
     # Находим все txt файлы
-    txt_files = [f for f in os.listdir(input_folder) if f.endswith('.txt')]
+    with stage(stats, 'list'):
+        txt_files = [f for f in os.listdir(input_folder) if f.endswith('.txt')]
 
     if not txt_files:
         print("❌ В папке нет .txt файлов!")
-        return
+        return []
 
     print(f"Найдено {len(txt_files)} файлов\n")
 
@@ -321,27 +267,43 @@ def main():
         'ТКМ': []
     }
 
-    # Обрабатываем файлы
-    total_stations = 0
-    for txt_file in txt_files:
-        file_path = os.path.join(input_folder, txt_file)
-        print(f"Обработка: {txt_file}...")
+    # Обрабатываем файлы (при --jobs > 1 — в пуле процессов, порядок сохраняется)
+    file_paths = [os.path.join(input_folder, txt_file) for txt_file in txt_files]
+    file_sizes = [os.path.getsize(file_path) for file_path in file_paths]
+    results = map_cached(cache, process_file, file_paths, jobs, file_sizes, stats)
 
-        stations_data, head_data = parse_txt_file(file_path)
+    # Станции по исходным файлам для записи в базу
+    store_batches = []
 
-        # Связываем станции и определяем частоты приёма
-        stations_data = link_stations(stations_data)
+    for txt_file, (stations_data, head_data) in zip(txt_files, results):
+        print(f"Обработка: {txt_file}...")
+        record_file(stats, txt_file, notices=len(stations_data))
 
         target_adm = head_data.get('t_adm', '')
 
         # Определяем целевой лист по t_adm из HEAD
         target_sheet = determine_sheet_from_adm(target_adm) if target_adm else 'КАЗ'
 
-        # Добавляем данные на соответствующий лист
-        data_by_sheet[target_sheet].extend(stations_data)
+        store_batches.append((os.path.abspath(os.path.join(input_folder, txt_file)), target_sheet, stations_data))
+        print(f"  └─ Извлечено {len(stations_data)} станций от {target_adm} → лист '{target_sheet}'\n")
+
+    print_cache_stats(cache)
 
+    # Повторная подача и дубликаты из разных файлов (индекс прошлых запусков — в базе)
+    with stage(stats, 'repeats'):
+        store_batches = mark_repeats(db, STORE_REGISTER, store_batches)
+
+    # Связываем интервалы станций всех файлов и определяем частоты приёма
+    with stage(stats, 'link'):
+        links = link_stations(store_batches)
+    with stage(stats, 'store'):
+        record_run(db, STORE_REGISTER, store_batches)
+
+    # Добавляем данные на соответствующие листы
+    total_stations = 0
+    for _, target_sheet, stations_data in store_batches:
+        data_by_sheet[target_sheet].extend(stations_data)
         total_stations += len(stations_data)
-        print(f"  └─ Извлечено {len(stations_data)} станций от {target_adm} → лист '{target_sheet}'\n")
 
     print(f"📊 Всего станций: {total_stations}")
     print("\n📋 Распределение по листам:")
@@ -351,12 +313,46 @@ def main():
         else:
             print(f"  • {sheet_name}: 0 станций (пустой)")
 
-    # Создаем Excel файл с уникальным именем
+    # Сохраняем результат в заданных форматах с уникальным именем
+    output_folder = output_folder or input_folder
+    os.makedirs(output_folder, exist_ok=True)
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    output_file = os.path.join(input_folder, f"ВХОДЯЩИЕ_РРЛ_{timestamp}.xlsx")
-    create_excel(data_by_sheet, output_file)
+    output_base = os.path.join(output_folder, f"{OUTPUT_NAME}_{timestamp}")
+    with stage(stats, 'sheets'):
+        sheets = border_sheets(build_sheets(data_by_sheet), border)
+        if chains:
+            sheets.append(chain_sheet(links))
+    output_files = write_outputs(sheets, output_base, formats, write_only, stats)
+    output_files += finish_stats(stats, output_base, save_stats)
 
-    print(f"\n✅ Готово! Данные сохранены в: {output_file}")
+    print(f"\n✅ Готово! Данные сохранены в: {', '.join(output_files)}")
+
+    return output_files
+
+
+def main(argv=None):
+    """Основная функция"""
+    args = parse_args(argv)
+
+    # Папка с txt файлами
+    input_folder = input("Введите путь к папке с .txt файлами (ВХОДЯЩИЕ РРЛ): ").strip()
+
+    # Кэш разобранных файлов (повторный запуск разбирает только новые и изменённые)
+    cache = cache_for_run(input_folder, args.cache_dir, args.use_cache, args.cache_size)
+    db = db_for_run(args.db_path, args.use_db)
+
+    try:
+        border = border_for_run(args.border, args.border_distance, args.border_filter)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    try:
+        with profile_run(OUTPUT_NAME, input_folder, args.profile, args.trace_memory):
+            run(input_folder, jobs=args.jobs, formats=args.formats, write_only=args.write_only, cache=cache, db=db, chains=args.chains, border=border,
+                save_stats=args.save_stats)
+    except FileNotFoundError:
+        print("❌ Папка не найдена!")
 
 
 if __name__ == "__main__":
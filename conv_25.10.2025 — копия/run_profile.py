@@ -0,0 +1,130 @@
+"""
+Диагностика медленных запусков и нехватки памяти без правки скриптов.
+
+С --profile запуск парсера выполняется под cProfile: профиль сохраняется в
+<парсер>_<время>.prof рядом с реестром, а самые долгие функции печатаются
+(подробно: python -m pstats FILE или snakeviz FILE). С --trace-memory
+включается tracemalloc: печатается пик памяти и строки кода с наибольшими
+выделениями (станции разобранных файлов, ячейки openpyxl...):
+
+    with profile_run(OUTPUT_NAME, input_folder, args.profile, args.trace_memory):
+        run(input_folder, ...)
+
+Места выделений берутся из снимка tracemalloc на границе этапа с наибольшим
+занятым объёмом (run_stats.stage вызывает memory_checkpoint) — к концу
+запуска данные уже освобождены. Оба режима видят только основной процесс:
+при --jobs > 1 разбор в пуле процессов в профиль не попадает, для
+диагностики разбора запускайте с -j 1.
+"""
+import cProfile
+import linecache
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Сколько функций профиля печатать
+PROFILE_TOP = 15
+
+# Сколько мест выделения памяти печатать
+MEMORY_TOP = 10
+
+# Новый снимок памяти — когда занято больше прежнего снимка в это число раз
+# (снимок при миллионах объектов занимает секунды)
+SNAPSHOT_GROWTH = 1.1
+
+_MB = 1024 * 1024
+
+# Снимок памяти текущего запуска: {'snapshot', 'size', 'stage'}
+_memory = {}
+
+
+def add_profile_arguments(parser):
+    """Добавляет в argparse опции --profile и --trace-memory"""
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help="профилировать запуск (cProfile): <парсер>_<время>.prof рядом с реестром"
+    )
+    parser.add_argument(
+        '--trace-memory',
+        action='store_true',
+        help="показать пик памяти и места наибольших выделений (tracemalloc, замедляет запуск)"
+    )
+
+
+def memory_checkpoint(stage_name):
+    """Снимок памяти на границе этапа, если занято заметно больше, чем в прежнем снимке"""
+    if not _memory or not tracemalloc.is_tracing():
+        return
+    size, _ = tracemalloc.get_traced_memory()
+    if size < _memory['size'] * SNAPSHOT_GROWTH:
+        return
+    _memory.update(snapshot=tracemalloc.take_snapshot(), size=size, stage=stage_name)
+
+
+def print_profile(profiler, output_file):
+    """Сохраняет профиль в файл и печатает самые долгие функции"""
+    profiler.dump_stats(output_file)
+    print(f"\n🔬 Профиль cProfile: {output_file} (просмотр: python -m pstats {output_file})")
+    pstats.Stats(output_file).strip_dirs().sort_stats('cumulative').print_stats(PROFILE_TOP)
+
+
+def print_memory(peak):
+    """Печатает пик памяти и места наибольших выделений из снимка"""
+    print(f"\n🧠 Пик памяти (объекты Python): {peak / _MB:.1f} МБ")
+    snapshot = _memory.get('snapshot')
+    if snapshot is None:
+        return
+
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        tracemalloc.Filter(False, '<unknown>'),
+    ])
+    print(f"  Наибольшие выделения (этап '{_memory['stage']}', занято {_memory['size'] / _MB:.1f} МБ):")
+    for statistic in snapshot.statistics('lineno')[:MEMORY_TOP]:
+        frame = statistic.traceback[0]
+        line = linecache.getline(frame.filename, frame.lineno).strip()
+        print(
+            f"  • {os.path.basename(frame.filename)}:{frame.lineno} — {statistic.size / _MB:.1f} МБ"
+            f" ({statistic.count} объектов): {line}"
+        )
+
+
+@contextmanager
+def profile_run(name, output_folder, profile=False, trace_memory=False):
+    """Выполняет блок под cProfile и/или tracemalloc и печатает результат
+    name: имя парсера для файла профиля, output_folder: папка для .prof
+    Профиль сохраняется и при ошибке запуска (если папка существует).
+    """
+    if not profile and not trace_memory:
+        yield
+        return
+
+    profiler = cProfile.Profile() if profile else None
+    tracing = trace_memory and not tracemalloc.is_tracing()
+    if trace_memory:
+        _memory.clear()
+        _memory.update(snapshot=None, size=0, stage=None)
+        if tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            print_memory(peak)
+            _memory.clear()
+            if tracing:
+                tracemalloc.stop()
+        if profiler is not None and os.path.isdir(output_folder):
+            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            print_profile(profiler, os.path.join(output_folder, f"{name}_{timestamp}.prof"))
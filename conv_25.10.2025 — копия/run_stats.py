@@ -0,0 +1,235 @@
+"""
+Замер времени этапов запуска парсера: поиск файлов, разбор каждого файла,
+связывание и повторная подача, запись в базу, подготовка листов, запись
+каждого листа и сохранение книги.
+
+Парсер открывает отчёт в начале run() и отмечает этапы; разбор файлов
+замеряется в map_cached (в процессе пула — время самого разбора), листы —
+в write_outputs:
+
+    stats = open_stats(OUTPUT_NAME)
+    with stage(stats, 'list'):
+        txt_files = ...
+    results = map_cached(cache, process_file, file_paths, jobs, file_sizes, stats)
+    record_file(stats, file_path, notices=len(stations_data))
+    output_files = write_outputs(sheets, output_base, formats, write_only, stats)
+    output_files += finish_stats(stats, output_base, save_stats)
+
+В конце печатается сводка (уведомлений/с, МБ/с, строк/с), а с --stats
+отчёт сохраняется в <output_base>_stats.json рядом с реестром — для
+сравнения производительности между версиями и объёмами данных.
+Везде stats=None означает «без замера».
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+
+from parallel import map_in_order
+from run_profile import memory_checkpoint
+
+# Названия этапов для сводки
+STAGE_NAMES = {
+    'list': "поиск файлов",
+    'parse': "разбор файлов",
+    'cache': "чтение из кэша",
+    'repeats': "повторная подача",
+    'link': "связывание интервалов",
+    'store': "запись в базу",
+    'sheets': "подготовка листов",
+    'conflicts': "конфликты частот",
+    'proximity': "соседние станции",
+    'save_xlsx': "сохранение книги Excel",
+}
+
+# Сколько самых долгих файлов показывать в сводке
+SLOWEST_FILES = 3
+
+_MB = 1024 * 1024
+
+
+def add_stats_argument(parser):
+    """Добавляет в argparse опцию --stats"""
+    parser.add_argument(
+        '--stats',
+        dest='save_stats',
+        action='store_true',
+        help="сохранить отчёт о времени этапов (JSON) рядом с реестром"
+    )
+
+
+def open_stats(parser_name):
+    """Новый отчёт о запуске парсера"""
+    return {
+        'parser': parser_name,
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'started': time.perf_counter(),
+        'stages': {},
+        'files': {},
+        'sheets': {},
+    }
+
+
+def add_stage(stats, name, seconds):
+    """Добавляет время к этапу"""
+    if stats is not None:
+        stats['stages'][name] = stats['stages'].get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(stats, name):
+    """Замеряет время блока как этап name (с --trace-memory — и снимок памяти)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_stage(stats, name, time.perf_counter() - started)
+        memory_checkpoint(name)
+
+
+def file_name(item):
+    """Имя файла (или пары T12 + T13) для отчёта"""
+    if isinstance(item, (tuple, list)):
+        return ' + '.join(os.path.basename(path) for path in item if path)
+    return os.path.basename(item)
+
+
+def record_file(stats, item, **values):
+    """Добавляет значения (seconds, bytes, notices...) к записи файла"""
+    if stats is None:
+        return
+    record = stats['files'].setdefault(file_name(item), {})
+    for key, value in values.items():
+        if isinstance(value, bool) or key not in record:
+            record[key] = value
+        else:
+            record[key] += value
+
+
+def timed_call(func, *args):
+    """Вызывает func и возвращает (результат, время в секундах); выполняется и в процессе пула"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def map_timed(stats, func, items, jobs=1, sizes=None):
+    """Генератор как parallel.map_in_order, но с замером разбора каждого элемента
+    Ожидание результатов учитывается как этап 'parse'.
+    """
+    if stats is None:
+        yield from map_in_order(func, items, jobs, sizes)
+        return
+
+    items = list(items)
+    results = map_in_order(partial(timed_call, func), items, jobs, sizes)
+    for i, item in enumerate(items):
+        started = time.perf_counter()
+        result, seconds = next(results)
+        add_stage(stats, 'parse', time.perf_counter() - started)
+        record_file(stats, item, seconds=seconds, bytes=sizes[i] if sizes is not None else 0, cached=False)
+        yield result
+
+
+@contextmanager
+def sheet_stage(stats, format_name, sheet_name, rows):
+    """Замеряет запись листа: отдаёт строки листа, считая их, и сохраняет время и число строк"""
+    if stats is None:
+        yield rows
+        return
+
+    counter = {'rows': 0}
+
+    def counted():
+        for values in rows:
+            counter['rows'] += 1
+            yield values
+
+    started = time.perf_counter()
+    yield counted()
+    record_sheet(stats, format_name, sheet_name, time.perf_counter() - started, counter['rows'])
+
+
+def record_sheet(stats, format_name, sheet_name, seconds, rows):
+    """Добавляет время записи листа и число строк (одноимённые листы разных реестров суммируются)"""
+    if stats is None:
+        return
+    record = stats['sheets'].setdefault(format_name, {}).setdefault(sheet_name, {'seconds': 0.0, 'rows': 0})
+    record['seconds'] += seconds
+    record['rows'] += rows
+
+
+def _rate(amount, seconds):
+    """Величина в секунду (0, если время не замерено)"""
+    return amount / seconds if seconds > 0 else 0.0
+
+
+def summary(stats):
+    """Итоги отчёта: общее время, байты, уведомления, строки и скорости"""
+    files = stats['files'].values()
+    parsed = [record for record in files if not record.get('cached')]
+    parse_seconds = stats['stages'].get('parse', 0.0)
+    read_bytes = sum(record.get('bytes', 0) for record in parsed)
+    notices = sum(record.get('notices', 0) for record in files)
+    parsed_notices = sum(record.get('notices', 0) for record in parsed)
+
+    return {
+        'total_seconds': time.perf_counter() - stats['started'],
+        'files': len(stats['files']),
+        'cached_files': len(stats['files']) - len(parsed),
+        'bytes_read': read_bytes,
+        'notices': notices,
+        'mb_per_second': _rate(read_bytes / _MB, parse_seconds),
+        'notices_per_second': _rate(parsed_notices, parse_seconds),
+        'rows_written': {
+            format_name: sum(sheet['rows'] for sheet in sheets.values())
+            for format_name, sheets in stats['sheets'].items()
+        },
+    }
+
+
+def print_stats(stats, totals):
+    """Печатает сводку по этапам"""
+    print(f"\n⏱  Время этапов (всего {totals['total_seconds']:.2f} с):")
+    for name, seconds in stats['stages'].items():
+        label = STAGE_NAMES.get(name) or name.replace('write_', "запись ")
+        line = f"  • {label}: {seconds:.2f} с"
+        if name == 'parse':
+            line += (
+                f" — файлов: {totals['files'] - totals['cached_files']}, {totals['bytes_read'] / _MB:.1f} МБ"
+                f" ({totals['mb_per_second']:.2f} МБ/с), {totals['notices_per_second']:.0f} уведомлений/с"
+            )
+        elif name.startswith('write_'):
+            rows = totals['rows_written'].get(name[len('write_'):], 0)
+            line += f" — строк: {rows} ({_rate(rows, seconds):.0f} строк/с)"
+        print(line)
+
+    slowest = sorted(
+        ((record['seconds'], name) for name, record in stats['files'].items() if not record.get('cached')),
+        reverse=True,
+    )[:SLOWEST_FILES]
+    if slowest:
+        print("  • самые долгие файлы: " + ', '.join(f"{name} ({seconds:.2f} с)" for seconds, name in slowest))
+
+
+def finish_stats(stats, output_base, save=False):
+    """Печатает сводку и с save=True сохраняет отчёт в <output_base>_stats.json
+    Возвращает список созданных файлов (пустой или путь к отчёту)
+    """
+    if stats is None:
+        return []
+
+    totals = summary(stats)
+    print_stats(stats, totals)
+    if not save:
+        return []
+
+    report = {key: value for key, value in stats.items() if key != 'started'}
+    report['summary'] = totals
+    output_file = f"{output_base}_stats.json"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📈 Отчёт о времени этапов: {output_file}")
+    return [output_file]
@@ -0,0 +1,123 @@
+"""
+Нечёткое сопоставление названий станций T12 (передача) и T13 (приём).
+
+Одна и та же станция в T12 и T13 может быть записана по-разному: пробелы,
+регистр, кириллические буквы вместо похожих латинских («А», «С», «О»...),
+знаки препинания или добавленное слово. Названия приводятся к ключу
+сравнения (match_key), а кандидаты ищутся по индексу триграмм ключа, а не
+перебором всех пар:
+
+    index = open_site_index()
+    add_site(index, row)                       # строки T12 без пары
+    position, score = find_site(index, data)   # станция T13 → (позиция строки, уверенность)
+
+Числа в названии должны совпадать точно (SITE_10 и SITE_11 — разные станции),
+поэтому они входят в ключ блока индекса. Уверенность — коэффициент Дайса по
+триграммам ключей (1.0 — ключи совпали). Совпавшие координаты
+(t_long/t_lat) подтверждают пару и снижают требуемый порог сходства.
+"""
+import re
+from collections import Counter
+
+# Минимальная уверенность для объединения по одному названию
+MIN_SCORE = 0.8
+
+# Минимальная уверенность, если координаты станций совпали
+MIN_SCORE_WITH_COORDINATES = 0.6
+
+# Кириллические буквы, совпадающие по написанию с латинскими
+_HOMOGLYPHS = str.maketrans('АВЕЁКМНОРСТУХІ', 'ABEEKMHOPCTYXI')
+
+_NON_ALNUM = re.compile(r'[\W_]+')
+_DIGITS = re.compile(r'\d+')
+
+
+def match_key(site_name):
+    """Ключ сравнения названия: верхний регистр, латинские двойники кириллицы,
+    слова без знаков препинания через один пробел
+    """
+    text = site_name.upper().translate(_HOMOGLYPHS)
+    return ' '.join(_NON_ALNUM.sub(' ', text).split())
+
+
+def _trigrams(key):
+    """Множество триграмм ключа (с границами слов)"""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _block(key):
+    """Блок индекса: числа названия (без ведущих нулей)"""
+    return tuple(number.lstrip('0') or '0' for number in _DIGITS.findall(key))
+
+
+def _coordinates(data):
+    """Координаты станции (долгота, широта) или None, если какой-то нет"""
+    long_coord = data.get('t_long', '')
+    lat_coord = data.get('t_lat', '')
+    if long_coord and lat_coord:
+        return long_coord, lat_coord
+    return None
+
+
+def open_site_index():
+    """Пустой индекс названий станций"""
+    return {'rows': [], 'grams': [], 'postings': {}}
+
+
+def add_site(index, row):
+    """Добавляет строку в индекс"""
+    key = match_key(row.get('t_site_name', ''))
+    if not key:
+        return
+
+    position = len(index['rows'])
+    grams = _trigrams(key)
+    index['rows'].append(row)
+    index['grams'].append(grams)
+
+    block = _block(key)
+    for gram in grams:
+        index['postings'].setdefault((block, gram), []).append(position)
+
+
+def find_site(index, data, taken=()):
+    """Ближайшая строка индекса для станции data: (позиция строки, уверенность) или (None, 0.0)
+    taken: позиции строк, уже объединённых с другими станциями
+    """
+    key = match_key(data.get('t_site_name', ''))
+    if not key:
+        return None, 0.0
+
+    # Общие триграммы с каждым кандидатом из того же блока
+    block = _block(key)
+    grams = _trigrams(key)
+    shared = Counter()
+    for gram in grams:
+        shared.update(index['postings'].get((block, gram), ()))
+
+    coordinates = _coordinates(data)
+    best, best_score = None, 0.0
+    for position, count in shared.items():
+        if position in taken:
+            continue
+
+        score = 2 * count / (len(grams) + len(index['grams'][position]))
+        if score < MIN_SCORE_WITH_COORDINATES or score <= best_score:
+            continue
+
+        # Ниже основного порога пару подтверждают только совпавшие координаты
+        if score < MIN_SCORE and (coordinates is None or coordinates != _coordinates(index['rows'][position])):
+            continue
+
+        best, best_score = position, score
+
+    return best, best_score
+
+
+def match_notes(matched_site_names, match_scores):
+    """Примечания к строкам, объединённым по похожему названию (остальным — пустая строка)"""
+    return [
+        f"T13: «{matched_site_name}», совпадение {match_score or 0:.2f}" if matched_site_name else ""
+        for matched_site_name, match_score in zip(matched_site_names, match_scores)
+    ]
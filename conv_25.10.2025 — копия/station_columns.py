@@ -0,0 +1,194 @@
+"""
+Пакеты станций по столбцам и векторные преобразования значений реестра.
+
+Станции листа (после разбора, связывания и отметки повторной подачи)
+собираются в пакет — словарь {поле: столбец значений}. Парсер описывает лист
+функцией build_columns(batch), которая возвращает столбцы листа целиком, а
+преобразования идут сразу над столбцом (pandas):
+
+    batch = column_batch(stations, BATCH_FIELDS)
+    columns = [numbers_column(batch['t_freq_assgn']), coordinates_column(batch['t_long']), ...]
+
+ - coordinates_column — +0691949 → 69-19-49 (или без разделителя);
+ - degrees_column — +0691949 → 69.330278 (десятичные градусы);
+ - dates_column — 2025-08-13 → 13.08.2025;
+ - numbers_column — частоты, мощность, усиление, высота → числа;
+ - letter_numbers — номер письма t_d_sent/t_d_adm_ntc.
+
+Отсутствующее поле в пакете — None. Без pandas те же функции работают
+поэлементно.
+"""
+from datetime import datetime
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = pd = None
+
+# Целые от этой величины не помещаются в int64 и остаются float
+_INT64_LIMIT = 2 ** 63
+
+# От этой величины float64 теряет целые, поэтому такие значения разбираются float()
+# поэлементно — результат совпадает с разбором без pandas
+_EXACT_FLOAT_LIMIT = 2 ** 53
+
+
+def column_batch(records, fields):
+    """Пакет по столбцам: {поле: [значение каждой записи или None]}"""
+    records = list(records)
+    return {field: [record.get(field) for record in records] for field in fields}
+
+
+def batch_size(batch):
+    """Число записей в пакете"""
+    return len(next(iter(batch.values()), ()))
+
+
+def _series(values):
+    """Столбец строк pandas: None → пустая строка"""
+    return pd.Series(values, dtype=object).fillna('')
+
+
+def text_column(values):
+    """Текстовый столбец: отсутствующие значения — пустые строки"""
+    return ['' if value is None else value for value in values]
+
+
+def fallback_column(values, fallback):
+    """Значения столбца, а где их нет — значения запасного столбца"""
+    return [fallback_value if value is None else value for value, fallback_value in zip(values, fallback)]
+
+
+def _convert_coordinates(coord_str, separator):
+    """Поэлементное преобразование координат (без pandas)"""
+    if not coord_str:
+        return ""
+
+    coord_str = coord_str.strip('+')
+    if len(coord_str) == 7:
+        return f"{coord_str[0:2]}{separator}{coord_str[2:4]}{separator}{coord_str[4:7]}"
+    elif len(coord_str) == 6:
+        return f"{coord_str[0:2]}{separator}{coord_str[2:4]}{separator}{coord_str[4:6]}"
+    return coord_str
+
+
+def coordinates_column(values, separator='-'):
+    """Координаты из формата +0691949 в 69-19-49 (separator — разделитель частей)"""
+    if pd is None or not values:
+        return [_convert_coordinates(value, separator) for value in values]
+
+    coords = _series(values).str.strip('+')
+    if not separator:
+        return coords.tolist()
+
+    lengths = coords.str.len()
+    head = coords.str[0:2] + separator + coords.str[2:4] + separator
+    result = coords.where(lengths != 7, head + coords.str[4:7])
+    result = result.where(lengths != 6, head + coords.str[4:6])
+    return result.tolist()
+
+
+def _degrees(coord_str):
+    """Поэлементное преобразование в десятичные градусы (без pandas)"""
+    coord_str = (coord_str or '').strip()
+    sign = -1 if coord_str.startswith('-') else 1
+    digits = coord_str.lstrip('+-')
+    if not digits.isdigit() or len(digits) not in (6, 7):
+        return None
+
+    degrees_length = len(digits) - 4
+    degrees = int(digits[:degrees_length])
+    minutes = int(digits[degrees_length:degrees_length + 2])
+    seconds = int(digits[degrees_length + 2:])
+    return sign * (degrees + minutes / 60 + seconds / 3600)
+
+
+def degrees_column(values):
+    """Координаты МСЭ (±DDDMMSS долгота, ±DDMMSS широта) в десятичные градусы; None — нет координаты"""
+    if pd is None or not values:
+        return [_degrees(value) for value in values]
+
+    coords = _series(values).str.strip()
+    sign = np.where(coords.str.startswith('-'), -1.0, 1.0)
+    digits = coords.str.lstrip('+-')
+    lengths = digits.str.len()
+    valid = digits.str.fullmatch(r'\d{6,7}') & lengths.isin((6, 7))
+
+    # Градусы — всё, кроме последних четырёх цифр (минуты и секунды)
+    padded = digits.where(lengths != 6, '0' + digits).where(valid, '0000000')
+    degrees = padded.str[0:3].astype(int)
+    minutes = padded.str[3:5].astype(int)
+    seconds = padded.str[5:7].astype(int)
+
+    result = pd.Series(sign * (degrees + minutes / 60 + seconds / 3600), dtype=object)
+    return result.where(valid, None).tolist()
+
+
+def _convert_date(date_str):
+    """Поэлементное преобразование даты (без pandas)"""
+    if not date_str:
+        return ""
+    try:
+        return datetime.strptime(date_str.strip(), "%Y-%m-%d").strftime("%d.%m.%Y")
+    except ValueError:
+        return date_str
+
+
+def dates_column(values):
+    """Даты из формата 2025-08-13 в 13.08.2025 (нераспознанные остаются как есть)"""
+    if pd is None or not values:
+        return [_convert_date(value) for value in values]
+
+    dates = _series(values)
+    parsed = pd.to_datetime(dates.str.strip(), format="%Y-%m-%d", errors='coerce')
+    return parsed.dt.strftime("%d.%m.%Y").where(parsed.notna(), dates).tolist()
+
+
+def _number(value):
+    """Поэлементное преобразование в число (без pandas)"""
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    if number != number or number in (float('inf'), float('-inf')):
+        return value
+    return int(number) if number.is_integer() and abs(number) < _INT64_LIMIT else number
+
+
+def numbers_column(values):
+    """Числовой столбец: целые — int, дробные — float, пустые — None,
+    нечисловой текст (и inf, nan) остаётся строкой; целые вне int64 — float
+    """
+    if pd is None or not values:
+        return [_number(value) for value in values]
+
+    text = _series(values)
+    numbers = pd.to_numeric(text, errors='coerce')
+    finite = numbers.notna() & np.isfinite(numbers)
+    large = finite & (numbers.abs() >= _EXACT_FLOAT_LIMIT)
+    integral = finite & ~large & (numbers % 1 == 0)
+
+    result = numbers.astype(object).where(finite, None)
+    result[integral] = numbers[integral].astype('int64').astype(object)
+    result[large] = pd.Series([_number(value) for value in text[large]], index=text.index[large], dtype=object)
+    unparsed = ~finite & (text != '')
+    result[unparsed] = text[unparsed]
+    return result.tolist()
+
+
+def letter_numbers(d_sent_values, d_adm_ntc_values):
+    """Номера писем: t_d_sent/t_d_adm_ntc (или то из них, что есть)"""
+    if pd is None or not d_sent_values:
+        return [
+            f"{d_sent}/{d_adm_ntc}" if d_sent and d_adm_ntc else d_sent or d_adm_ntc or ''
+            for d_sent, d_adm_ntc in zip(d_sent_values, d_adm_ntc_values)
+        ]
+
+    d_sent = _series(d_sent_values)
+    d_adm_ntc = _series(d_adm_ntc_values)
+    both = (d_sent != '') & (d_adm_ntc != '')
+    single = d_sent.where(d_sent != '', d_adm_ntc)
+    return single.where(~both, d_sent + '/' + d_adm_ntc).tolist()
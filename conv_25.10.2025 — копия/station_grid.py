@@ -0,0 +1,258 @@
+"""
+Пространственный индекс станций по координатам: «какие станции ближе R км»
+и «ближайшая станция» без перебора всех пар.
+
+Координаты МСЭ (t_long/t_lat, +0691949) переводятся в десятичные градусы
+(station_columns.degrees_column), станции раскладываются по ячейкам сетки
+широта × долгота размером около cell_km. Запрос проверяет только ячейки,
+попадающие в прямоугольник вокруг точки, и считает расстояние по большому
+кругу для станций из них:
+
+    index = open_spatial_index(incoming_stations)
+    point = station_point(uzb_station)                    # (долгота, широта) или None
+    stations_within(index, point, 50)                     # [(расстояние, станция)], ближние первыми
+    nearest_station(index, point)                         # (расстояние, станция) или (None, None)
+
+Индекс можно построить и по базе станций (station_store.load_register).
+Станции без координат в индекс не попадают. С --proximity совместный
+парсер РРЛ добавляет в реестр ИСХОДЯЩИЕ РРЛ лист «Соседние станции» (proximity_sheet).
+"""
+import math
+
+from notice_index import letter_number
+from station_columns import degrees_column
+
+# Средний радиус Земли, км
+EARTH_RADIUS_KM = 6371.0
+
+# Километров в одном градусе широты
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+# Размер ячейки сетки по умолчанию, км
+DEFAULT_CELL_KM = 25.0
+
+# Половина окружности Земли — дальше точек не бывает
+MAX_DISTANCE_KM = EARTH_RADIUS_KM * math.pi
+
+PROXIMITY_SHEET_NAME = "Соседние станции"
+
+# Радиус поиска соседних станций по умолчанию, км
+DEFAULT_PROXIMITY_KM = 50.0
+
+# Оформление листа соседних станций
+PROXIMITY_LAYOUT = {
+    'title': "Ближайшие входящие (иностранные) станции к исходящим станциям UZB",
+    'title_range': 'A1:J1',
+    'groups': [
+        ('B2:E2', "Исходящая станция (UZB)"),
+        ('F2:I2', "Ближайшая входящая станция"),
+    ],
+    'headers': [
+        "№",
+        "Пункт установки",
+        "Долгота",
+        "Широта",
+        "id1",
+        "Администрация",
+        "Пункт установки",
+        "Расстояние,\nкм",
+        "№ входящего\nписьма",
+        "Входящих станций\nв радиусе",
+    ],
+    'column_widths': [8, 20, 12, 12, 15, 15, 20, 12, 18, 16],
+    'row_heights': {1: 30, 2: 30, 3: 40},
+}
+
+
+def add_proximity_arguments(parser):
+    """Добавляет в argparse опции --proximity и --proximity-distance"""
+    parser.add_argument(
+        '--proximity',
+        action='store_true',
+        help=f"добавить лист «{PROXIMITY_SHEET_NAME}» — ближайшие входящие станции к каждой станции UZB"
+    )
+    parser.add_argument(
+        '--proximity-distance',
+        type=float,
+        default=DEFAULT_PROXIMITY_KM,
+        metavar='KM',
+        help=f"радиус подсчёта соседних станций, км (по умолчанию {DEFAULT_PROXIMITY_KM:g})"
+    )
+
+
+def distance_km(point_a, point_b):
+    """Расстояние по большому кругу между точками (долгота, широта) в градусах"""
+    long_a, lat_a = map(math.radians, point_a)
+    long_b, lat_b = map(math.radians, point_b)
+    h = math.sin((lat_b - lat_a) / 2) ** 2 + math.cos(lat_a) * math.cos(lat_b) * math.sin((long_b - long_a) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def station_points(stations):
+    """Координаты станций в десятичных градусах: [(долгота, широта) или None]"""
+    return column_points([station.get('t_long') for station in stations], [station.get('t_lat') for station in stations])
+
+
+def column_points(long_values, lat_values):
+    """Точки из столбцов t_long/t_lat: [(долгота, широта) или None]
+    Широта вне ±90° считается ошибкой — у такой станции координат нет.
+    """
+    longs = degrees_column(long_values)
+    lats = degrees_column(lat_values)
+    return [
+        (long_deg, lat_deg) if long_deg is not None and lat_deg is not None and abs(lat_deg) <= 90 else None
+        for long_deg, lat_deg in zip(longs, lats)
+    ]
+
+
+def station_point(station):
+    """Координаты одной станции (долгота, широта) или None"""
+    return station_points([station])[0]
+
+
+def normalize_point(point):
+    """Точка с долготой в диапазоне [-180, 180)"""
+    return (point[0] + 180.0) % 360.0 - 180.0, point[1]
+
+
+def grid_cell(index, point):
+    """Ячейка сетки точки (номер по долготе, номер по широте)"""
+    size = index['cell_deg']
+    return math.floor(point[0] / size), math.floor(point[1] / size)
+
+
+def open_grid(cell_km=DEFAULT_CELL_KM):
+    """Пустая сетка: {'cell_deg': размер ячейки в градусах, 'cells': {ячейка: [позиции]}}"""
+    return {'cell_deg': cell_km / KM_PER_DEGREE, 'cells': {}}
+
+
+def open_spatial_index(stations, cell_km=DEFAULT_CELL_KM):
+    """Индекс станций по сетке координат (станции без координат пропускаются)"""
+    stations = list(stations)
+    index = dict(open_grid(cell_km), stations=[], points=[])
+    for station, point in zip(stations, station_points(stations)):
+        if point is None:
+            continue
+        point = normalize_point(point)
+        index['cells'].setdefault(grid_cell(index, point), []).append(len(index['points']))
+        index['stations'].append(station)
+        index['points'].append(point)
+    return index
+
+
+def cells_near(index, point, radius_km):
+    """Непустые ячейки сетки (списки позиций) в прямоугольнике вокруг точки"""
+    long_deg, lat_deg = normalize_point(point)
+    lat_span = radius_km / KM_PER_DEGREE
+    # Градус долготы короче к полюсам — берём самую высокую широту прямоугольника
+    max_lat = min(90.0, abs(lat_deg) + lat_span)
+    cos_lat = math.cos(math.radians(max_lat))
+    long_span = 180.0 if cos_lat < 1e-9 else lat_span / cos_lat
+
+    # Диапазоны долгот (прямоугольник может переходить через 180-й меридиан)
+    if long_span >= 180.0:
+        long_ranges = [(-180.0, 180.0)]
+    elif long_deg - long_span < -180.0:
+        long_ranges = [(long_deg - long_span + 360.0, 180.0), (-180.0, long_deg + long_span)]
+    elif long_deg + long_span > 180.0:
+        long_ranges = [(long_deg - long_span, 180.0), (-180.0, long_deg + long_span - 360.0)]
+    else:
+        long_ranges = [(long_deg - long_span, long_deg + long_span)]
+
+    cells = index['cells']
+    found = []
+    for low_long_deg, high_long_deg in long_ranges:
+        low_long, low_lat = grid_cell(index, (low_long_deg, lat_deg - lat_span))
+        high_long, high_lat = grid_cell(index, (high_long_deg, lat_deg + lat_span))
+        if (high_long - low_long + 1) * (high_lat - low_lat + 1) > len(cells):
+            # Прямоугольник больше заполненной части сетки — проверяем только заполненные ячейки
+            found += [
+                positions for (cell_long, cell_lat), positions in cells.items()
+                if low_long <= cell_long <= high_long and low_lat <= cell_lat <= high_lat
+            ]
+        else:
+            found += [
+                cells[cell_long, cell_lat]
+                for cell_long in range(low_long, high_long + 1)
+                for cell_lat in range(low_lat, high_lat + 1)
+                if (cell_long, cell_lat) in cells
+            ]
+    return found
+
+
+def positions_within(index, point, radius_km):
+    """Станции индекса не дальше radius_km от точки: [(расстояние, позиция)], ближние первыми"""
+    point = normalize_point(point)
+    points = index['points']
+    found = []
+    for positions in cells_near(index, point, radius_km):
+        for position in positions:
+            distance = distance_km(point, points[position])
+            if distance <= radius_km:
+                found.append((distance, position))
+    found.sort()
+    return found
+
+
+def stations_within(index, point, radius_km):
+    """Станции не дальше radius_km от точки (долгота, широта): [(расстояние, станция)], ближние первыми"""
+    stations = index['stations']
+    return [(distance, stations[position]) for distance, position in positions_within(index, point, radius_km)]
+
+
+def nearest_station(index, point):
+    """Ближайшая к точке станция индекса: (расстояние, станция) или (None, None)"""
+    if not index['points']:
+        return None, None
+
+    # Радиус поиска растёт, пока в него не попадёт хотя бы одна станция
+    radius_km = index['cell_deg'] * KM_PER_DEGREE
+    while True:
+        found = positions_within(index, point, radius_km)
+        if found:
+            distance, position = found[0]
+            return distance, index['stations'][position]
+        if radius_km >= MAX_DISTANCE_KM:
+            return None, None
+        radius_km = min(radius_km * 2, MAX_DISTANCE_KM)
+
+
+def build_proximity_columns(batch):
+    """Формирует столбцы листа соседних станций для пакета proximity_sheet"""
+    stations = batch['station']
+    nearest = batch['nearest']
+
+    return [
+        list(range(1, len(stations) + 1)),  # №
+        [station.get('t_site_name', '') for station in stations],  # Пункт установки
+        [None if point is None else round(point[0], 6) for point in batch['point']],  # Долгота
+        [None if point is None else round(point[1], 6) for point in batch['point']],  # Широта
+        [station.get('t_adm_ref_id', '') for station in stations],  # id1
+        [station.get('t_adm', '') if station is not None else '' for station in nearest],  # Администрация
+        [station.get('t_site_name', '') if station is not None else '' for station in nearest],  # Пункт установки
+        [None if distance is None else round(distance, 1) for distance in batch['distance']],  # Расстояние
+        [letter_number(station) if station is not None else '' for station in nearest],  # № входящего письма
+        batch['count'],  # Входящих станций в радиусе
+    ]
+
+
+def proximity_sheet(incoming_batches, outgoing_batches, radius_km=DEFAULT_PROXIMITY_KM):
+    """Описывает лист соседних станций для записи: (имя листа, оформление, пакет по столбцам, build_columns)
+    Для каждой исходящей станции UZB — ближайшая входящая станция и число входящих станций
+    не дальше radius_km. incoming_batches, outgoing_batches: [(исходный файл, лист, станции), ...]
+    """
+    index = open_spatial_index(station for _, _, stations in incoming_batches for station in stations)
+    outgoing_stations = [station for _, _, stations in outgoing_batches for station in stations]
+
+    batch = {'station': outgoing_stations, 'point': [], 'nearest': [], 'distance': [], 'count': []}
+    for point in station_points(outgoing_stations):
+        distance, nearest = nearest_station(index, point) if point else (None, None)
+        batch['point'].append(point)
+        batch['nearest'].append(nearest)
+        batch['distance'].append(distance)
+        batch['count'].append(len(positions_within(index, point, radius_km)) if point else None)
+
+    close = sum(1 for count in batch['count'] if count)
+    print(f"📍 Станций UZB с входящими станциями ближе {radius_km:g} км: {close} из {len(outgoing_stations)}")
+
+    return (PROXIMITY_SHEET_NAME, PROXIMITY_LAYOUT, batch, build_proximity_columns)
@@ -0,0 +1,272 @@
+"""
+Граф связей станций РРЛ по всему запуску.
+
+Станции (уведомления) — вершины, интервалы антенна → принимающая станция
+(data['hops'], по одному на каждую <RX_STATION> каждой антенны) — рёбра.
+Частота приёма интервала — частота передачи парной станции. После разбора
+всех файлов строится один индекс по администрации (t_adm из HEAD) и
+нормализованному названию пункта, и все интервалы связываются за один проход:
+
+    links = link_stations(batches)   # batches: [(исходный файл, лист, станции), ...]
+
+Порядок поиска пары (везде при совпадении названий берётся последняя станция):
+ 1. та же администрация и тот же файл — как при прежнем связывании по файлу;
+ 2. та же администрация и те же координаты, что указаны в <RX_STATION>;
+ 3. та же администрация в любом файле запуска.
+
+Связанные станции объединяются в цепочки (компоненты связности, система
+непересекающихся множеств) — лист «Цепочки РРЛ»:
+
+    sheets.append(chain_sheet(links))
+
+В реестр каждый интервал идёт отдельной строкой (hop_records).
+"""
+from collections import deque
+
+CHAIN_SHEET_NAME = "Цепочки РРЛ"
+
+# Предельная длина текста в ячейке Excel
+_MAX_CELL_LENGTH = 32767
+
+# Оформление листа цепочек
+CHAIN_LAYOUT = {
+    'title': "Цепочки интервалов РРЛ (станции, связанные через принимающие станции)",
+    'title_range': 'A1:G1',
+    'headers': [
+        "№ цепочки",
+        "Администрации",
+        "Станций",
+        "Интервалов",
+        "Файлов",
+        "Пункты установки (по маршруту)",
+        "Частоты передачи, МГц",
+    ],
+    'column_widths': [10, 15, 10, 10, 10, 60, 40],
+    'row_heights': {1: 30, 3: 30},
+}
+
+
+def add_chains_argument(parser):
+    """Добавляет в argparse опцию --chains"""
+    parser.add_argument(
+        '--chains',
+        action='store_true',
+        help=f"добавить лист «{CHAIN_SHEET_NAME}» — цепочки связанных станций"
+    )
+
+
+def normalize_site_name(name):
+    """Название пункта для сравнения: без лишних пробелов, в верхнем регистре"""
+    return ' '.join(name.split()).upper()
+
+
+def _coordinate_keys(adm, name, long_coord, lat_coord):
+    """Ключи индекса по координатам: долгота и широта, если есть, и одна долгота"""
+    keys = []
+    if long_coord:
+        if lat_coord:
+            keys.append((adm, name, long_coord, lat_coord))
+        keys.append((adm, name, long_coord))
+    return keys
+
+
+def link_stations(batches):
+    """Определяет частоты приёма всех интервалов и станций запуска (поле 'freq_rx')
+    batches: [(исходный файл, лист, список станций), ...]
+    Возвращает граф: {'nodes': [(номер файла, станция)], 'edges': [(передающая, принимающая)]}
+    """
+    nodes = []
+    by_file = {}
+    by_coordinates = {}
+    by_name = {}
+
+    # Индекс строится один раз по всем файлам
+    for file_index, (_, _, stations) in enumerate(batches):
+        for station in stations:
+            node = len(nodes)
+            nodes.append((file_index, station))
+            adm = station.get('t_adm', '')
+            name = normalize_site_name(station.get('t_site_name', ''))
+            by_file[(file_index, name)] = node
+            by_name[(adm, name)] = node
+            for key in _coordinate_keys(adm, name, station.get('t_long', ''), station.get('t_lat', '')):
+                by_coordinates[key] = node
+
+    def find_partner(file_index, adm, item):
+        """Вершина парной станции для интервала (или станции) item или None"""
+        rx_site_name = item.get('rx_site_name', '')
+        if not rx_site_name:
+            return None
+
+        name = normalize_site_name(rx_site_name)
+        node = by_file.get((file_index, name))
+        if node is not None:
+            return node
+        for key in _coordinate_keys(adm, name, item.get('rx_long', ''), item.get('rx_lat', '')):
+            node = by_coordinates.get(key)
+            if node is not None:
+                return node
+        return by_name.get((adm, name))
+
+    edges = []
+    hops_count = 0
+    cross_file_count = 0
+    for node, (file_index, station) in enumerate(nodes):
+        adm = station.get('t_adm', '')
+
+        # Частота приёма станции — по принимающей станции последней антенны
+        partner = find_partner(file_index, adm, station)
+        station['freq_rx'] = nodes[partner][1].get('t_freq_assgn', '') if partner is not None else ''
+
+        for hop in station.get('hops', ()):
+            hops_count += 1
+            partner = find_partner(file_index, adm, hop)
+            if partner is None:
+                hop['freq_rx'] = ''
+                continue
+
+            # Частота приёма = частота передачи парной станции
+            hop['freq_rx'] = nodes[partner][1].get('t_freq_assgn', '')
+            edges.append((node, partner))
+            if nodes[partner][0] != file_index:
+                cross_file_count += 1
+
+    print(f"🔗 Частоты приёма: {len(edges)} из {hops_count} интервалов (из других файлов: {cross_file_count})")
+
+    return {'nodes': nodes, 'edges': edges}
+
+
+def hop_records(stations):
+    """Записи реестра по интервалам: станция с данными каждой своей антенны и принимающей станции
+    Станция без интервалов (нет антенн или запись без 'hops') остаётся одной записью.
+    """
+    records = []
+    for station in stations:
+        hops = station.get('hops')
+        if not hops:
+            records.append(station)
+            continue
+
+        base = station.copy()
+        del base['hops']
+        for hop in hops:
+            record = base.copy()
+            record.update(hop)
+            records.append(record)
+    return records
+
+
+def _find(parent, node):
+    """Корень множества вершины (со сжатием пути)"""
+    root = node
+    while parent[root] != root:
+        root = parent[root]
+    while parent[node] != root:
+        parent[node], node = root, parent[node]
+    return root
+
+
+def link_chains(links):
+    """Цепочки связанных станций: компоненты связности графа из двух и более станций
+    Возвращает списки вершин каждой цепочки в порядке обхода от её конца,
+    самые длинные цепочки — первыми.
+    """
+    node_count = len(links['nodes'])
+    parent = list(range(node_count))
+    size = [1] * node_count
+    adjacency = {}
+
+    # Объединение по размеру: почти линейное время на всех рёбрах
+    for tx_node, rx_node in links['edges']:
+        adjacency.setdefault(tx_node, set()).add(rx_node)
+        adjacency.setdefault(rx_node, set()).add(tx_node)
+        tx_root, rx_root = _find(parent, tx_node), _find(parent, rx_node)
+        if tx_root != rx_root:
+            if size[tx_root] < size[rx_root]:
+                tx_root, rx_root = rx_root, tx_root
+            parent[rx_root] = tx_root
+            size[tx_root] += size[rx_root]
+
+    components = {}
+    for node in adjacency:
+        components.setdefault(_find(parent, node), []).append(node)
+
+    chains = []
+    for members in components.values():
+        if len(members) < 2:
+            continue
+
+        # Обход в ширину от конца цепочки (вершины с наименьшим числом связей)
+        start = min(members, key=lambda node: (len(adjacency[node]), node))
+        order = [start]
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for neighbour in sorted(adjacency[queue.popleft()]):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    order.append(neighbour)
+                    queue.append(neighbour)
+        chains.append(order)
+
+    chains.sort(key=lambda order: (-len(order), min(order)))
+    return chains
+
+
+def _cell_text(values, separator):
+    """Текст ячейки из значений (обрезается до предела Excel)"""
+    text = separator.join(values)
+    if len(text) > _MAX_CELL_LENGTH:
+        text = text[:_MAX_CELL_LENGTH - 1] + '…'
+    return text
+
+
+def chain_records(links):
+    """Записи листа цепочек: по одной на каждую цепочку"""
+    nodes = links['nodes']
+    chains = link_chains(links)
+
+    # Число интервалов в каждой цепочке
+    chain_of = {node: number for number, order in enumerate(chains) for node in order}
+    hops_by_chain = [0] * len(chains)
+    for tx_node, _ in links['edges']:
+        number = chain_of.get(tx_node)
+        if number is not None:
+            hops_by_chain[number] += 1
+
+    records = []
+    for number, order in enumerate(chains):
+        stations = [nodes[node][1] for node in order]
+        frequencies = dict.fromkeys(
+            station['t_freq_assgn'] for station in stations if station.get('t_freq_assgn')
+        )
+        records.append({
+            'chain': number + 1,
+            'adms': ', '.join(sorted({station.get('t_adm', '') for station in stations})),
+            'stations_count': len(order),
+            'hops_count': hops_by_chain[number],
+            'files_count': len({nodes[node][0] for node in order}),
+            'route': _cell_text([station.get('t_site_name', '') for station in stations], ' — '),
+            'frequencies': _cell_text(frequencies, ', '),
+        })
+    return records
+
+
+def build_chain_row(record):
+    """Формирует значения строки листа цепочек"""
+    return [
+        record['chain'],
+        record['adms'],
+        record['stations_count'],
+        record['hops_count'],
+        record['files_count'],
+        record['route'],
+        record['frequencies'],
+    ]
+
+
+def chain_sheet(links):
+    """Описывает лист цепочек для записи: (имя листа, оформление, записи, build_row)"""
+    records = chain_records(links)
+    print(f"⛓  Цепочек РРЛ: {len(records)}")
+    return (CHAIN_SHEET_NAME, CHAIN_LAYOUT, records, build_chain_row)
@@ -0,0 +1,224 @@
+"""
+Компактная запись станции для всех четырёх парсеров.
+
+Станция хранится не в словаре, а в объекте с __slots__: набор полей
+известен заранее (FIELDS), незаданное поле просто отсутствует. Данные HEAD
+(t_adm, t_d_sent) не копируются в каждую станцию — запись ссылается на
+общий для файла словарь head_data. Повторяющиеся значения (частоты, ширина
+полосы, даты, параметры антенн) хранятся одной строкой на файл: при разборе
+файла значения проходят через общий пул строк.
+
+Запись ведёт себя как словарь там, где это нужно парсерам и реестрам:
+
+    data = StationRecord(fields, head_data, strings)
+    data.get('t_adm', '')        # из HEAD файла
+    data['freq_rx'] = '7450'
+    as_dict(data)                # обычный словарь (база станций, JSON)
+
+Поля не из FIELDS хранятся в дополнительном словаре записи. Запись помнит
+кортеж имён заданных полей (общий для записей с одинаковым набором полей),
+поэтому для pickle (пул процессов --jobs, кэш разбора) она сводится к этому
+кортежу, кортежу значений, HEAD и дополнительному словарю — без перебора
+незаданных полей; общий HEAD файла и кортеж имён pickle сохраняет один раз.
+"""
+from operator import attrgetter
+
+# Поля, которые берутся из HEAD файла, если не заданы в самой записи
+HEAD_FIELDS = ('t_adm', 't_d_sent')
+
+# Поля записи. Порядок полей интервала (антенна, затем принимающая станция)
+# совпадает с порядком ключей прежних словарей: от него зависит отпечаток
+# уведомления (notice_index.notice_fingerprint) для интервалов.
+FIELDS = (
+    't_adm_ref_id',
+    't_site_name',
+    't_freq_assgn',
+    't_long',
+    't_lat',
+    't_bdwdth_cde',
+    't_d_adm_ntc',
+    't_d_inuse',
+    't_azm_max_e',
+    't_gain_max',
+    't_hgt_agl',
+    't_pwr_dbw',
+    't_pwr_ant',
+    'rx_site_name',
+    'rx_long',
+    'rx_lat',
+    'azimuths',
+    'gains',
+    'heights',
+    'powers',
+    'hops',
+) + HEAD_FIELDS + (
+    'freq_type',
+    'freq_tx',
+    'freq_rx',
+    'repeat_of',
+    'match_score',
+    'matched_site_name',
+)
+
+_FIELD_SET = frozenset(FIELDS)
+
+# Признак отсутствующего поля
+_MISSING = object()
+
+# Набор ключей → общий кортеж имён заданных полей в порядке FIELDS
+_LAYOUTS = {}
+
+# Кортеж имён полей → функция, возвращающая значения этих полей кортежем
+_GETTERS = {}
+
+
+def _layout(keys):
+    """Общий кортеж имён полей из FIELDS среди keys (в порядке FIELDS)"""
+    layout = _LAYOUTS.get(keys)
+    if layout is None:
+        key_set = set(keys)
+        layout = tuple(key for key in FIELDS if key in key_set)
+        layout = _LAYOUTS.setdefault(layout, layout)
+        _LAYOUTS[keys] = layout
+    return layout
+
+
+def _values_getter(layout):
+    """Функция, возвращающая значения полей layout кортежем"""
+    getter = _GETTERS.get(layout)
+    if getter is None:
+        if len(layout) == 1:
+            name = layout[0]
+            getter = lambda record: (getattr(record, name),)
+        elif layout:
+            getter = attrgetter(*layout)
+        else:
+            getter = lambda record: ()
+        _GETTERS[layout] = getter
+    return getter
+
+
+class StationRecord:
+    """Данные одной станции (или интервала) с интерфейсом словаря"""
+
+    __slots__ = FIELDS + ('head', 'extra', 'layout')
+
+    def __init__(self, fields=None, head=None, strings=None):
+        """fields: словарь значений; head: общий head_data файла;
+        strings: общий пул строк файла ({строка: строка}) или None
+        """
+        self.head = head
+        self.extra = None
+        if not fields:
+            self.layout = ()
+            return
+        self.layout = _layout(tuple(fields))
+        for key, value in fields.items():
+            if strings is not None and type(value) is str:
+                value = strings.setdefault(value, value)
+            if key in _FIELD_SET:
+                setattr(self, key, value)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            if key not in self.layout:
+                self.layout = _layout(self.layout + (key,))
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        try:
+            if key in _FIELD_SET:
+                delattr(self, key)
+                self.layout = _layout(tuple(name for name in self.layout if name != key))
+            else:
+                del self.extra[key]
+        except (AttributeError, KeyError, TypeError):
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+            if key in HEAD_FIELDS and self.head is not None:
+                return self.head.get(key, '')
+            return default
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def items(self):
+        """Пары (поле, значение) заданных полей, поля HEAD — если запись ссылается на HEAD"""
+        for key in FIELDS:
+            try:
+                yield key, getattr(self, key)
+            except AttributeError:
+                if key in HEAD_FIELDS and self.head is not None:
+                    yield key, self.head.get(key, '')
+        if self.extra:
+            yield from self.extra.items()
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return sum(1 for _ in self.items())
+
+    def update(self, fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    def copy(self):
+        """Копия записи (та же ссылка на HEAD, списки не копируются)"""
+        extra = dict(self.extra) if self.extra else None
+        return _restore_record(self.layout, _values_getter(self.layout)(self), self.head, extra)
+
+    def __reduce__(self):
+        return _restore_record, (self.layout, _values_getter(self.layout)(self), self.head, self.extra)
+
+    def __eq__(self, other):
+        if isinstance(other, (StationRecord, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+def _restore_record(layout, values, head, extra):
+    """Запись из имён и значений заданных полей (StationRecord.copy, pickle)"""
+    record = StationRecord.__new__(StationRecord)
+    record.head = head
+    record.extra = extra
+    record.layout = layout
+    for key, value in zip(layout, values):
+        setattr(record, key, value)
+    return record
+
+
+def as_dict(data):
+    """Обычный словарь станции (с интервалами) для JSON и базы станций"""
+    result = dict(data.items())
+    if result.get('hops'):
+        result['hops'] = [dict(hop.items()) for hop in result['hops']]
+    return result
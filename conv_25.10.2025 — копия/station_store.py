@@ -0,0 +1,232 @@
+"""
+Локальная база SQLite со всеми разобранными станциями всех четырёх парсеров.
+
+Каждый запуск парсера дописывает (upsert) станции в таблицу stations: ключ —
+реестр, исходный файл и порядковый номер станции в нём, поэтому повторный
+разбор того же файла обновляет строки, а не дублирует их. Основные поля
+(название, частоты, координаты, ширина полосы, t_adm, даты, t_adm_ref_id)
+лежат в отдельных индексированных столбцах, полный словарь станции — в data
+(JSON), так что реестр можно собрать заново без чтения txt файлов:
+
+    save_stations(db_path, 'rrl_incoming', [(source_file, sheet, stations), ...])
+    data_by_sheet = load_register(db_path, 'rrl_incoming')
+
+База по умолчанию лежит в папке данных пользователя (user_data_dir), а не
+рядом со скриптами: у собранного PyInstaller ParserLauncher.exe папка
+скриптов временная и удаляется при выходе, и база (вместе с индексом
+повторной подачи notice_index) начиналась бы пустой при каждом запуске.
+Другой путь задаётся опцией --db.
+"""
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from station_record import as_dict
+
+# Имя папки приложения в папке данных пользователя
+APP_DIR_NAME = 'ParserLauncher'
+
+
+def user_data_dir():
+    """Папка данных пользователя: %LOCALAPPDATA%\\ParserLauncher в Windows,
+    ~/Library/Application Support/ParserLauncher в macOS, ~/.local/share/ParserLauncher в Linux
+    """
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.join(os.path.expanduser('~'), 'Library', 'Application Support')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, APP_DIR_NAME)
+
+
+# База по умолчанию — в папке данных пользователя
+DEFAULT_DB_PATH = os.path.join(user_data_dir(), 'stations.db')
+
+# Число строк в одной транзакции записи
+BATCH_SIZE = 5000
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS stations (
+    register TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    sheet TEXT NOT NULL,
+    t_adm_ref_id TEXT,
+    t_site_name TEXT,
+    freq_tx TEXT,
+    freq_rx TEXT,
+    t_long TEXT,
+    t_lat TEXT,
+    t_bdwdth_cde TEXT,
+    t_adm TEXT,
+    t_d_sent TEXT,
+    t_d_adm_ntc TEXT,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (register, source_file, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_stations_ref_id ON stations (t_adm_ref_id);
+CREATE INDEX IF NOT EXISTS idx_stations_site_name ON stations (t_site_name);
+CREATE INDEX IF NOT EXISTS idx_stations_adm ON stations (t_adm, t_d_sent);
+CREATE INDEX IF NOT EXISTS idx_stations_sheet ON stations (register, sheet);
+'''
+
+_COLUMNS = (
+    'register', 'source_file', 'seq', 'sheet',
+    't_adm_ref_id', 't_site_name', 'freq_tx', 'freq_rx', 't_long', 't_lat',
+    't_bdwdth_cde', 't_adm', 't_d_sent', 't_d_adm_ntc',
+    'data', 'updated_at',
+)
+
+_UPSERT = (
+    f"INSERT INTO stations ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))}) "
+    "ON CONFLICT (register, source_file, seq) DO UPDATE SET "
+    + ', '.join(f"{column} = excluded.{column}" for column in _COLUMNS[3:])
+)
+
+
+def add_db_arguments(parser):
+    """Добавляет в argparse опции --db и --no-db"""
+    parser.add_argument(
+        '--db',
+        dest='db_path',
+        default=DEFAULT_DB_PATH,
+        help=f"база SQLite для разобранных станций (по умолчанию {DEFAULT_DB_PATH})"
+    )
+    parser.add_argument(
+        '--no-db',
+        dest='use_db',
+        action='store_false',
+        help="не записывать станции в базу"
+    )
+
+
+def db_for_run(db_path=None, use_db=True):
+    """Путь к базе для запуска парсера или None, если запись в базу отключена"""
+    if not use_db:
+        return None
+    db_path = db_path or DEFAULT_DB_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    return db_path
+
+
+def connect(db_path):
+    """Открывает базу и создаёт таблицу и индексы, если их ещё нет"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _station_row(register, source_file, seq, sheet, data, updated_at):
+    """Строка таблицы stations для одной станции"""
+    return (
+        register, source_file, seq, sheet,
+        data.get('t_adm_ref_id', ''),
+        data.get('t_site_name', ''),
+        data.get('freq_tx', data.get('t_freq_assgn', '')),
+        data.get('freq_rx', ''),
+        data.get('t_long', ''),
+        data.get('t_lat', ''),
+        data.get('t_bdwdth_cde', ''),
+        data.get('t_adm', ''),
+        data.get('t_d_sent', ''),
+        data.get('t_d_adm_ntc', ''),
+        json.dumps(as_dict(data), ensure_ascii=False, default=str),
+        updated_at,
+    )
+
+
+def source_folder(source_file):
+    """Папка исходного файла (у пары T12 + T13 — папка первого файла)"""
+    return os.path.dirname(source_file.split(' + ')[0])
+
+
+def stale_sources(conn, register, source_files):
+    """Исходные файлы реестра в базе из тех же папок, что и source_files, но не из этого запуска
+    (удалённые файлы, прежний ключ пары T12 до прихода T13). Файлы других папок не затрагиваются.
+    """
+    folders = {source_folder(source_file) for source_file in source_files}
+    cursor = conn.execute("SELECT DISTINCT source_file FROM stations WHERE register = ?", (register,))
+    return [
+        source_file for source_file, in cursor
+        if source_file not in source_files and source_folder(source_file) in folders
+    ]
+
+
+def _replace_files(conn, register, files, rows, stale=()):
+    """Одна транзакция: удаление лишних строк файлов и устаревших файлов, запись строк"""
+    with conn:
+        conn.executemany(
+            "DELETE FROM stations WHERE register = ? AND source_file = ? AND seq >= ?",
+            [(register, source_file, count) for source_file, count in files]
+        )
+        conn.executemany(
+            "DELETE FROM stations WHERE register = ? AND source_file = ?",
+            [(register, source_file) for source_file in stale]
+        )
+        conn.executemany(_UPSERT, rows)
+
+
+def save_stations(db_path, register, batches):
+    """Записывает станции в базу пакетами транзакций
+    batches: [(исходный файл (абсолютный путь), лист, список станций), ...]
+    Файл целиком попадает в одну транзакцию (пакет — от BATCH_SIZE строк): удаление
+    его лишних строк и запись новых не разделяются. Строки файлов тех же папок,
+    которых нет в этом запуске, удаляются в последней транзакции.
+    Возвращает число записанных станций.
+    """
+    updated_at = datetime.now().isoformat(timespec='seconds')
+    total = 0
+
+    conn = connect(db_path)
+    try:
+        stale = stale_sources(conn, register, {source_file for source_file, _, _ in batches})
+
+        files = []
+        rows = []
+        for source_file, sheet, stations in batches:
+            files.append((source_file, len(stations)))
+            for seq, data in enumerate(stations):
+                rows.append(_station_row(register, source_file, seq, sheet, data, updated_at))
+            if len(rows) >= BATCH_SIZE:
+                _replace_files(conn, register, files, rows)
+                total += len(rows)
+                files = []
+                rows = []
+
+        if files or stale:
+            _replace_files(conn, register, files, rows, stale)
+            total += len(rows)
+    finally:
+        conn.close()
+
+    return total
+
+
+def load_register(db_path, register):
+    """Читает станции реестра из базы: {лист: [станции в порядке файлов]}"""
+    data_by_sheet = {}
+
+    conn = connect(db_path)
+    try:
+        cursor = conn.execute(
+            "SELECT sheet, data FROM stations WHERE register = ? ORDER BY source_file, seq",
+            (register,)
+        )
+        for sheet, data in cursor:
+            data_by_sheet.setdefault(sheet, []).append(json.loads(data))
+    finally:
+        conn.close()
+
+    return data_by_sheet
+
+
+def record_run(db_path, register, batches):
+    """Записывает станции запуска парсера в базу (db_path=None — запись отключена)"""
+    if db_path is None:
+        return
+
+    count = save_stations(db_path, register, batches)
+    print(f"🗄  В базу записано {count} станций: {db_path}")
@@ -1,129 +1,185 @@
 import os
-import re
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from openpyxl.utils import get_column_letter
+import argparse
+from contextlib import contextmanager
+from functools import partial
 from datetime import datetime
-
-
-def convert_coordinates(coord_str):
-    """Конвертирует координаты из формата +0691949 в 69-19-49"""
-    if not coord_str:
-        return ""
-
-    coord_str = coord_str.strip('+')
-    if len(coord_str) == 7:
-        return f"{coord_str[0:2]}{coord_str[2:4]}{coord_str[4:7]}"
-    elif len(coord_str) == 6:
-        return f"{coord_str[0:2]}{coord_str[2:4]}{coord_str[4:6]}"
-    return coord_str
-
-
-def convert_date(date_str):
-    """Конвертирует дату из формата 2025-08-13 в 13.08.2025"""
-    if not date_str:
-        return ""
-    try:
-        date_obj = datetime.strptime(date_str.strip(), "%Y-%m-%d")
-        return date_obj.strftime("%d.%m.%Y")
-    except:
-        return date_str
-
-
-def parse_notice_block(notice_text):
-    """Парсит один блок NOTICE и извлекает данные"""
-    data = {}
-
-    # Извлекаем основные параметры
-    patterns = {
-        't_site_name': r't_site_name\s*=\s*(.+)',
-        't_freq_assgn': r't_freq_assgn\s*=\s*(.+)',
-        't_long': r't_long\s*=\s*(.+)',
-        't_lat': r't_lat\s*=\s*(.+)',
-        't_bdwdth_cde': r't_bdwdth_cde\s*=\s*(.+)',
-        't_adm_ref_id': r't_adm_ref_id\s*=\s*(.+)',
-        't_d_adm_ntc': r't_d_adm_ntc\s*=\s*(.+)',
-        't_d_inuse': r't_d_inuse\s*=\s*(.+)',
-    }
-
-    for key, pattern in patterns.items():
-        match = re.search(pattern, notice_text)
-        if match:
-            data[key] = match.group(1).strip()
-
-    # Извлекаем данные антенн
-    antenna_blocks = re.findall(r'<ANTENNA>(.*?)</ANTENNA>', notice_text, re.DOTALL)
+from excel_writer import add_write_only_argument
+from notice_reader import open_notices, iter_notice_range
+from notice_scanner import scan_notice, NOTICE, ANTENNA
+from output_writers import add_format_argument, write_outputs
+from parallel import add_jobs_argument, map_file_ranges, resolve_jobs
+from parse_cache import add_cache_arguments, cache_for_run, map_cached, print_cache_stats
+from run_profile import add_profile_arguments, profile_run
+from run_stats import add_stats_argument, finish_stats, open_stats, record_file, stage
+from site_matcher import add_site, find_site, match_notes, open_site_index
+from station_columns import (
+    batch_size, column_batch, coordinates_column, dates_column, fallback_column, numbers_column, text_column,
+)
+from station_record import StationRecord
+from station_store import add_db_arguments, db_for_run, record_run
+
+# Извлекаемые параметры по секциям блока NOTICE
+NOTICE_FIELDS = {
+    NOTICE: (
+        't_site_name',
+        't_freq_assgn',
+        't_long',
+        't_lat',
+        't_bdwdth_cde',
+        't_adm_ref_id',
+        't_d_adm_ntc',
+        't_d_inuse',
+    ),
+    ANTENNA: ('t_azm_max_e', 't_gain_max', 't_hgt_agl', 't_pwr_ant'),
+}
+
+
+def parse_notice_block(notice_text, head_data=None, strings=None):
+    """Парсит один блок NOTICE и извлекает данные
+    head_data: HEAD файла (общий для всех станций), strings: пул строк файла
+    """
+    data, antennas = scan_notice(notice_text, NOTICE_FIELDS)
 
     azimuths = []
     gains = []
     heights = []
     powers = []
 
-    for antenna in antenna_blocks:
-        azm_match = re.search(r't_azm_max_e\s*=\s*(.+)', antenna)
-        gain_match = re.search(r't_gain_max\s*=\s*(.+)', antenna)
-        height_match = re.search(r't_hgt_agl\s*=\s*(.+)', antenna)
-        power_match = re.search(r't_pwr_ant\s*=\s*(.+)', antenna)
-
-        if azm_match:
-            azimuths.append(azm_match.group(1).strip())
-        if gain_match:
-            gains.append(gain_match.group(1).strip())
-        if height_match:
-            heights.append(height_match.group(1).strip())
-        if power_match:
-            powers.append(power_match.group(1).strip())
+    for antenna, _ in antennas:
+        if 't_azm_max_e' in antenna:
+            azimuths.append(antenna['t_azm_max_e'])
+        if 't_gain_max' in antenna:
+            gains.append(antenna['t_gain_max'])
+        if 't_hgt_agl' in antenna:
+            heights.append(antenna['t_hgt_agl'])
+        if 't_pwr_ant' in antenna:
+            powers.append(antenna['t_pwr_ant'])
 
     # Объединяем через точку
     data['azimuths'] = '.'.join(azimuths)
-    data['gains'] = '.'.join(set(gains))  # Уникальные значения
-    data['heights'] = '.'.join(set(heights))
-    data['powers'] = '.'.join(set(powers))
+    data['gains'] = '.'.join(dict.fromkeys(gains))  # Уникальные значения в порядке появления
+    data['heights'] = '.'.join(dict.fromkeys(heights))
+    data['powers'] = '.'.join(dict.fromkeys(powers))
 
-    return data
+    return StationRecord(data, head_data, strings)
 
 
-def parse_txt_file(file_path, freq_type='tx'):
-    """Парсит txt файл и возвращает список данных всех станций
-    freq_type: 'tx' для передачи (T12), 'rx' для приема (T13)
+def iter_notices(notice_blocks, freq_type='tx'):
+    """Генератор: парсит блоки NOTICE по одному и помечает тип частоты"""
+    # Повторяющиеся значения — одна строка на файл
+    strings = {}
+    for notice in notice_blocks:
+        data = parse_notice_block(notice, strings=strings)
+        data['freq_type'] = freq_type  # Помечаем тип частоты
+        yield data
+
+
+def parse_notices(notice_blocks, freq_type='tx'):
+    """Парсит блоки NOTICE и помечает тип частоты"""
+    return list(iter_notices(notice_blocks, freq_type))
+
+
+def parse_notice_range(task):
+    """Парсит диапазон байтов файла (выполняется в процессе пула)
+    task: (путь к файлу, начало, конец, freq_type)
     """
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    file_path, start, end, freq_type = task
+    return parse_notices(iter_notice_range(file_path, start, end), freq_type)
 
-    # Разделяем на блоки NOTICE
-    notice_blocks = re.findall(r'<NOTICE>(.*?)</NOTICE>', content, re.DOTALL)
 
-    stations_data = []
-    for notice in notice_blocks:
-        data = parse_notice_block(notice)
-        data['freq_type'] = freq_type  # Помечаем тип частоты
-        stations_data.append(data)
+@contextmanager
+def open_stations(file_path, freq_type='tx', jobs=1):
+    """Открывает txt файл для потокового разбора: станции по одной
+    freq_type: 'tx' для передачи (T12), 'rx' для приема (T13)
+    jobs > 1: файл делится по границам </NOTICE>, части разбираются в пуле процессов
+    """
+    if resolve_jobs(jobs) > 1:
+        yield map_file_ranges(parse_notice_range, file_path, (freq_type,), jobs)
+        return
 
-    return stations_data
+    # Читаем файл потоково, блоки NOTICE по одному
+    with open_notices(file_path) as (_, notice_blocks):
+        yield iter_notices(notice_blocks, freq_type)
 
 
-def merge_tx_rx_data(data_list):
-    """Объединяет данные T12 (передача) и T13 (прием) по названию станции"""
-    merged = {}
+def merge_tx_rx_data(merged, stations, deferred=None):
+    """Добавляет поток станций T12 (передача) или T13 (прием) к строкам, объединённым по названию станции
+    merged: {название станции: строка}. Станция с новым названием сама становится строкой
+    (без копирования), у повторного названия обновляется только частота.
+    deferred: список для станций с новым названием — они не добавляются, а откладываются
+    для поиска похожего названия (merge_similar_sites)
+    Возвращает (число станций, множество их названий)
+    """
+    count = 0
+    site_names = set()
 
-    for data in data_list:
+    for data in stations:
+        count += 1
         site_name = data.get('t_site_name', '')
-        freq = data.get('t_freq_assgn', '')
-        freq_type = data.get('freq_type', 'tx')
+        site_names.add(site_name)
 
-        # Создаем уникальный ключ по названию станции
-        if site_name not in merged:
-            merged[site_name] = data.copy()
-            merged[site_name]['freq_tx'] = ''
-            merged[site_name]['freq_rx'] = ''
+        if deferred is not None and site_name not in merged:
+            deferred.append(data)
+            continue
+
+        # Уникальный ключ — название станции
+        row = merged.get(site_name)
+        if row is None:
+            row = merged[site_name] = data
+            row['freq_tx'] = ''
+            row['freq_rx'] = ''
 
         # Записываем частоту в нужное поле
-        if freq_type == 'tx':
-            merged[site_name]['freq_tx'] = freq
+        if data.get('freq_type', 'tx') == 'tx':
+            row['freq_tx'] = data.get('t_freq_assgn', '')
         else:  # rx
-            merged[site_name]['freq_rx'] = freq
+            row['freq_rx'] = data.get('t_freq_assgn', '')
+            if row['freq_type'] == 'tx':
+                row['match_score'] = 1.0
+
+    return count, site_names
+
 
-    return list(merged.values())
+def merge_similar_sites(merged, stations, tx_names, rx_names):
+    """Объединяет отложенные станции T13 со строками T12 без приёма по похожему названию
+    Станции без похожей пары становятся отдельными строками, как при точном объединении.
+    Уверенность объединения записывается в строку ('match_score', название T13 — 'matched_site_name').
+    Возвращает список (название T13, название T12, уверенность)
+    """
+    # Индекс триграмм только по строкам T12, не получившим приём по точному названию
+    index = open_site_index()
+    for site_name in tx_names - rx_names:
+        add_site(index, merged[site_name])
+
+    aliases = {}
+    taken = set()
+    similar = []
+    for data in stations:
+        site_name = data.get('t_site_name', '')
+        row = merged.get(site_name) or aliases.get(site_name)
+        if row is None:
+            position, score = find_site(index, data, taken) if index['rows'] else (None, 0.0)
+            if position is not None:
+                taken.add(position)
+                row = aliases[site_name] = index['rows'][position]
+                row['match_score'] = round(score, 2)
+                row['matched_site_name'] = site_name
+                similar.append((site_name, row['t_site_name'], row['match_score']))
+            else:
+                row = merged[site_name] = data
+                row['freq_tx'] = ''
+
+        row['freq_rx'] = data.get('t_freq_assgn', '')
+
+    return similar
+
+
+def format_site_names(site_names, limit=5):
+    """Названия станций для сообщения: первые limit и число остальных"""
+    text = ', '.join(site_names[:limit])
+    if len(site_names) > limit:
+        text += f" и ещё {len(site_names) - limit}"
+    return text
 
 
 def determine_sheet_from_filename(filename):
@@ -146,19 +202,19 @@ def determine_sheet_from_filename(filename):
         return 'на рег. в МСЭ'  # По умолчанию
 
 
-def create_sheet_with_data(ws, all_data, sheet_type="standard"):
-    """Создает лист с данными и форматированием"""
-
-    # Заголовок - первая строка (объединенная)
-    ws.merge_cells('A1:Q1')
-    header_cell = ws['A1']
-    header_cell.value = "Учёт статистических данных по частотоприрсвоениям направленных на координацию с другими Администрациями связи (ИСХ СПС)"
-    header_cell.font = Font(bold=True, size=11)
-    header_cell.alignment = Alignment(horizontal="center", vertical="center")
+# Общее оформление листов ИСХ СПС
+_BASE_LAYOUT = {
+    'title': "Учёт статистических данных по частотоприрсвоениям направленных на координацию с другими Администрациями связи (ИСХ СПС)",
+    'title_range': 'A1:Q1',
+    'column_widths': [18, 10, 10, 10, 10, 10, 9, 9, 8, 15, 20, 12, 15, 12, 12, 15, 20, 15, 15],
+    'row_heights': {1: 30, 3: 35},
+}
 
-    # Подзаголовки - третья строка
-    if sheet_type == "brific":
-        headers = [
+# Оформление листов по типу листа (отличаются подзаголовками)
+SHEET_LAYOUTS = {
+    'brific': dict(
+        _BASE_LAYOUT,
+        headers=[
             "Название станций\n(Пункт установки)",
             "Координаты\nдолгот",
             "широт",
@@ -178,8 +234,10 @@ def create_sheet_with_data(ws, all_data, sheet_type="standard"):
             "Исполнитель",
             "ID UZB"
         ]
-    else:
-        headers = [
+    ),
+    'standard': dict(
+        _BASE_LAYOUT,
+        headers=[
             "Название станции\n(пункт установки)",
             "Координаты\nдолгот",
             "широт",
@@ -200,126 +258,165 @@ def create_sheet_with_data(ws, all_data, sheet_type="standard"):
             "Исполнитель",
             "ID UZB"
         ]
+    ),
+}
+
+
+# Поля станции, из которых строятся столбцы листа
+BATCH_FIELDS = (
+    't_site_name', 't_long', 't_lat', 'freq_tx', 't_freq_assgn', 'freq_rx', 't_bdwdth_cde', 'powers', 'gains',
+    'heights', 'azimuths', 't_d_adm_ntc', 't_d_inuse', 't_adm_ref_id', 'matched_site_name', 'match_score',
+)
+
+
+def build_columns(batch, sheet_type="standard"):
+    """Формирует столбцы реестра для пакета станций листа (station_columns.column_batch)"""
+    empty = [""] * batch_size(batch)
+    notes = match_notes(batch['matched_site_name'], batch['match_score'])
+
+    columns = [
+        text_column(batch['t_site_name']),  # Название станции
+        coordinates_column(batch['t_long'], separator=''),  # Долгота
+        coordinates_column(batch['t_lat'], separator=''),  # Широта
+        numbers_column(fallback_column(batch['freq_tx'], batch['t_freq_assgn'])),  # Частота передача
+        numbers_column(batch['freq_rx']),  # Частота прием
+        text_column(batch['t_bdwdth_cde']),  # Ширина
+        text_column(batch['powers']),  # Мощность
+        text_column(batch['gains']),  # КУА
+        text_column(batch['heights']),  # Высота
+        text_column(batch['azimuths']),  # Азимут
+        empty,  # № письма (пустое)
+        dates_column(batch['t_d_adm_ntc']),  # Дата
+    ]
 
-    # Стиль заголовка
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=9)
-    alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-
-    # Записываем заголовки в третью строку
-    for col, header in enumerate(headers, start=1):
-        cell = ws.cell(row=3, column=col)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = alignment
-        cell.border = border
-
-    # Записываем данные начиная с 4-й строки
-    row = 4
-    for data in all_data:
-        # Координаты (разделенные)
-        long_coord = convert_coordinates(data.get('t_long', ''))
-        lat_coord = convert_coordinates(data.get('t_lat', ''))
-
-        ws.cell(row, 1).value = data.get('t_site_name', '')  # Название станции
-        ws.cell(row, 2).value = long_coord  # Долгота
-        ws.cell(row, 3).value = lat_coord  # Широта
-        ws.cell(row, 4).value = data.get('freq_tx', data.get('t_freq_assgn', ''))  # Частота передача
-        ws.cell(row, 5).value = data.get('freq_rx', '')  # Частота прием
-        ws.cell(row, 6).value = data.get('t_bdwdth_cde', '')  # Ширина
-        ws.cell(row, 7).value = data.get('powers', '')  # Мощность
-        ws.cell(row, 8).value = data.get('gains', '')  # КУА
-        ws.cell(row, 9).value = data.get('heights', '')  # Высота
-        ws.cell(row, 10).value = data.get('azimuths', '')  # Азимут
-        ws.cell(row, 11).value = ""  # № письма (пустое)
-        ws.cell(row, 12).value = convert_date(data.get('t_d_adm_ntc', ''))  # Дата
-
-        if sheet_type == "brific":
-            ws.cell(row, 13).value = ""  # Fragment
-            ws.cell(row, 14).value = ""  # BRIFIC ID
-            ws.cell(row, 15).value = ""  # Част
-            ws.cell(row, 16).value = ""  # Примечание
-            ws.cell(row, 17).value = ""  # Исполнитель
-            ws.cell(row, 18).value = data.get('t_adm_ref_id', '')  # ID UZB
-        else:
-            ws.cell(row, 13).value = ""  # Ответное письмо №
-            ws.cell(row, 14).value = convert_date(data.get('t_d_inuse', ''))  # Дата ввода
-            ws.cell(row, 15).value = ""  # Результат
-            ws.cell(row, 16).value = ""  # Направлено в БРИФИК
-            ws.cell(row, 17).value = ""  # Примечание
-            ws.cell(row, 18).value = ""  # Исполнитель
-            ws.cell(row, 19).value = data.get('t_adm_ref_id', '')  # ID UZB
-
-        # Применяем стиль к ячейкам
-        max_col = 18 if sheet_type == "brific" else 19
-        for col in range(1, max_col + 1):
-            cell = ws.cell(row, col)
-            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            cell.border = border
-            cell.font = Font(size=9)
-
-        row += 1
-
-    # Настраиваем ширину столбцов
-    column_widths = [18, 10, 10, 10, 10, 10, 9, 9, 8, 15, 20, 12, 15, 12, 12, 15, 20, 15, 15]
-    for col, width in enumerate(column_widths, start=1):
-        column_letter = get_column_letter(col)
-        ws.column_dimensions[column_letter].width = width
-
-    # Высота строк
-    ws.row_dimensions[1].height = 30
-    ws.row_dimensions[3].height = 35
+    if sheet_type == "brific":
+        columns += [
+            empty,  # Fragment
+            empty,  # BRIFIC ID
+            empty,  # Част
+            notes,  # Примечание
+            empty,  # Исполнитель
+            text_column(batch['t_adm_ref_id']),  # ID UZB
+        ]
+    else:
+        columns += [
+            empty,  # Ответное письмо №
+            dates_column(batch['t_d_inuse']),  # Дата ввода
+            empty,  # Результат
+            empty,  # Направлено в БРИФИК
+            notes,  # Примечание
+            empty,  # Исполнитель
+            text_column(batch['t_adm_ref_id']),  # ID UZB
+        ]
 
+    return columns
 
-def create_excel(data_by_sheet, output_file):
-    """Создает Excel файл с несколькими листами"""
-    wb = Workbook()
 
-    # Удаляем дефолтный лист
-    if "Sheet" in wb.sheetnames:
-        wb.remove(wb["Sheet"])
+# Реестр в базе станций и начало имени выходных файлов
+STORE_REGISTER = 'sps_outgoing'
+OUTPUT_NAME = "Учёт_данных_частот"
 
-    # Создаем листы в определенном порядке
-    sheet_names = ["КГЗ", "ТЖК", "КАЗ", "ТКМ", "на рег. в МСЭ"]
+# Листы реестра в порядке следования
+SHEET_NAMES = ["КГЗ", "ТЖК", "КАЗ", "ТКМ", "на рег. в МСЭ"]
 
-    for sheet_name in sheet_names:
-        ws = wb.create_sheet(sheet_name)
 
+def build_sheets(data_by_sheet):
+    """Описывает листы реестра для записи: (имя листа, оформление, пакет по столбцам, build_columns)"""
+    sheets = []
+    for sheet_name in SHEET_NAMES:
         # Определяем тип листа
         sheet_type = "brific" if sheet_name == "на рег. в МСЭ" else "standard"
+        sheets.append((
+            sheet_name,
+            SHEET_LAYOUTS[sheet_type],
+            column_batch(data_by_sheet.get(sheet_name, []), BATCH_FIELDS),
+            partial(build_columns, sheet_type=sheet_type),
+        ))
+    return sheets
+
+
+def process_group(group, jobs=1):
+    """Парсит пару файлов T12/T13 и объединяет их (выполняется в процессе пула)
+    group: (путь к T12 или None, путь к T13 или None)
+    jobs > 1 передаётся крупным группам, файлы которых разбираются по частям
+    Потоком читаются только файлы: строки группы (станции T12 и станции T13 с новым
+    названием, включая отложенные для похожих названий) держатся в памяти до конца T13 —
+    частота последней станции с тем же названием заменяет прежнюю, поэтому строку
+    нельзя записать раньше, а лист, повторная подача и база станций всё равно
+    получают все строки. Пик памяти группы — все её строки; список результата
+    ссылается на них же, без копий.
+    Возвращает (число станций T12, число станций T13, объединённые данные,
+    (названия только из T12, названия только из T13), [(название T13, название T12, уверенность)])
+    """
+    tx_path, rx_path = group
 
-        # Получаем данные для этого листа
-        sheet_data = data_by_sheet.get(sheet_name, [])
-
-        # Создаем лист с данными
-        create_sheet_with_data(ws, sheet_data, sheet_type)
-
-    wb.save(output_file)
-    print(f"✓ Excel файл создан: {output_file}")
-
-
-def main():
-    """Основная функция"""
-    # Папка с txt файлами
-    input_folder = input("Введите путь к папке с .txt файлами: ").strip()
-
+    # Станции T12 сами становятся строками реестра (индекс по названию станции),
+    # станции T13 идут через этот индекс потоком и дописывают частоты приёма
+    merged = {}
+    tx_count = rx_count = 0
+    tx_names = rx_names = set()
+
+    # Обрабатываем T12 (передача)
+    if tx_path:
+        with open_stations(tx_path, 'tx', jobs) as stations:
+            tx_count, tx_names = merge_tx_rx_data(merged, stations)
+
+    # Обрабатываем T13 (прием); станции с новым названием откладываются
+    deferred = []
+    if rx_path:
+        with open_stations(rx_path, 'rx', jobs) as stations:
+            rx_count, rx_names = merge_tx_rx_data(merged, stations, deferred)
+
+    # Похожие названия (пробелы, регистр, кириллица/латиница) — по индексу триграмм
+    similar = merge_similar_sites(merged, deferred, tx_names, rx_names)
+
+    # Станции без пары (только при наличии обоих файлов)
+    unmatched = ([], [])
+    if tx_path and rx_path:
+        rx_similar = {rx_name for rx_name, _, _ in similar}
+        tx_similar = {tx_name for _, tx_name, _ in similar}
+        unmatched = (
+            sorted(tx_names - rx_names - tx_similar),
+            sorted(rx_names - tx_names - rx_similar),
+        )
+
+    return tx_count, rx_count, list(merged.values()), unmatched, similar
+
+
+def parse_args(argv=None):
+    """Разбирает аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Парсер ИСХ СПС")
+    add_jobs_argument(parser)
+    add_format_argument(parser)
+    add_write_only_argument(parser)
+    add_cache_arguments(parser)
+    add_db_arguments(parser)
+    add_stats_argument(parser)
+    add_profile_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def run(input_folder, output_folder=None, jobs=1, formats=None, write_only=False, cache=None, db=None,
+        save_stats=False):
+    """Разбирает txt файлы папки и сохраняет результат
+    output_folder: папка для результата (по умолчанию — папка с txt файлами)
+    cache: кэш результатов разбора (parse_cache.cache_for_run) или None
+    db: путь к базе SQLite для станций (station_store.db_for_run) или None
+    save_stats: сохранить отчёт о времени этапов в JSON рядом с реестром (run_stats.finish_stats)
+    Возвращает список созданных файлов (пустой, если сохранять нечего)
+    """
     if not os.path.exists(input_folder):
-        print("❌ Папка не найдена!")
-        return
+        raise FileNotFoundError(f"Папка не найдена: {input_folder}")
+
+    stats = open_stats(OUTPUT_NAME)
 
     # Находим все txt файлы
-    txt_files = [f for f in os.listdir(input_folder) if f.endswith('.txt')]
+    with stage(stats, 'list'):
+        txt_files = [f for f in os.listdir(input_folder) if f.endswith('.txt')]
 
     if not txt_files:
         print("❌ В папке нет .txt файлов!")
-        return
+        return []
 
     print(f"Найдено {len(txt_files)} файлов\n")
 
@@ -351,44 +448,60 @@ def main():
 
         file_groups[base_name][freq_type] = txt_file
 
-    # Обрабатываем группы файлов
+    # Обрабатываем группы файлов (при --jobs > 1 — в пуле процессов, порядок сохраняется)
+    groups = [
+        (
+            os.path.join(input_folder, files['tx']) if files['tx'] else None,
+            os.path.join(input_folder, files['rx']) if files['rx'] else None,
+        )
+        for files in file_groups.values()
+    ]
+    group_sizes = [sum(os.path.getsize(path) for path in group if path) for group in groups]
+    results = map_cached(cache, process_group, groups, jobs, group_sizes, stats)
+
+    # Станции по исходным файлам (паре T12/T13) для записи в базу
+    store_batches = []
+
     total_stations = 0
-    for base_name, files in file_groups.items():
+    for files, (tx_count, rx_count, merged_data, unmatched, similar) in zip(file_groups.values(), results):
         tx_file = files['tx']
         rx_file = files['rx']
+        record_file(stats, (tx_file, rx_file), notices=tx_count + rx_count)
 
-        all_data = []
-
-        # Обрабатываем T12 (передача)
         if tx_file:
-            file_path = os.path.join(input_folder, tx_file)
             print(f"Обработка: {tx_file}...")
-            stations = parse_txt_file(file_path, 'tx')
-            all_data.extend(stations)
-            print(f"  └─ Извлечено {len(stations)} станций (передача)")
+            print(f"  └─ Извлечено {tx_count} станций (передача)")
 
-        # Обрабатываем T13 (прием)
         if rx_file:
-            file_path = os.path.join(input_folder, rx_file)
             print(f"Обработка: {rx_file}...")
-            stations = parse_txt_file(file_path, 'rx')
-            all_data.extend(stations)
-            print(f"  └─ Извлечено {len(stations)} станций (прием)")
+            print(f"  └─ Извлечено {rx_count} станций (прием)")
+
+        if similar:
+            pairs = [f"{rx_name} → {tx_name} ({score:.2f})" for rx_name, tx_name, score in similar]
+            print(f"  🔎 Объединено по похожему названию: {len(similar)} — {format_site_names(pairs)}")
 
-        if all_data:
-            # Объединяем данные T12 и T13
-            merged_data = merge_tx_rx_data(all_data)
+        tx_only, rx_only = unmatched
+        if tx_only:
+            print(f"  ⚠️  Только в T12 (нет приёма): {len(tx_only)} — {format_site_names(tx_only)}")
+        if rx_only:
+            print(f"  ⚠️  Только в T13 (нет передачи): {len(rx_only)} — {format_site_names(rx_only)}")
 
+        if merged_data:
             # Определяем целевой лист (используем имя любого из файлов)
             sample_file = tx_file if tx_file else rx_file
             target_sheet = determine_sheet_from_filename(sample_file)
 
             # Добавляем данные на соответствующий лист
             data_by_sheet[target_sheet].extend(merged_data)
+            source_files = ' + '.join(os.path.abspath(os.path.join(input_folder, f)) for f in (tx_file, rx_file) if f)
+            store_batches.append((source_files, target_sheet, merged_data))
 
             total_stations += len(merged_data)
             print(f"  ✓ Объединено в {len(merged_data)} записей → лист '{target_sheet}'\n")
 
+    print_cache_stats(cache)
+    with stage(stats, 'store'):
+        record_run(db, STORE_REGISTER, store_batches)
     print(f"📊 Всего станций: {total_stations}")
     print("\n📋 Распределение по листам:")
     for sheet_name, data in data_by_sheet.items():
@@ -397,12 +510,38 @@ def main():
         else:
             print(f"  • {sheet_name}: 0 станций (пустой)")
 
-    # Создаем Excel файл с уникальным именем
+    # Сохраняем результат в заданных форматах с уникальным именем
+    output_folder = output_folder or input_folder
+    os.makedirs(output_folder, exist_ok=True)
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    output_file = os.path.join(input_folder, f"Учёт_данных_частот_{timestamp}.xlsx")
-    create_excel(data_by_sheet, output_file)
+    output_base = os.path.join(output_folder, f"{OUTPUT_NAME}_{timestamp}")
+    with stage(stats, 'sheets'):
+        sheets = build_sheets(data_by_sheet)
+    output_files = write_outputs(sheets, output_base, formats, write_only, stats)
+    output_files += finish_stats(stats, output_base, save_stats)
+
+    print(f"\n✅ Готово! Данные сохранены в: {', '.join(output_files)}")
+
+    return output_files
 
-    print(f"\n✅ Готово! Данные сохранены в: {output_file}")
+
+def main(argv=None):
+    """Основная функция"""
+    args = parse_args(argv)
+
+    # Папка с txt файлами
+    input_folder = input("Введите путь к папке с .txt файлами: ").strip()
+
+    # Кэш разобранных файлов (повторный запуск разбирает только новые и изменённые)
+    cache = cache_for_run(input_folder, args.cache_dir, args.use_cache, args.cache_size)
+    db = db_for_run(args.db_path, args.use_db)
+
+    try:
+        with profile_run(OUTPUT_NAME, input_folder, args.profile, args.trace_memory):
+            run(input_folder, jobs=args.jobs, formats=args.formats, write_only=args.write_only, cache=cache, db=db,
+                save_stats=args.save_stats)
+    except FileNotFoundError:
+        print("❌ Папка не найдена!")
 
 
 if __name__ == "__main__":